@@ -0,0 +1,3 @@
+from .jobs import JobManager, Job
+
+__all__ = ['JobManager', 'Job']
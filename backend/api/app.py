@@ -0,0 +1,84 @@
+"""
+App - FastAPI service streaming progressive simulation estimates
+
+Run from backend/:  uvicorn api.app:app
+
+    POST /jobs               start (or join) a job, returns its key and latest snapshot
+    GET  /jobs/{key}         latest snapshot
+    GET  /jobs/{key}/events  Server-Sent Events: one snapshot per finished chunk
+    WS   /ws                 send a job request as JSON, receive snapshots
+"""
+
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from .jobs import JobManager
+
+
+def create_app(workers=None):
+    """FastAPI app owning one JobManager (process pool started with the app)"""
+    manager = JobManager(workers)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await manager.start()
+        yield
+        await manager.stop()
+
+    app = FastAPI(title='Tournament simulator', lifespan=lifespan)
+    app.state.jobs = manager
+
+    def submit(request):
+        try:
+            return manager.submit(request)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def find(key):
+        job = manager.jobs.get(key)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job '{key}'")
+        return job
+
+    @app.post('/jobs')
+    async def create_job(request: dict):
+        job = submit(request)
+        return {'job': job.key, 'snapshot': job.snapshot}
+
+    @app.get('/jobs/{key}')
+    async def get_job(key: str):
+        return find(key).snapshot or {'job': key, 'n_sims': 0, 'done': False}
+
+    @app.get('/jobs/{key}/events')
+    async def job_events(key: str):
+        job = find(key)
+
+        async def events():
+            async for snapshot in manager.subscribe(job):
+                yield f'data: {json.dumps(snapshot)}\n\n'
+
+        return StreamingResponse(events(), media_type='text/event-stream',
+                                 headers={'Cache-Control': 'no-cache'})
+
+    @app.websocket('/ws')
+    async def job_socket(websocket: WebSocket):
+        await websocket.accept()
+        try:
+            request = await websocket.receive_json()
+            try:
+                job = manager.submit(request)
+            except ValueError as e:
+                await websocket.send_json({'error': str(e)})
+                await websocket.close()
+                return
+            async for snapshot in manager.subscribe(job):
+                await websocket.send_json(snapshot)
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,250 @@
+"""
+Jobs - Shared, progressively refined simulation jobs for the API
+
+A job is one simulation configuration (team file, sim_params, user picks,
+seed). Its key hashes the team file contents with the rest of the
+configuration, and clients submitting an identical configuration attach to
+the same job instead of starting another one.
+
+Jobs run as seeded chunks on a process pool via run_in_executor, so the
+event loop never blocks. Chunks start small (the first estimate arrives in
+a few tens of milliseconds) and double in size. After every finished chunk
+the merged counters are published to all subscribers as a snapshot.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from config import DATA_DIR
+from ml.matchup import file_hash
+from sim import SampleStore, MonteCarloResult, chunk_seed, get_format
+from sim.parallel import build_engine
+
+
+FIRST_CHUNK = 2000
+MAX_CHUNK = 100000
+DEFAULT_MAX_SIMS = 1000000
+DEFAULT_TARGET = 0.002  # Stop once every probability is within +/-0.2 points
+FINISHED_JOBS_KEPT = 64
+
+# Per-process engines by (teams file, sim_params), built on first use
+_engines = {}
+
+
+def resolve_teams_file(name):
+    """Path of a team file inside DATA_DIR (rejects paths leaving it)"""
+    root = os.path.realpath(DATA_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root or not path.endswith('.json') or not os.path.isfile(path):
+        raise ValueError(f"Unknown team file '{name}'")
+    return path
+
+
+def job_key(config):
+    """Content hash of a normalized job configuration"""
+    teams_hash = file_hash(config['teams_file'])
+    payload = json.dumps({k: v for k, v in config.items() if k != 'teams_file'},
+                         sort_keys=True)
+    return hashlib.sha256(f'{teams_hash}:{payload}'.encode()).hexdigest()[:24]
+
+
+def normalize_config(request):
+    """
+    Validated job configuration from a client request
+
+    Args:
+        request: dict with 'teams_file' (name inside DATA_DIR, default
+            teams_2018.json) and optional 'sim_params', 'picks'
+            ({slot: team}), 'seed', 'max_sims' and 'target'
+
+    Returns:
+        dict
+    """
+    sim_params = {k: v for k, v in (request.get('sim_params') or {}).items() if k != 'delay'}
+    return {
+        'teams_file': resolve_teams_file(request.get('teams_file') or 'teams_2018.json'),
+        'sim_params': sim_params,
+        'picks': dict(request.get('picks') or {}),
+        'seed': int(request.get('seed', 0)),
+        'max_sims': min(int(request.get('max_sims', DEFAULT_MAX_SIMS)), DEFAULT_MAX_SIMS),
+        'target': float(request.get('target', DEFAULT_TARGET)),
+    }
+
+
+def run_job_chunk(config, index, n):
+    """
+    Worker entry point: one seeded chunk of a job
+
+    Returns:
+        (MonteCarloResult over the simulations agreeing with the picks,
+         number of tournaments simulated)
+    """
+    engine = _engine(config['teams_file'], config['sim_params'])
+    if not config['picks']:
+        return engine.run_monte_carlo(n, seed=chunk_seed(config['seed'], index)), n
+    store = SampleStore(engine, seed=chunk_seed(config['seed'], index)).extend(n)
+    return store.conditional(config['picks'], min_samples=0), n
+
+
+def _engine(teams_file, sim_params):
+    """This process's engine for a team file and parameters"""
+    key = (teams_file, json.dumps(sim_params, sort_keys=True))
+    if key not in _engines:
+        _engines[key] = build_engine(teams_file, sim_params)
+    return _engines[key]
+
+
+def _warm_up():
+    """Start a pool process and build the default engine in it"""
+    default = normalize_config({})
+    _engine(default['teams_file'], default['sim_params'])
+    return os.getpid()
+
+
+class Job:
+    def __init__(self, key, config, team_names, rounds):
+        self.key = key
+        self.config = config
+        self.result = MonteCarloResult(team_names, rounds)
+        self.simulated = 0
+        self.done = False
+        self.error = None
+        self.snapshot = None
+        self.subscribers = set()
+        self.task = None
+
+    def make_snapshot(self):
+        return {
+            'job': self.key,
+            'n_sims': self.result.n_sims,
+            'simulated': self.simulated,
+            'done': self.done,
+            'error': self.error,
+            'max_half_width': self.result.max_half_width() if self.result.n_sims else None,
+            'probabilities': self.result.probabilities(),
+        }
+
+    def publish(self):
+        """Send the current state to every subscriber (latest value wins)"""
+        self.snapshot = self.make_snapshot()
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(self.snapshot)
+
+
+class JobManager:
+    def __init__(self, workers=None, executor=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.jobs = {}      # key -> Job (running and recently finished)
+        self.finished = []  # Keys of finished jobs, oldest first
+
+    async def start(self):
+        """Create the process pool and start its workers ahead of the first job"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_up)
+                               for _ in range(self.workers)))
+
+    async def stop(self):
+        for job in self.jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def submit(self, request):
+        """
+        Job for a request: the existing one for the same configuration, or a new one
+
+        Raises:
+            ValueError: for an invalid request, including picks naming unknown
+                slots or teams or that cannot all happen (SampleStore.check_picks)
+        """
+        config = normalize_config(request)
+        key = job_key(config)
+        job = self.jobs.get(key)
+        if job is None:
+            with open(config['teams_file'], 'r') as f:
+                data = json.load(f)
+            team_names = [team['name'] for team in data['teams']]
+            rounds = get_format(data.get('format')).plan.rounds
+            if config['picks']:
+                # The workers' own checks, run here so a bad request gets a 400
+                engine = _engine(config['teams_file'], config['sim_params'])
+                SampleStore(engine).check_picks(config['picks'])
+            job = self.jobs[key] = Job(key, config, team_names, rounds)
+            job.task = asyncio.get_running_loop().create_task(self._run(job))
+        return job
+
+    async def subscribe(self, job):
+        """Async iterator of a job's snapshots, from the latest one until it is done"""
+        queue = asyncio.Queue(maxsize=1)
+        if job.snapshot is not None:
+            queue.put_nowait(job.snapshot)
+        job.subscribers.add(queue)
+        try:
+            while True:
+                snapshot = await queue.get()
+                yield snapshot
+                if snapshot['done']:
+                    return
+        finally:
+            job.subscribers.discard(queue)
+
+    async def _run(self, job):
+        """Keep every worker busy with growing chunks until the job is done"""
+        loop = asyncio.get_running_loop()
+        config = job.config
+        pending = set()
+        index = 0
+        launched = 0
+        try:
+            while True:
+                while (len(pending) < self.workers and launched < config['max_sims']
+                       and not self._precise(job)):
+                    n = min(FIRST_CHUNK << min(index, 16), MAX_CHUNK, config['max_sims'] - launched)
+                    pending.add(loop.run_in_executor(self.executor, run_job_chunk,
+                                                     config, index, n))
+                    index += 1
+                    launched += n
+                if not pending:
+                    break
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    part, n = future.result()
+                    job.result.merge(part)
+                    job.simulated += n
+                job.publish()
+                if self._precise(job):
+                    await self._drop(pending)
+                    break
+        except Exception as e:  # Reported to subscribers instead of lost in the task
+            job.error = str(e)
+            await self._drop(pending)
+        finally:
+            job.done = True
+            job.publish()
+            self._retire(job.key)
+
+    @staticmethod
+    async def _drop(pending):
+        """Cancel chunks still queued or running and wait for them, so none fails unseen"""
+        for future in pending:
+            future.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    def _precise(job):
+        return job.result.n_sims > 0 and job.result.max_half_width() <= job.config['target']
+
+    def _retire(self, key):
+        """Keep a bounded number of finished jobs for repeat requests"""
+        self.finished.append(key)
+        while len(self.finished) > FINISHED_JOBS_KEPT:
+            self.jobs.pop(self.finished.pop(0), None)
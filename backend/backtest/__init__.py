@@ -0,0 +1,9 @@
+from .editions import Edition, load_editions
+from .ratings import RatingSnapshot, SnapshotCache, snapshot_ratings
+from .metrics import brier_score, log_loss, calibration
+from .harness import MODELS, run_backtest
+
+__all__ = [
+    'Edition', 'load_editions', 'RatingSnapshot', 'SnapshotCache', 'snapshot_ratings',
+    'brier_score', 'log_loss', 'calibration', 'MODELS', 'run_backtest'
+]
@@ -0,0 +1,74 @@
+"""
+Backtest runner
+
+Run from backend/:
+
+    python -m backtest                       every 32-team World Cup, Elo heuristic
+    python -m backtest --model matchup       same with the XGBoost goal models
+    python -m backtest --year 2018 --year 2022 --sims 100000
+
+The report (per-round scores, calibration curves and every forecast) is
+written to BACKTEST_REPORT_FILE.
+"""
+
+import argparse
+import json
+import os
+import sys
+from config import BACKTEST_REPORT_FILE
+from sim.parallel import DEFAULT_CHUNK_SIZE
+from .harness import DEFAULT_SIMS, MODELS, run_backtest
+
+
+def print_report(report):
+    print(f"{report['model']} model, {report['n_sims']:,} simulations per edition "
+          f"(rating snapshots {report['snapshot_seconds']:.1f} s)")
+    for edition in report['editions']:
+        note = '' if edition['exact_bracket'] else '  (round-of-16 wiring only)'
+        rounds = '  '.join(f"{name} {scores['brier']:.3f}"
+                           for name, scores in edition['rounds'].items())
+        print(f"{edition['year']}  Brier {rounds}  [{edition['seconds']:.1f} s]{note}")
+
+    print(f"\n{'round':10} {'Brier':>7} {'log loss':>9} {'base rate':>10}")
+    for name, scores in report['rounds'].items():
+        print(f"{name:10} {scores['brier']:7.4f} {scores['log_loss']:9.4f} "
+              f"{scores['base_rate']:10.3f}")
+    overall = report['overall']
+    print(f"{'all':10} {overall['brier']:7.4f} {overall['log_loss']:9.4f}")
+
+    print('\nCalibration (predicted -> observed, forecasts)')
+    for name, scores in report['rounds'].items():
+        points = '  '.join(f"{b['predicted']:.2f}->{b['observed']:.2f} ({b['count']})"
+                           for b in scores['calibration'])
+        print(f"{name:10} {points}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m backtest', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--year', type=int, action='append', dest='years',
+                        help='edition to replay (repeatable; default all)')
+    parser.add_argument('--sims', type=int, default=DEFAULT_SIMS,
+                        help='simulated tournaments per edition')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--model', choices=MODELS, default='elo')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--output', default=BACKTEST_REPORT_FILE)
+    args = parser.parse_args(argv)
+
+    report = run_backtest(args.years, args.sims, args.seed, args.workers, args.model,
+                          args.chunk_size)
+    print_report(report)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Editions - Past World Cups rebuilt from the results history
+
+Only the 32-team format (1998 onwards: 48 group matches, then round of 16,
+quarter-finals, semi-finals, third place and final) fits the simulator's
+bracket. Everything is read back from results.csv through ml.History:
+
+    groups     connected components of the 48 group matches
+    standings  points, goal difference, goals for, then the mini-league of
+               the tied teams; teams that reached the round of 16 rank
+               above those that did not (fair play and lots are not in the
+               data)
+    letters    from the knockout tree: groups are labelled so that the real
+               round-of-16 pairings land in R16_PAIRINGS' slots
+    outcomes   which teams reached each of sim.ROUNDS; drawn knockout matches
+               are settled from shootouts.csv
+"""
+
+from ml.history import from_ordinal
+
+
+WORLD_CUP = 'FIFA World Cup'
+EDITION_MATCHES = 64
+GROUP_MATCHES = 48
+GROUP_LETTERS = 'ABCDEFGH'
+
+# Knockout rows after the group stage, in date order: (round, first row, matches)
+KNOCKOUT_ROWS = (('R16', 0, 8), ('QF', 8, 4), ('SF', 12, 2), ('F', 15, 1))
+
+
+class Edition:
+    def __init__(self, year, kickoff, groups, outcomes, exact_bracket=True):
+        self.year = year
+        self.kickoff = kickoff    # ISO date of the opening match
+        self.groups = groups      # letter -> [team names], in finishing order
+        self.outcomes = outcomes  # team name -> {round name: 0 or 1}
+        self.exact_bracket = exact_bracket  # False: only the round of 16 is wired as played
+
+    @property
+    def cutoff(self):
+        """Ratings are taken from the results played before this ISO date"""
+        return self.kickoff
+
+    @property
+    def team_names(self):
+        return [name for letter in GROUP_LETTERS for name in self.groups[letter]]
+
+    def teams_data(self, ratings):
+        """
+        The edition as a teams file (data/teams_2018.json layout)
+
+        ratings: ml.EloEngine holding the ratings to simulate with
+        """
+        return {
+            'year': self.year,
+            'kickoff': self.kickoff,
+            'teams': [{'name': name, 'elo': round(ratings.sim_elo(name), 2), 'group': letter}
+                      for letter in GROUP_LETTERS for name in self.groups[letter]],
+        }
+
+    def to_dict(self):
+        return {'year': self.year, 'kickoff': self.kickoff, 'groups': self.groups,
+                'outcomes': self.outcomes, 'exact_bracket': self.exact_bracket}
+
+
+def load_editions(history, years=None):
+    """
+    Rebuild the 32-team World Cups in the results history
+
+    Args:
+        history: ml.History
+        years: Editions to rebuild (default: every 32-team edition)
+
+    Returns:
+        list of Edition, oldest first
+
+    Raises:
+        ValueError: a requested year is not a 32-team edition, or its
+            knockout rows do not form a round of 16 between pairs of groups
+    """
+    results = history.results
+    shootouts = history.shootouts
+    labels = results.labels['tournament']
+    if WORLD_CUP not in labels:
+        return []
+    names = history.teams.names  # After loading both tables, which may extend it
+    columns = [results[c] for c in ('date', 'home', 'away', 'home_score', 'away_score')]
+    mask = results['tournament'] == labels.index(WORLD_CUP)
+    rows = zip(*(column[mask].tolist() for column in columns))
+
+    by_year = {}
+    for day, home, away, home_score, away_score in rows:
+        year = int(from_ordinal(day)[:4])
+        by_year.setdefault(year, []).append((day, names[home], names[away],
+                                             home_score, away_score))
+
+    shootout_winners = {
+        (day, names[home], names[away]): names[winner]
+        for day, home, away, winner in zip(*(shootouts[c].tolist()
+                                             for c in ('date', 'home', 'away', 'winner')))
+    }
+
+    available = sorted(year for year, matches in by_year.items()
+                       if len(matches) == EDITION_MATCHES)
+    if years is None:
+        years = available
+    editions = []
+    for year in sorted(years):
+        if year not in available:
+            raise ValueError(f'No 32-team World Cup in {year}')
+        editions.append(_rebuild(year, by_year[year], shootout_winners))
+    return editions
+
+
+def _rebuild(year, matches, shootout_winners):
+    """Edition from its 64 (day, home, away, home score, away score) rows"""
+    group_matches = matches[:GROUP_MATCHES]
+    knockout = matches[GROUP_MATCHES:]
+
+    def winner(match):
+        day, home, away, home_score, away_score = match
+        if home_score != away_score:
+            return home if home_score > away_score else away
+        if (day, home, away) not in shootout_winners:
+            raise ValueError(f'{year}: no shootout winner for {home} - {away}')
+        return shootout_winners[(day, home, away)]
+
+    rounds = {name: knockout[start:start + size] for name, start, size in KNOCKOUT_ROWS}
+    reached = {name: {team for match in ms for team in match[1:3]} for name, ms in rounds.items()}
+    for previous, following in (('R16', 'QF'), ('QF', 'SF'), ('SF', 'F')):
+        if {winner(match) for match in rounds[previous]} != reached[following]:
+            raise ValueError(f'{year}: {following} teams are not the {previous} winners')
+
+    groups = _groups(year, group_matches, reached['R16'])
+    letters, exact = _letters(year, groups, rounds, winner)
+    standings = {letters[k]: group for k, group in enumerate(groups)}
+
+    champion = winner(rounds['F'][0])
+    outcomes = {}
+    for group in standings.values():
+        for position, team in enumerate(group):
+            outcomes[team] = {
+                'group_win': int(position == 0),
+                'R16': int(team in reached['R16']),
+                'QF': int(team in reached['QF']),
+                'SF': int(team in reached['SF']),
+                'F': int(team in reached['F']),
+                'champion': int(team == champion),
+            }
+    return Edition(year, from_ordinal(matches[0][0]), standings, outcomes, exact)
+
+
+def _groups(year, matches, qualified):
+    """Groups of four as connected components, each in finishing order"""
+    links = {}
+    for _, home, away, _, _ in matches:
+        links.setdefault(home, set()).add(away)
+        links.setdefault(away, set()).add(home)
+
+    groups = []
+    seen = set()
+    for team in links:
+        if team in seen:
+            continue
+        group = {team} | links[team]
+        if len(group) != 4 or any(links[t] | {t} != group for t in group):
+            raise ValueError(f'{year}: group matches do not form groups of four')
+        seen |= group
+        group_results = [m for m in matches if m[1] in group]
+        groups.append(_standings(group_results, group, qualified))
+    return groups
+
+
+def _table(matches, teams):
+    """team -> (points, goal difference, goals for) over matches among `teams`"""
+    table = {team: [0, 0, 0] for team in teams}
+    for _, home, away, home_score, away_score in matches:
+        if home not in table or away not in table:
+            continue
+        for team, scored, conceded in ((home, home_score, away_score),
+                                       (away, away_score, home_score)):
+            row = table[team]
+            row[0] += 3 if scored > conceded else 1 if scored == conceded else 0
+            row[1] += scored - conceded
+            row[2] += scored
+    return {team: tuple(row) for team, row in table.items()}
+
+
+def _standings(matches, teams, qualified):
+    overall = _table(matches, teams)
+    tied = {}
+    for team, row in overall.items():
+        tied.setdefault(row, set()).add(team)
+    head_to_head = {}
+    for group in tied.values():
+        if len(group) > 1:
+            head_to_head.update(_table(matches, group))
+
+    def key(team):
+        return (team in qualified, overall[team], head_to_head.get(team, ()))
+    return sorted(teams, key=key, reverse=True)
+
+
+def _letters(year, groups, rounds, winner):
+    """
+    Group letter per index into `groups`, and whether the whole bracket fits
+
+    Slots of R16_PAIRINGS: 0-3 (A1-B2, C1-D2, E1-F2, G1-H2) make up one half
+    of the bracket, 4-7 (B1-A2, D1-C2, F1-E2, H1-G2) the other, and
+    quarter-finals pair slots (0, 1), (2, 3), (4, 5), (6, 7). When the real
+    tree is wired differently (2002 kept both matches of a group pair in
+    one half), only the round-of-16 pairings are reproduced.
+    """
+    group_of = {team: k for k, group in enumerate(groups) for team in group}
+    position = {team: group.index(team) for group in groups for team in group}
+
+    # Real round of 16 as (winner's group, runner-up's group); each later
+    # match as the pair of earlier matches its teams came from
+    r16 = []
+    for match in rounds['R16']:
+        first, second = sorted(match[1:3], key=position.get)
+        if (position[first], position[second]) != (0, 1):
+            raise ValueError(f'{year}: round of 16 does not pair group winners with runners-up')
+        r16.append((group_of[first], group_of[second]))
+    origin = {winner(match): k for k, match in enumerate(rounds['R16'])}
+
+    def children(matches, origin):
+        pairs = [(origin[match[1]], origin[match[2]]) for match in matches]
+        return pairs, {winner(match): k for k, match in enumerate(matches)}
+
+    quarters, origin = children(rounds['QF'], origin)
+    semis, origin = children(rounds['SF'], origin)
+    (final,), _ = children(rounds['F'], origin)
+
+    # One half fixes the letters; the other must mirror it
+    halves = [[r16[k] for quarter in semis[semi] for k in quarters[quarter]] for semi in final]
+    letters = _pair_letters(halves[0])
+    if len(letters) == len(GROUP_LETTERS):
+        expected = [[(2 * slot + 1, 2 * slot) for slot in pair] for pair in ((0, 1), (2, 3))]
+        mirrored = [[(GROUP_LETTERS.index(letters[a]), GROUP_LETTERS.index(letters[b]))
+                     for a, b in halves[1][i:i + 2]] for i in (0, 2)]
+        if sorted(map(sorted, mirrored)) == sorted(map(sorted, expected)):
+            return [letters[k] for k in range(len(groups))], True
+
+    letters = _pair_letters([(a, b) for a, b in r16 if (b, a) not in r16[:r16.index((a, b))]])
+    if len(letters) != len(GROUP_LETTERS):
+        raise ValueError(f'{year}: round of 16 does not cross pairs of groups')
+    return [letters[k] for k in range(len(groups))], False
+
+
+def _pair_letters(matches):
+    """Letters 2k and 2k + 1 for the winner's and runner-up's groups of match k"""
+    letters = {}
+    for slot, (first, second) in enumerate(matches[:len(GROUP_LETTERS) // 2]):
+        letters[first] = GROUP_LETTERS[2 * slot]
+        letters[second] = GROUP_LETTERS[2 * slot + 1]
+    return letters
@@ -0,0 +1,124 @@
+"""
+Harness - Simulate past World Cups and score the forecasts
+
+For every edition: take the rating snapshot on the eve of kickoff, write
+the edition as a teams file, and run sim.run_parallel on it (vectorized
+engine, chunks spread over a process pool, reproducible for any worker
+count). The advancement probabilities are then scored against what
+happened, per round and per edition.
+
+Models:
+    elo      the Elo goal heuristic (ratings mapped with EloEngine.sim_elo)
+    matchup  the XGBoost goal models on the snapshot's form features; they
+             were fitted on the whole history, so this is an in-sample check
+"""
+
+import json
+import os
+import time
+from config import BACKTEST_CACHE_DIR
+from ml import History
+from sim import ROUNDS, run_parallel
+from sim.parallel import DEFAULT_CHUNK_SIZE
+from .editions import load_editions
+from .metrics import DEFAULT_BINS, brier_score, log_loss, score
+from .ratings import SnapshotCache
+
+
+MODELS = ('elo', 'matchup')
+DEFAULT_SIMS = 20000
+
+
+def edition_files(edition, snapshot, model='elo', cache_dir=BACKTEST_CACHE_DIR):
+    """
+    Write what the workers load for one edition
+
+    Returns:
+        (teams file, matchup file or None)
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    teams_file = os.path.join(cache_dir, f'teams-{edition.year}.json')
+    with open(teams_file, 'w', encoding='utf-8') as f:
+        json.dump(edition.teams_data(snapshot.elo()), f, indent=2, ensure_ascii=False)
+
+    if model == 'elo':
+        return teams_file, None
+    from ml import MatchupModel
+    matrix = MatchupModel().matrix(edition.team_names, snapshot.features)
+    matchup_file = os.path.join(cache_dir, f'matchup-{edition.year}.npz')
+    matrix.save(matchup_file)
+    return teams_file, matchup_file
+
+
+def run_backtest(years=None, n_sims=DEFAULT_SIMS, seed=0, workers=None, model='elo',
+                 chunk_size=DEFAULT_CHUNK_SIZE, bins=DEFAULT_BINS, history=None,
+                 cache_dir=BACKTEST_CACHE_DIR):
+    """
+    Backtest the simulator on past 32-team World Cups
+
+    Args:
+        years: Editions to replay (default: all, see editions.load_editions)
+        n_sims: Simulated tournaments per edition
+        seed: Master seed (each edition's run is seeded with seed + year)
+        workers: Processes for run_parallel (None = all cores)
+        model: 'elo' or 'matchup'
+        chunk_size: Simulations per seeded chunk
+        bins: Calibration bins per round
+        history: ml.History to read (default: HISTORY_DIR)
+        cache_dir: Where snapshots and per-edition files go
+
+    Returns:
+        dict: JSON-ready report; 'rounds' holds Brier score, log loss and
+        the calibration curve of every round over all editions, 'editions'
+        the per-round scores, forecasts and outcomes of each edition
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}' (expected one of {', '.join(MODELS)})")
+    history = history or History()
+    editions = load_editions(history, years)
+
+    started = time.perf_counter()
+    snapshots = SnapshotCache(history, cache_dir).get(
+        {edition.cutoff: edition.team_names for edition in editions})
+    snapshot_seconds = time.perf_counter() - started
+
+    eps = 0.5 / n_sims
+    pairs = {round_name: [] for round_name in ROUNDS}
+    reports = []
+    for edition in editions:
+        started = time.perf_counter()
+        teams_file, matchup_file = edition_files(edition, snapshots[edition.cutoff], model,
+                                                 cache_dir)
+        result = run_parallel(teams_file, n_sims, seed + edition.year, workers, 'vectorized',
+                              chunk_size, matchup_file=matchup_file)
+        forecasts = result.probabilities()
+
+        rounds = {}
+        for round_name in ROUNDS:
+            edition_pairs = [(forecasts[team][round_name], outcome[round_name])
+                             for team, outcome in edition.outcomes.items()]
+            pairs[round_name] += edition_pairs
+            rounds[round_name] = {'brier': brier_score(edition_pairs),
+                                  'log_loss': log_loss(edition_pairs, eps)}
+        reports.append({
+            'year': edition.year,
+            'cutoff': edition.cutoff,
+            'exact_bracket': edition.exact_bracket,
+            'seconds': time.perf_counter() - started,
+            'rounds': rounds,
+            'forecasts': forecasts,
+            'outcomes': edition.outcomes,
+        })
+
+    everything = [pair for round_pairs in pairs.values() for pair in round_pairs]
+    return {
+        'model': model,
+        'n_sims': n_sims,
+        'seed': seed,
+        'years': [edition.year for edition in editions],
+        'snapshot_seconds': snapshot_seconds,
+        'overall': {'brier': brier_score(everything), 'log_loss': log_loss(everything, eps)},
+        'rounds': {round_name: score(round_pairs, eps, bins)
+                   for round_name, round_pairs in pairs.items()},
+        'editions': reports,
+    }
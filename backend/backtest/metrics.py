@@ -0,0 +1,62 @@
+"""
+Metrics - Scores of advancement probabilities against what happened
+
+Every (team, round) pair is one binary forecast: the simulated probability
+of reaching the round and whether the team did. Monte Carlo estimates can
+be exactly 0 or 1, so log loss clips them to [eps, 1 - eps]; with
+eps = 0.5 / n_sims a never-simulated outcome costs as much as half a
+simulation's worth of probability.
+"""
+
+import math
+
+
+DEFAULT_BINS = 10
+
+
+def brier_score(pairs):
+    """Mean squared error of (probability, outcome) pairs"""
+    if not pairs:
+        return None
+    return sum((p - y) ** 2 for p, y in pairs) / len(pairs)
+
+
+def log_loss(pairs, eps=1e-6):
+    """Mean negative log-likelihood of (probability, outcome) pairs"""
+    if not pairs:
+        return None
+    total = 0.0
+    for p, y in pairs:
+        p = min(1 - eps, max(eps, p))
+        total -= math.log(p if y else 1 - p)
+    return total / len(pairs)
+
+
+def calibration(pairs, bins=DEFAULT_BINS):
+    """
+    Reliability curve: forecasts grouped into equal-width probability bins
+
+    Returns:
+        list of dicts per non-empty bin: lower, upper, count, predicted
+        (mean probability) and observed (fraction that happened)
+    """
+    grouped = [[] for _ in range(bins)]
+    for p, y in pairs:
+        grouped[min(bins - 1, int(p * bins))].append((p, y))
+    return [
+        {'lower': k / bins, 'upper': (k + 1) / bins, 'count': len(members),
+         'predicted': sum(p for p, _ in members) / len(members),
+         'observed': sum(y for _, y in members) / len(members)}
+        for k, members in enumerate(grouped) if members
+    ]
+
+
+def score(pairs, eps=1e-6, bins=DEFAULT_BINS):
+    """Brier score, log loss, base rate and calibration of one set of forecasts"""
+    return {
+        'forecasts': len(pairs),
+        'brier': brier_score(pairs),
+        'log_loss': log_loss(pairs, eps),
+        'base_rate': sum(y for _, y in pairs) / len(pairs) if pairs else None,
+        'calibration': calibration(pairs, bins),
+    }
@@ -0,0 +1,130 @@
+"""
+Ratings - Point-in-time Elo and form snapshots, one per cutoff date
+
+Every edition needs the ratings as they stood on the eve of its opening
+match. Replaying the history once per edition would repeat the same work
+for every earlier year, so snapshot_ratings walks results.csv a single time
+with an ml.FeatureStore and copies the state at each cutoff as it passes.
+
+Snapshots are cached as one JSON file keyed by the results file's size and
+mtime, so later backtests (any model, any number of simulations) skip the
+replay; workers get the ratings through each edition's teams file.
+"""
+
+import json
+import os
+from config import BACKTEST_CACHE_DIR
+from ml import EloEngine, FeatureStore
+from ml.history import to_ordinal
+
+
+SNAPSHOT_VERSION = 1
+
+
+class RatingSnapshot:
+    """Ratings and matchup-model inputs as of one cutoff date"""
+
+    def __init__(self, cutoff, ratings, features):
+        self.cutoff = cutoff      # ISO date; results on this day or later are excluded
+        self.ratings = ratings    # team name -> Elo
+        self.features = features  # team name -> FeatureStore.features on the cutoff day
+
+    def elo(self):
+        """ml.EloEngine holding these ratings (for sim_elo / load_data)"""
+        engine = EloEngine(checkpoint_file=None)
+        engine.ratings = dict(self.ratings)
+        engine.last_date = self.cutoff
+        return engine
+
+    def to_dict(self):
+        return {'cutoff': self.cutoff, 'ratings': self.ratings, 'features': self.features}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['cutoff'], data['ratings'], data['features'])
+
+
+def snapshot_ratings(history, cutoffs):
+    """
+    Snapshots at several cutoffs from one pass over the results history
+
+    Args:
+        history: ml.History
+        cutoffs: dict of ISO cutoff date -> team names whose form features
+            to keep (ratings are kept for every team)
+
+    Returns:
+        dict: cutoff -> RatingSnapshot
+    """
+    pending = sorted(cutoffs)
+    days = [to_ordinal(cutoff) for cutoff in pending]
+    store = FeatureStore()
+    snapshots = {}
+
+    def take(cutoff):
+        features = {name: store.features(name, cutoff) for name in cutoffs[cutoff]}
+        snapshots[cutoff] = RatingSnapshot(cutoff, dict(store.elo.ratings), features)
+
+    results = history.results
+    tournaments = results.labels['tournament']
+    names = history.teams.names
+    columns = [results[c].tolist() for c in
+               ('date', 'home', 'away', 'home_score', 'away_score', 'tournament', 'neutral')]
+    for day, home, away, home_score, away_score, tournament, neutral in zip(*columns):
+        while pending and day >= days[0]:
+            take(pending.pop(0))
+            days.pop(0)
+        if not pending:
+            break
+        store.add_result(day, names[home], names[away], home_score, away_score,
+                         tournaments[tournament], neutral)
+    for cutoff in pending:
+        take(cutoff)
+    return snapshots
+
+
+class SnapshotCache:
+    """RatingSnapshot files under BACKTEST_CACHE_DIR, rebuilt when results.csv changes"""
+
+    def __init__(self, history, cache_dir=BACKTEST_CACHE_DIR):
+        self.history = history
+        self.path = os.path.join(cache_dir, 'ratings.json')
+
+    def _stamp(self):
+        info = os.stat(os.path.join(self.history.data_dir, 'results.csv'))
+        return [SNAPSHOT_VERSION, info.st_size, info.st_mtime_ns]
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('stamp') != self._stamp():
+            return {}
+        return data['snapshots']
+
+    def get(self, cutoffs):
+        """
+        Snapshots for every cutoff, computing only those missing from the cache
+
+        Args:
+            cutoffs: dict of ISO cutoff date -> team names needing features
+
+        Returns:
+            dict: cutoff -> RatingSnapshot
+        """
+        stored = self._read()
+        missing = {cutoff: teams for cutoff, teams in cutoffs.items()
+                   if cutoff not in stored
+                   or not set(teams) <= set(stored[cutoff]['features'])}
+        if missing:
+            for cutoff, snapshot in snapshot_ratings(self.history, missing).items():
+                stored[cutoff] = snapshot.to_dict()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'stamp': self._stamp(), 'snapshots': stored}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        return {cutoff: RatingSnapshot.from_dict(stored[cutoff]) for cutoff in cutoffs}
@@ -0,0 +1,3 @@
+from .suite import CASES, run_benchmarks, compare, time_case, tournament_memory
+
+__all__ = ['CASES', 'run_benchmarks', 'compare', 'time_case', 'tournament_memory']
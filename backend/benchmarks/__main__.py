@@ -0,0 +1,82 @@
+"""
+Benchmark runner
+
+Run from backend/:
+
+    python -m benchmarks                   run, print and save to BENCHMARK_RESULTS_FILE
+    python -m benchmarks --save-baseline   also store the results as the baseline
+    python -m benchmarks --compare         flag regressions against the baseline
+                                           (exit status 1 if any)
+"""
+
+import argparse
+import json
+import os
+import sys
+from config import BENCHMARK_BASELINE_FILE, BENCHMARK_RESULTS_FILE, DEFAULT_TEAMS_FILE
+from .suite import CASES, DEFAULT_REPEAT, DEFAULT_THRESHOLD, compare, run_benchmarks
+
+
+def save(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def print_results(results):
+    for name, timing in results['cases'].items():
+        matches = timing.get('matches_per_sec')
+        extra = f"  {matches:12,.0f} matches/s" if matches else ''
+        print(f"{name:18} {timing['per_sec']:12,.0f} /s{extra}")
+    memory = results['memory']
+    print(f"{'memory':18} peak {memory['peak_bytes']:,} B, live {memory['live_bytes']:,} B "
+          f"in {memory['live_blocks']:,} blocks per tournament")
+
+
+def print_comparison(rows, threshold):
+    for row in rows:
+        flag = 'REGRESSION' if row['regressed'] else ''
+        print(f"{row['case']:18} {row['metric']:16} {row['baseline']:14,.1f} -> "
+              f"{row['current']:14,.1f} {row['change']:+7.1%} {flag}")
+    regressed = sum(row['regressed'] for row in rows)
+    print(f"{regressed} regression(s) beyond {threshold:.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams-file', default=DEFAULT_TEAMS_FILE)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='timed repetitions per case, best kept')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier on the work per case (e.g. 0.1 for a quick run)')
+    parser.add_argument('--case', action='append', choices=list(CASES), dest='cases',
+                        help='run only this case (repeatable)')
+    parser.add_argument('--output', default=BENCHMARK_RESULTS_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', nargs='?', const=BENCHMARK_BASELINE_FILE, metavar='BASELINE',
+                        help=f'baseline to compare against (default {BENCHMARK_BASELINE_FILE})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fractional change counted as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.teams_file, args.repeat, args.scale, args.cases)
+    print_results(results)
+    save(results, args.output)
+    if args.save_baseline:
+        save(results, BENCHMARK_BASELINE_FILE)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row['regressed'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Suite - Throughput and memory benchmarks of the scalar simulator
+
+Every case runs on the teams_2018.json fixture with a fixed seed, so two
+runs do the same work and only the timings differ. A case is timed
+`repeat` times after one untimed warm-up run (which fills caches such as
+the penalty_win_probability table, so results do not depend on the order
+the cases run in), and the fastest run is kept (the least disturbed by the
+rest of the machine).
+
+Cases:
+    match_generation   Match.generate_timeline + play over the group fixtures
+    group_standings    Group.compute_standings on played groups
+    group_stage        TournamentEngine.simulate_group_stage
+    knockout_round     TournamentEngine.simulate_knockout_round (round of 16)
+    tournament         quiet TournamentEngine.simulate_tournament
+
+Memory is measured separately over one tournament with tracemalloc: the
+peak traced size while it runs, and the bytes and blocks still allocated
+at its end.
+"""
+
+import gc
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import combinations
+from config import DEFAULT_TEAMS_FILE
+from models import Match
+from sim import TournamentEngine
+from sim.tournament_engine import R16_PAIRINGS
+
+
+BENCHMARK_SEED = 2018
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10  # Flag changes worse than 10%
+
+# name -> (units per timed run, matches per unit)
+CASES = {
+    'match_generation': (20000, 1),
+    'group_standings': (50000, 0),
+    'group_stage': (400, 48),
+    'knockout_round': (2000, 8),
+    'tournament': (300, 63),  # 48 group + 15 knockout matches
+}
+
+
+def build_engine(teams_file=DEFAULT_TEAMS_FILE, seed=BENCHMARK_SEED):
+    """Quiet engine on a seeded generator"""
+    engine = TournamentEngine(delay=0)
+    engine.load_data(teams_file)
+    engine.quiet = True
+    engine.rng = random.Random(seed)
+    return engine
+
+
+def _match_generation(engine, n):
+    fixtures = [(group.teams[i], group.teams[j]) for group in engine.groups
+                for i, j in combinations(range(len(group.teams)), 2)]
+
+    def run():
+        for k in range(n):
+            team_a, team_b = fixtures[k % len(fixtures)]
+            match = Match(team_a, team_b)
+            match.generate_timeline(engine.sim_params, rng=engine.rng)
+            match.play(replay_mode=False, verbose=False)
+    return run
+
+
+def _group_standings(engine, n):
+    engine.simulate_group_stage()
+    groups = engine.groups
+
+    def run():
+        for k in range(n):
+            groups[k % len(groups)].compute_standings()
+    return run
+
+
+def _group_stage(engine, n):
+    def run():
+        for _ in range(n):
+            engine.reset()
+            engine.simulate_group_stage()
+    return run
+
+
+def _knockout_round(engine, n):
+    qualifiers = engine.simulate_group_stage()
+    teams = [qualifiers[k] for pairing in R16_PAIRINGS for k in pairing]
+
+    def run():
+        for _ in range(n):
+            engine.simulate_knockout_round(teams, '16')
+    return run
+
+
+def _tournament(engine, n):
+    def run():
+        for _ in range(n):
+            engine.reset()
+            engine.simulate_tournament()
+    return run
+
+
+_FACTORIES = {
+    'match_generation': _match_generation,
+    'group_standings': _group_standings,
+    'group_stage': _group_stage,
+    'knockout_round': _knockout_round,
+    'tournament': _tournament,
+}
+
+
+def time_case(name, teams_file=DEFAULT_TEAMS_FILE, repeat=DEFAULT_REPEAT, scale=1.0):
+    """
+    Best-of-`repeat` timing of one case
+
+    Every repetition starts from a fresh engine with the same seed, after
+    one untimed warm-up run.
+
+    Returns:
+        dict: units, seconds, per_sec and (for cases playing several
+        matches per unit) matches_per_sec
+    """
+    units, matches_per_unit = CASES[name]
+    n = max(1, int(units * scale))
+    _FACTORIES[name](build_engine(teams_file), n)()  # Warm-up, untimed
+    best = float('inf')
+    for _ in range(repeat):
+        run = _FACTORIES[name](build_engine(teams_file), n)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    timing = {'units': n, 'seconds': best, 'per_sec': n / best}
+    if matches_per_unit > 1:
+        timing['matches_per_sec'] = n * matches_per_unit / best
+    return timing
+
+
+def tournament_memory(teams_file=DEFAULT_TEAMS_FILE, warmup=20):
+    """
+    Memory figures for one quiet tournament after `warmup` others
+
+    Returns:
+        dict: peak_bytes (highest traced size above the starting point),
+        live_bytes and live_blocks (still allocated when it ends)
+    """
+    engine = build_engine(teams_file)
+    for _ in range(warmup):
+        engine.reset()
+        engine.simulate_tournament()
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        engine.reset()
+        engine.simulate_tournament()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # The snapshots' own frames are filtered out of the difference
+    own = tracemalloc.Filter(False, tracemalloc.__file__)
+    diff = after.filter_traces([own]).compare_to(before.filter_traces([own]), 'filename')
+    return {
+        'peak_bytes': peak - start,
+        'live_bytes': sum(stat.size_diff for stat in diff),
+        'live_blocks': sum(stat.count_diff for stat in diff),
+    }
+
+
+def run_benchmarks(teams_file=DEFAULT_TEAMS_FILE, repeat=DEFAULT_REPEAT, scale=1.0,
+                   cases=None):
+    """
+    Run the suite
+
+    Args:
+        teams_file: Fixture to simulate
+        repeat: Timed repetitions per case (best one kept)
+        scale: Multiplier on every case's unit count (e.g. 0.1 for a quick run)
+        cases: Case names to run (default: all)
+
+    Returns:
+        dict: JSON-ready results with the environment, per-case timings and
+        per-tournament memory
+    """
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'teams_file': teams_file,
+        'seed': BENCHMARK_SEED,
+        'repeat': repeat,
+        'cases': {name: time_case(name, teams_file, repeat, scale) for name in (cases or CASES)},
+        'memory': tournament_memory(teams_file),
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Metric-by-metric comparison of two run_benchmarks results
+
+    Rates (per_sec; matches_per_sec is proportional to it) regress when
+    they drop by more than `threshold` (a fraction), memory figures when
+    they grow by more than it. Cases missing from the baseline are skipped.
+
+    Returns:
+        list of dicts: case, metric, baseline, current, change (fraction,
+        positive = larger) and regressed
+    """
+    rows = []
+
+    def add(case, metric, old, new, higher_is_better):
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        rows.append({'case': case, 'metric': metric, 'baseline': old, 'current': new,
+                     'change': change, 'regressed': worse > threshold})
+
+    for case, timing in current.get('cases', {}).items():
+        old = baseline.get('cases', {}).get(case)
+        if old is None:
+            continue
+        add(case, 'per_sec', old['per_sec'], timing['per_sec'], True)
+
+    old_memory = baseline.get('memory', {})
+    for metric, value in current.get('memory', {}).items():
+        if metric in old_memory:
+            add('tournament', metric, old_memory[metric], value, False)
+    return rows
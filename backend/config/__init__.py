@@ -6,8 +6,38 @@ Configuration - Simulation defaults and file paths
 DEFAULT_DELAY = 0.1
 BASE_GOAL_RATE = 6
 USE_ELOS = True
+USE_MATCHUP_MODEL = False  # Score matches from the trained XGBoost goal models
+USE_SHOOTOUT_MODEL = False  # Decide shootouts with the model fitted on shootouts.csv
 
 # File paths
 DATA_DIR = 'data'
 CACHE_DIR = 'cache/sims'
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Simulation cache size cap (LRU eviction)
 DEFAULT_TEAMS_FILE = 'data/teams_2018.json'
+# FIFA's 2026 best-third allocation (regulations, Annex C) as
+# {"ABCDEFGH": "EJIFHGLK", ...}: qualifying groups -> group of the third in
+# each 3-... bracket slot, in bracket order. Not shipped; without it the
+# allocations are matched automatically (sim.formats)
+THIRD_PLACE_2026_FILE = 'data/third_place_2026.json'
+BENCHMARK_RESULTS_FILE = 'cache/benchmarks/latest.json'
+BENCHMARK_BASELINE_FILE = 'cache/benchmarks/baseline.json'  # Per machine
+BACKTEST_CACHE_DIR = 'cache/backtest'  # Rating snapshots and per-edition teams files
+BACKTEST_REPORT_FILE = 'cache/backtest/report.json'
+
+# Historical data and trained models (relative to backend/, like the paths above)
+HISTORY_DIR = '../data'
+HISTORY_CACHE_DIR = 'cache/history'
+RATINGS_FILE = '../data/final_ratings.json'
+RESULTS_FILE = '../data/results.csv'
+ELO_CHECKPOINT_FILE = 'cache/elo_checkpoint.json'
+SHOOTOUT_MODEL_FILE = 'cache/shootout_model.json'  # Refitted when the CSVs change
+MODEL_HOME_FILE = '../models/model_home.pkl'
+MODEL_AWAY_FILE = '../models/model_away.pkl'
+
+# Elo -> simulator 0-100 scale (linear fit of data/teams_2018.json against the
+# ratings on the eve of that tournament)
+SIM_ELO_FLOOR = 1550
+SIM_ELO_CEILING = 2280
+
+# Fixture spellings that differ from the historical datasets
+TEAM_ALIASES = {'Morroco': 'Morocco'}
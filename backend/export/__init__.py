@@ -1,3 +1,5 @@
 from .serializers import export_snapshot
+from .stream import export_stream, write_records, open_records, iter_batches, record_dtype
 
-__all__ = ['export_snapshot']
+__all__ = ['export_snapshot', 'export_stream', 'write_records', 'open_records', 'iter_batches',
+           'record_dtype']
@@ -13,6 +13,10 @@ def export_snapshot(tournament_engine):
     Returns:
         dict: JSON-serializable tournament snapshot
     """
+    inst = tournament_engine.instrumentation
+    if inst:
+        started = inst.start()
+
     snapshot = {
         'sim_params': tournament_engine.sim_params,
         'teams': [],
@@ -62,4 +66,6 @@ def export_snapshot(tournament_engine):
 
         snapshot['groups'].append(group_data)
 
+    if inst:
+        inst.stop('export', started)
     return snapshot
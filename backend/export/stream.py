@@ -0,0 +1,219 @@
+"""
+Stream - Per-simulation export of large Monte Carlo runs
+
+export_snapshot describes one engine's state; this module writes one
+compact record per simulated tournament instead. Batches come from a
+generator and are written as they are simulated, so memory stays at one
+batch whatever the number of simulations.
+
+Formats:
+    binary  Header, then fixed-width records (record_dtype): group
+            standings, group scores and every knockout match (teams,
+            score, winner) as int8 team IDs and goals. open_records
+            memory-maps the file as a numpy structured array.
+    ndjson  One JSON object per line with team names.
+
+Each export also writes a small JSON summary (advancement probabilities
+and the MonteCarloResult counters) next to the records.
+"""
+
+import json
+import os
+import struct
+import numpy as np
+from sim import VectorizedEngine, MonteCarloResult
+from sim.formats import round_robin
+
+
+RECORD_MAGIC = b'SIMREC01'
+RECORD_VERSION = 1
+HEADER_ALIGN = 64
+DEFAULT_BATCH_SIZE = 50000
+FORMATS = ('binary', 'ndjson')
+
+
+def record_dtype(n_groups, id_dtype='i1', group_size=4, n_knockout=None):
+    """
+    Structured dtype of one tournament with n_groups groups of group_size
+
+    n_knockout: Knockout matches (default 2 * n_groups - 1, two qualifiers
+        per group)
+    """
+    if n_knockout is None:
+        n_knockout = 2 * n_groups - 1
+    return np.dtype([
+        ('standings', id_dtype, (n_groups, group_size)),     # Team IDs in finishing order
+        ('group_scores', 'i1', (n_groups, len(round_robin(group_size)), 2)),
+        ('ko_teams', id_dtype, (n_knockout, 2)),             # First round ... final
+        ('ko_scores', 'i1', (n_knockout, 2)),
+        ('ko_winners', id_dtype, (n_knockout,)),
+    ])
+
+
+def iter_batches(engine, n_sims, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generator of TournamentBatch objects totalling n_sims simulations
+
+    Args:
+        engine: VectorizedEngine, or a loaded TournamentEngine (simulated
+            through VectorizedEngine.from_tournament, same distribution)
+        seed: Seed for numpy.random.default_rng
+    """
+    if not isinstance(engine, VectorizedEngine):
+        engine = VectorizedEngine.from_tournament(engine)
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done < n_sims:
+        n = min(batch_size, n_sims - done)
+        yield engine.simulate_batch(n, rng)
+        done += n
+
+
+def batch_records(batch, dtype):
+    """A TournamentBatch as a structured array of records"""
+    records = np.empty(batch.n_sims, dtype=dtype)
+    for field in dtype.names:
+        records[field] = getattr(batch, field)
+    return records
+
+
+def ndjson_lines(batch, team_names, start=0):
+    """NDJSON lines (with newline) for the simulations of a batch"""
+    names = np.asarray(team_names, dtype=object)
+    columns = zip(names[batch.standings].tolist(), batch.group_scores.tolist(),
+                  names[batch.ko_teams].tolist(), batch.ko_scores.tolist(),
+                  names[batch.ko_winners].tolist())
+    for i, (standings, group_scores, ko_teams, ko_scores, ko_winners) in enumerate(columns, start):
+        knockout = [[a, b, score_a, score_b, winner] for (a, b), (score_a, score_b), winner
+                    in zip(ko_teams, ko_scores, ko_winners)]
+        yield json.dumps({'sim': i, 'standings': standings, 'group_scores': group_scores,
+                          'knockout': knockout}, separators=(',', ':')) + '\n'
+
+
+def _header(team_names, group_names, dtype, meta):
+    """Binary file header, padded so records start on a HEADER_ALIGN boundary"""
+    payload = json.dumps({
+        'version': RECORD_VERSION,
+        'teams': list(team_names),
+        'groups': list(group_names),
+        'group_size': dtype['standings'].shape[1],
+        'n_knockout': dtype['ko_winners'].shape[0],
+        'id_dtype': dtype['standings'].base.str,
+        'record_size': dtype.itemsize,
+        **meta,
+    }).encode()
+    size = len(RECORD_MAGIC) + 4 + len(payload)
+    payload += b' ' * (-size % HEADER_ALIGN)
+    return RECORD_MAGIC + struct.pack('<I', len(payload)) + payload
+
+
+def write_records(path, batches, team_names, group_names, fmt='binary', meta=None,
+                  on_batch=None, plan=None):
+    """
+    Stream batches to a records file
+
+    Args:
+        path: Output file (overwritten)
+        batches: Iterable of TournamentBatch (e.g. iter_batches)
+        team_names, group_names: Of the engine that simulated them
+        fmt: 'binary' or 'ndjson'
+        meta: Extra JSON-ready header fields (binary only)
+        on_batch: Optional callback(batch) after each batch is written
+        plan: sim.formats.FormatPlan of the engine (default: groups of four,
+            two qualifiers each)
+
+    Returns:
+        int: simulations written
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    id_dtype = 'i1' if len(team_names) <= 127 else 'i2'
+    if plan is None:
+        dtype = record_dtype(len(group_names), id_dtype)
+    else:
+        dtype = record_dtype(len(group_names), id_dtype, plan.group_size, plan.n_knockout)
+    written = 0
+    with open(path, 'wb' if fmt == 'binary' else 'w') as f:
+        if fmt == 'binary':
+            f.write(_header(team_names, group_names, dtype, meta or {}))
+        for batch in batches:
+            if fmt == 'binary':
+                f.write(batch_records(batch, dtype).tobytes())
+            else:
+                f.writelines(ndjson_lines(batch, team_names, written))
+            written += batch.n_sims
+            if on_batch is not None:
+                on_batch(batch)
+    return written
+
+
+def open_records(path):
+    """
+    Memory-map a binary records file
+
+    Returns:
+        (header dict, numpy.memmap of records, read-only); the record count
+        follows from the file size, so a file still being written can be
+        opened and holds every complete record so far
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+            raise ValueError(f"'{path}' is not a simulation records file")
+        (length,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(length))
+    offset = len(RECORD_MAGIC) + 4 + length
+    dtype = record_dtype(len(header['groups']), header['id_dtype'],
+                         header.get('group_size', 4), header.get('n_knockout'))
+    if dtype.itemsize != header['record_size']:
+        raise ValueError(f"Unsupported record layout in '{path}'")
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return header, np.empty(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+
+def summary_path(path):
+    """Default summary file of a records file"""
+    return f'{path}.summary.json'
+
+
+def export_stream(engine, path, n_sims, seed=None, fmt='binary',
+                  batch_size=DEFAULT_BATCH_SIZE, summary_file=None):
+    """
+    Simulate n_sims tournaments straight into a records file plus summary
+
+    Args:
+        engine: VectorizedEngine or loaded TournamentEngine
+        path: Records file
+        n_sims: Number of tournaments
+        seed: Seed for the simulation generator
+        fmt: 'binary' or 'ndjson'
+        batch_size: Tournaments per batch (bounds memory)
+        summary_file: Summary path (default: summary_path(path))
+
+    Returns:
+        dict: the summary that was written
+    """
+    if not isinstance(engine, VectorizedEngine):
+        engine = VectorizedEngine.from_tournament(engine)
+    result = MonteCarloResult(engine.team_names, engine.plan.rounds)
+    written = write_records(path, iter_batches(engine, n_sims, seed, batch_size),
+                            engine.team_names, engine.group_names, fmt,
+                            meta={'seed': seed, 'sim_params': engine.sim_params,
+                                  'tournament_format': engine.plan.name},
+                            on_batch=lambda batch: engine.record(result, batch),
+                            plan=engine.plan)
+
+    summary = {
+        'records': os.path.basename(path),
+        'format': fmt,
+        'n_sims': written,
+        'seed': seed,
+        'sim_params': engine.sim_params,
+        'probabilities': result.probabilities(),
+        'goals_per_tournament': result.goals_per_tournament(),
+        'result': result.to_dict(),
+    }
+    with open(summary_file or summary_path(path), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
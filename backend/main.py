@@ -2,19 +2,31 @@
 Main entry point for tournament simulation
 """
 
-from sim import TournamentEngine
-from config import DEFAULT_DELAY, DEFAULT_TEAMS_FILE
+from sim import TournamentEngine, ConsoleSink
+from config import DEFAULT_DELAY, DEFAULT_TEAMS_FILE, USE_MATCHUP_MODEL, USE_SHOOTOUT_MODEL
 
 
 if __name__ == "__main__":
     # Create tournament engine
     engine = TournamentEngine(delay=DEFAULT_DELAY)
+    engine.events.subscribe(ConsoleSink())
 
     # Load team data
     engine.load_data(DEFAULT_TEAMS_FILE)
 
-    # Run tournament simulation
-    champion = engine.simulate_tournament()
+    # Optionally score matches from the trained goal models (matrix cached on disk)
+    if USE_MATCHUP_MODEL:
+        from ml import FeatureStore, MatchupModel
+        team_names = [team.name for group in engine.groups for team in group.teams]
+        # Form and ratings as they stood going into the opening match
+        team_features = FeatureStore.from_history(until=engine.kickoff).team_features(
+            team_names, on=engine.kickoff)
+        engine.use_matchup_model(MatchupModel().matrix(team_names, team_features))
 
-    # Print champion
-    print(f"\nChampion: {champion.name}")
+    # Decide shootouts with the model fitted on shootouts.csv (fit cached on disk)
+    if USE_SHOOTOUT_MODEL:
+        from ml import ShootoutModel
+        engine.use_shootout_model(ShootoutModel.cached())
+
+    # Run tournament simulation (the console sink prints progress and the champion)
+    engine.simulate_tournament()
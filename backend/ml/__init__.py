@@ -0,0 +1,13 @@
+from .features import FEATURE_COLS, TEAM_FEATURES, match_row
+from .elo import EloEngine
+from .history import History
+from .feature_store import FeatureStore
+from .matchup import MatchupModel, MatchupMatrix, rating_features
+from .penalties import ShootoutModel
+from .scorers import ScorerModel
+
+__all__ = [
+    'FEATURE_COLS', 'TEAM_FEATURES', 'match_row',
+    'EloEngine', 'History', 'FeatureStore', 'MatchupModel', 'MatchupMatrix', 'rating_features',
+    'ShootoutModel', 'ScorerModel'
+]
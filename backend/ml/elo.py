@@ -0,0 +1,219 @@
+"""
+Elo - Streaming international Elo ratings over data/results.csv
+
+Same rules as calculate_elo in notebooks/ML.ipynb (K by tournament, +100 home
+advantage on non-neutral ground, margin-of-victory multiplier damped by the
+rating gap), applied one CSV row at a time. The ratings, the number of rows
+applied and the byte offset reached are checkpointed to JSON, so a refresh
+after new results are appended only reads and applies the new rows.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+from config import (RESULTS_FILE, ELO_CHECKPOINT_FILE, RATINGS_FILE, TEAM_ALIASES,
+                    SIM_ELO_FLOOR, SIM_ELO_CEILING)
+
+
+DEFAULT_ELO = 1500
+SENS = 400
+HOME_ADVANTAGE = 100
+
+K_MAP = {
+    'FIFA World Cup':               60,
+    'UEFA Euro':                    50,
+    'Copa América':                 45,
+    'AFC Asian Cup':                40,
+    'AFCON':                        40,
+    'CONCACAF Gold Cup':            40,
+    'UEFA Nations League':          40,
+    'FIFA World Cup qualification': 30,
+    'UEFA Euro qualification':      25,
+    'Copa América qualification':   20,
+    'AFC Asian Cup qualification':  20,
+    'AFCON qualification':          20,
+    'Friendly':                     10,
+}
+DEFAULT_K = 30  # Any tournament type not listed above
+
+# Bytes before the checkpoint offset that must be unchanged to resume from it
+_TAIL_BYTES = 4096
+
+
+def get_k(tournament):
+    """K-factor of a tournament name (first K_MAP key it contains)"""
+    lowered = tournament.lower()
+    for key, k in K_MAP.items():
+        if key.lower() in lowered:
+            return k
+    return DEFAULT_K
+
+
+def expected_score(r_team, r_opp):
+    """Probability that a team rated r_team beats one rated r_opp"""
+    return 1 / (1 + 10 ** ((r_opp - r_team) / SENS))
+
+
+def mov_multiplier(goal_diff, elo_diff):
+    """K scaling for the margin of victory, damped by the winner's rating lead"""
+    if goal_diff <= 1:
+        return 1.0
+    return (1.75 + (goal_diff - 2) / 8.0) * (0.65 / (0.65 + (elo_diff * 0.001)))
+
+
+class EloEngine:
+    def __init__(self, results_file=RESULTS_FILE, checkpoint_file=ELO_CHECKPOINT_FILE):
+        self.results_file = results_file
+        self.checkpoint_file = checkpoint_file
+        self.clear()
+
+    def clear(self):
+        """Forget all applied results"""
+        self.ratings = {}
+        self.rows = 0          # Result rows applied
+        self.offset = 0        # Byte offset just past the last applied row
+        self.last_date = None  # Date of the last applied row (ISO string)
+        self.tail_hash = None  # sha256 of the bytes just before offset
+
+    # ------------------------------------------------------------------
+    # Rating updates
+    # ------------------------------------------------------------------
+    def rate_match(self, home, away, home_score, away_score, tournament, neutral):
+        """Apply one result to the ratings (home advantage only affects the expectation)"""
+        r_home = self.ratings.get(home, DEFAULT_ELO)
+        r_away = self.ratings.get(away, DEFAULT_ELO)
+
+        e_home = expected_score(r_home + (0 if neutral else HOME_ADVANTAGE), r_away)
+        if home_score > away_score:
+            s_home = 1.0
+        elif home_score < away_score:
+            s_home = 0.0
+        else:
+            s_home = 0.5
+
+        winner_lead = r_home - r_away if home_score > away_score else r_away - r_home
+        k = get_k(tournament) * mov_multiplier(abs(home_score - away_score), winner_lead)
+
+        self.ratings[home] = r_home + k * (s_home - e_home)
+        self.ratings[away] = r_away + k * ((1 - s_home) - (1 - e_home))
+
+    def update(self):
+        """
+        Bring the ratings up to date with the results file
+
+        Resumes from the checkpoint when the file still starts with the
+        rows it covers, otherwise replays the whole file. Only complete
+        (newline-terminated) rows are applied, so a half-written append is
+        picked up by the next call.
+
+        Returns:
+            int: number of new rows applied
+        """
+        if not self.offset:
+            self.load_checkpoint()
+        if self.offset and not self._resumable():
+            self.clear()
+
+        with open(self.results_file, 'rb') as f:
+            if self.offset:
+                f.seek(self.offset)
+            else:
+                f.readline()  # Header
+            data = f.read()
+
+        complete = data[:data.rfind(b'\n') + 1]
+        start = self.offset or os.path.getsize(self.results_file) - len(data)
+        applied = 0
+        for row in csv.reader(io.StringIO(complete.decode('utf-8'))):
+            if not row:
+                continue
+            date, home, away, home_score, away_score, tournament, _, _, neutral = row
+            self.rate_match(home, away, int(home_score), int(away_score),
+                            tournament, neutral.upper() == 'TRUE')
+            self.last_date = date
+            applied += 1
+
+        if applied or not self.offset:
+            self.rows += applied
+            self.offset = start + len(complete)
+            self.tail_hash = self._hash_tail()
+            self.save_checkpoint()
+        return applied
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+    def _hash_tail(self):
+        """Hash of the last bytes before self.offset in the results file"""
+        start = max(0, self.offset - _TAIL_BYTES)
+        with open(self.results_file, 'rb') as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(self.offset - start)).hexdigest()
+
+    def _resumable(self):
+        """Whether the results file still holds the checkpointed rows unchanged"""
+        try:
+            if os.path.getsize(self.results_file) < self.offset:
+                return False
+        except OSError:
+            return False
+        return self._hash_tail() == self.tail_hash
+
+    def load_checkpoint(self):
+        """Restore state from checkpoint_file (returns False if there is none)"""
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return False
+        with open(self.checkpoint_file, 'r') as f:
+            state = json.load(f)
+        if state.get('results_file') != os.path.abspath(self.results_file):
+            return False
+        self.ratings = state['ratings']
+        self.rows = state['rows']
+        self.offset = state['offset']
+        self.last_date = state['last_date']
+        self.tail_hash = state['tail_hash']
+        return True
+
+    def save_checkpoint(self):
+        """Write the current state to checkpoint_file atomically"""
+        if not self.checkpoint_file:
+            return
+        state = {
+            'results_file': os.path.abspath(self.results_file),
+            'rows': self.rows,
+            'offset': self.offset,
+            'last_date': self.last_date,
+            'tail_hash': self.tail_hash,
+            'ratings': self.ratings,
+        }
+        directory = os.path.dirname(self.checkpoint_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f'{self.checkpoint_file}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint_file)
+
+    def save_ratings(self, path=RATINGS_FILE):
+        """Write {team: rating} in the notebook's final_ratings.json format"""
+        with open(path, 'w') as f:
+            json.dump(self.ratings, f)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def rating(self, team_name):
+        """Current Elo of a team (fixture spellings resolved via TEAM_ALIASES)"""
+        return self.ratings.get(TEAM_ALIASES.get(team_name, team_name), DEFAULT_ELO)
+
+    def sim_elo(self, team_name):
+        """
+        Rating mapped linearly onto the simulator's 0-100 scale
+
+        SIM_ELO_FLOOR maps to 0 and SIM_ELO_CEILING to 100; values outside
+        are clipped.
+        """
+        scaled = (self.rating(team_name) - SIM_ELO_FLOOR) / (SIM_ELO_CEILING - SIM_ELO_FLOOR) * 100
+        return min(100.0, max(0.0, scaled))
@@ -0,0 +1,195 @@
+"""
+FeatureStore - Incremental per-team form features for the matchup model
+
+Keeps, for every team, a ring buffer of its last 20 results and integer
+running sums per rolling window, so adding a result is O(1) and the current
+feature vector of any team (features.TEAM_FEATURES) is read straight off
+the sums. Values follow the notebook's make_team_match_df / add_rolling_form
+/ add_goal_volatility / add_clean_sheet_ratio / add_elo_delta / add_days_rest
+as they would be for a team's next match.
+"""
+
+import math
+from datetime import date
+from config import TEAM_ALIASES
+from .elo import EloEngine
+from .history import History, from_ordinal, to_ordinal
+
+
+FORM_WINDOWS = (5, 10, 20)
+ELO_DELTA_WINDOWS = (5, 10)
+VOLATILITY_WINDOW = 10
+CLEAN_SHEET_WINDOW = 10
+VOLATILITY_MIN_MATCHES = 3
+MAX_DAYS_REST = 365
+
+_RING = max(FORM_WINDOWS + (VOLATILITY_WINDOW, CLEAN_SHEET_WINDOW))
+_ELO_RING = max(ELO_DELTA_WINDOWS) + 1
+
+
+class TeamForm:
+    """Rolling state of one team"""
+
+    __slots__ = ('goals', 'elo_post', 'count', 'sums', 'gf_10', 'gf_sq_10',
+                 'clean_sheets_10', 'last_played')
+
+    def __init__(self):
+        self.goals = [(0, 0)] * _RING        # Ring of (goals for, goals against)
+        self.elo_post = [0.0] * _ELO_RING    # Ring of post-match ratings
+        self.count = 0                       # Matches recorded
+        self.sums = {n: [0, 0, 0, 0] for n in FORM_WINDOWS}  # wins, GF, GA, points
+        self.gf_10 = 0
+        self.gf_sq_10 = 0
+        self.clean_sheets_10 = 0
+        self.last_played = None              # Day ordinal
+
+    def add(self, goals_for, goals_against, elo_post, day):
+        slot = self.count % _RING
+        for n, sums in self.sums.items():
+            if self.count >= n:
+                self._subtract(sums, *self.goals[(self.count - n) % _RING])
+            self._add(sums, goals_for, goals_against)
+
+        if self.count >= VOLATILITY_WINDOW:
+            old_gf, old_ga = self.goals[(self.count - VOLATILITY_WINDOW) % _RING]
+            self.gf_10 -= old_gf
+            self.gf_sq_10 -= old_gf * old_gf
+            self.clean_sheets_10 -= old_ga == 0
+        self.gf_10 += goals_for
+        self.gf_sq_10 += goals_for * goals_for
+        self.clean_sheets_10 += goals_against == 0
+
+        self.goals[slot] = (goals_for, goals_against)
+        self.elo_post[self.count % _ELO_RING] = elo_post
+        self.count += 1
+        self.last_played = day
+
+    @staticmethod
+    def _add(sums, goals_for, goals_against):
+        sums[0] += goals_for > goals_against
+        sums[1] += goals_for
+        sums[2] += goals_against
+        sums[3] += 3 if goals_for > goals_against else goals_for == goals_against
+
+    @staticmethod
+    def _subtract(sums, goals_for, goals_against):
+        sums[0] -= goals_for > goals_against
+        sums[1] -= goals_for
+        sums[2] -= goals_against
+        sums[3] -= 3 if goals_for > goals_against else goals_for == goals_against
+
+    def features(self, elo, day=None):
+        """TEAM_FEATURES values; None where the history is too short"""
+        values = {'elo': elo}
+        for n in ELO_DELTA_WINDOWS:
+            values[f'elo_delta_{n}'] = (
+                self.elo_post[(self.count - 1) % _ELO_RING]
+                - self.elo_post[(self.count - 1 - n) % _ELO_RING]
+                if self.count > n else None)
+
+        for n, (wins, gf, ga, points) in self.sums.items():
+            played = min(self.count, n)
+            if not played:
+                continue
+            values[f'win_rate_{n}'] = wins / played
+            values[f'goals_for_avg_{n}'] = gf / played
+            values[f'goals_against_avg_{n}'] = ga / played
+            values[f'goal_diff_avg_{n}'] = (gf - ga) / played
+            values[f'points_pg_{n}'] = points / played
+
+        played = min(self.count, VOLATILITY_WINDOW)
+        if played >= VOLATILITY_MIN_MATCHES:
+            # Sample standard deviation, as pandas rolling().std()
+            variance = (self.gf_sq_10 - self.gf_10 * self.gf_10 / played) / (played - 1)
+            values['goal_volatility_10'] = math.sqrt(max(variance, 0.0))
+        if played:
+            values['clean_sheet_ratio_10'] = self.clean_sheets_10 / played
+
+        if day is not None and self.last_played is not None:
+            values['days_rest'] = min(day - self.last_played, MAX_DAYS_REST)
+        return values
+
+
+class FeatureStore:
+    def __init__(self, elo=None):
+        self.elo = elo or EloEngine(checkpoint_file=None)  # Rated alongside the form
+        self.teams = {}   # team name -> TeamForm
+        self.rows = 0     # History results rows applied by sync()
+
+    @classmethod
+    def from_history(cls, history=None, until=None):
+        """
+        Store built from the results history
+
+        Args:
+            history: ml.History (None = load the default one)
+            until: ISO date; results played on or after it are left out, so
+                features describe teams as they were going into that day
+                (None = the full history)
+        """
+        store = cls()
+        store.sync(history or History(), until)
+        return store
+
+    def add_result(self, day, home, away, home_score, away_score,
+                   tournament='Friendly', neutral=True):
+        """
+        Record one result: O(1) in the history length
+
+        Args:
+            day: ISO date string or day ordinal
+            home, away: Team names
+            home_score, away_score: Full-time score
+            tournament, neutral: Match context for the Elo update
+        """
+        if isinstance(day, str):
+            day = date.fromisoformat(day).toordinal()
+        self.elo.rate_match(home, away, home_score, away_score, tournament, neutral)
+        self.elo.last_date = from_ordinal(day)
+
+        for team, goals_for, goals_against in ((home, home_score, away_score),
+                                               (away, away_score, home_score)):
+            form = self.teams.get(team)
+            if form is None:
+                form = self.teams[team] = TeamForm()
+            form.add(goals_for, goals_against, self.elo.ratings[team], day)
+
+    def sync(self, history, until=None):
+        """
+        Apply the results rows of a History not seen yet (appended rows only),
+        stopping at the first one played on or after the ISO date `until`
+        """
+        results = history.results
+        tournaments = results.labels['tournament']
+        names = history.teams.names
+        stop = to_ordinal(until) if until else None
+        columns = [results[c][self.rows:].tolist() for c in
+                   ('date', 'home', 'away', 'home_score', 'away_score', 'tournament', 'neutral')]
+        for day, home, away, home_score, away_score, tournament, neutral in zip(*columns):
+            if stop is not None and day >= stop:
+                break
+            self.add_result(day, names[home], names[away], home_score, away_score,
+                            tournaments[tournament], neutral)
+            self.rows += 1
+        return self
+
+    def features(self, team_name, on=None):
+        """
+        Current TEAM_FEATURES of a team, as inputs for its next match
+
+        Args:
+            team_name: Team (fixture spellings resolved via TEAM_ALIASES)
+            on: ISO date of that match, for days_rest (None = unknown)
+
+        Returns:
+            dict: feature name -> value; None marks values ml.features
+            fills from NEUTRAL_FORM
+        """
+        name = TEAM_ALIASES.get(team_name, team_name)
+        day = date.fromisoformat(on).toordinal() if on else None
+        form = self.teams.get(name) or TeamForm()
+        return form.features(self.elo.rating(name), day)
+
+    def team_features(self, team_names, on=None):
+        """{team: features} for MatchupModel.matrix"""
+        return {name: self.features(name, on) for name in team_names}
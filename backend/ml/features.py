@@ -0,0 +1,168 @@
+"""
+Features - Model input layout shared with notebooks/ML.ipynb
+"""
+
+import math
+
+
+# Column order the XGBoost goal models were trained on
+FEATURE_COLS = [
+    # elo
+    'elo_home', 'elo_away', 'elo_diff',
+    'elo_delta_home_5', 'elo_delta_home_10',
+    'elo_delta_away_5', 'elo_delta_away_10',
+
+    # rolling form - home
+    'win_rate_5_home', 'win_rate_10_home', 'win_rate_20_home',
+    'goals_for_avg_5_home', 'goals_for_avg_10_home', 'goals_for_avg_20_home',
+    'goals_against_avg_5_home', 'goals_against_avg_10_home', 'goals_against_avg_20_home',
+    'goal_diff_avg_5_home', 'goal_diff_avg_10_home', 'goal_diff_avg_20_home',
+    'points_pg_5_home', 'points_pg_10_home', 'points_pg_20_home',
+    'goal_volatility_10_home',
+    'clean_sheet_ratio_10_home',
+
+    # rolling form - away
+    'win_rate_5_away', 'win_rate_10_away', 'win_rate_20_away',
+    'goals_for_avg_5_away', 'goals_for_avg_10_away', 'goals_for_avg_20_away',
+    'goals_against_avg_5_away', 'goals_against_avg_10_away', 'goals_against_avg_20_away',
+    'goal_diff_avg_5_away', 'goal_diff_avg_10_away', 'goal_diff_avg_20_away',
+    'points_pg_5_away', 'points_pg_10_away', 'points_pg_20_away',
+    'goal_volatility_10_away',
+    'clean_sheet_ratio_10_away',
+
+    # match context
+    'is_neutral', 'tournament_weight',
+    'days_rest_home', 'days_rest_away', 'days_rest_diff',
+
+    # confederation
+    'conf_home', 'conf_away', 'same_conf',
+]
+
+# Per-team inputs (the part of a row that describes one side)
+TEAM_FEATURES = [
+    'elo', 'elo_delta_5', 'elo_delta_10',
+    'win_rate_5', 'win_rate_10', 'win_rate_20',
+    'goals_for_avg_5', 'goals_for_avg_10', 'goals_for_avg_20',
+    'goals_against_avg_5', 'goals_against_avg_10', 'goals_against_avg_20',
+    'goal_diff_avg_5', 'goal_diff_avg_10', 'goal_diff_avg_20',
+    'points_pg_5', 'points_pg_10', 'points_pg_20',
+    'goal_volatility_10', 'clean_sheet_ratio_10',
+    'days_rest',
+]
+
+# Typical international form, used for any team input nobody supplied
+NEUTRAL_FORM = {
+    'elo_delta_5': 0.0, 'elo_delta_10': 0.0,
+    'win_rate_5': 0.5, 'win_rate_10': 0.5, 'win_rate_20': 0.5,
+    'goals_for_avg_5': 1.5, 'goals_for_avg_10': 1.5, 'goals_for_avg_20': 1.5,
+    'goals_against_avg_5': 1.1, 'goals_against_avg_10': 1.1, 'goals_against_avg_20': 1.1,
+    'goal_diff_avg_5': 0.4, 'goal_diff_avg_10': 0.4, 'goal_diff_avg_20': 0.4,
+    'points_pg_5': 1.7, 'points_pg_10': 1.7, 'points_pg_20': 1.7,
+    'goal_volatility_10': 1.1, 'clean_sheet_ratio_10': 0.35,
+    'days_rest': 5,
+}
+
+TOURNAMENT_WEIGHT = {
+    'FIFA World Cup':                5,
+    'UEFA Euro':                     4,
+    'Copa América':                  4,
+    'AFC Asian Cup':                 3,
+    'Africa Cup of Nations':         3,
+    'CONCACAF Gold Cup':             3,
+    'UEFA Nations League':           3,
+    'CONCACAF Nations League':       3,
+    'FIFA World Cup qualification':  2,
+    'UEFA Euro qualification':       2,
+    'Copa América qualification':    2,
+    'AFC Asian Cup qualification':   2,
+    'AFCON qualification':           2,
+    'Friendly':                      1,
+}
+
+CONFEDERATION_MAP = {
+    # UEFA - Europe
+    'England': 'UEFA', 'France': 'UEFA', 'Germany': 'UEFA', 'Spain': 'UEFA',
+    'Italy': 'UEFA', 'Portugal': 'UEFA', 'Netherlands': 'UEFA', 'Belgium': 'UEFA',
+    'Croatia': 'UEFA', 'Denmark': 'UEFA', 'Sweden': 'UEFA', 'Norway': 'UEFA',
+    'Switzerland': 'UEFA', 'Austria': 'UEFA', 'Poland': 'UEFA', 'Czech Republic': 'UEFA',
+    'Turkey': 'UEFA', 'Serbia': 'UEFA', 'Ukraine': 'UEFA', 'Russia': 'UEFA',
+    # CONMEBOL - South America
+    'Brazil': 'CONMEBOL', 'Argentina': 'CONMEBOL', 'Uruguay': 'CONMEBOL',
+    'Colombia': 'CONMEBOL', 'Chile': 'CONMEBOL', 'Peru': 'CONMEBOL',
+    'Ecuador': 'CONMEBOL', 'Paraguay': 'CONMEBOL', 'Bolivia': 'CONMEBOL',
+    'Venezuela': 'CONMEBOL',
+    # CONCACAF - North/Central America + Caribbean
+    'Mexico': 'CONCACAF', 'United States': 'CONCACAF', 'Costa Rica': 'CONCACAF',
+    'Panama': 'CONCACAF', 'Honduras': 'CONCACAF', 'Jamaica': 'CONCACAF',
+    'Canada': 'CONCACAF', 'Trinidad and Tobago': 'CONCACAF',
+    # CAF - Africa
+    'Morocco': 'CAF', 'Senegal': 'CAF', 'Nigeria': 'CAF', 'Ghana': 'CAF',
+    'Cameroon': 'CAF', 'Egypt': 'CAF', 'Tunisia': 'CAF', 'Algeria': 'CAF',
+    'Ivory Coast': 'CAF', 'Mali': 'CAF', 'South Africa': 'CAF',
+    # AFC - Asia
+    'Japan': 'AFC', 'South Korea': 'AFC', 'Iran': 'AFC', 'Saudi Arabia': 'AFC',
+    'Australia': 'AFC', 'China PR': 'AFC', 'Qatar': 'AFC', 'Iraq': 'AFC',
+    'Uzbekistan': 'AFC', 'Jordan': 'AFC',
+    # OFC - Oceania
+    'New Zealand': 'OFC',
+}
+
+CONF_ENCODING = {'UEFA': 0, 'CONMEBOL': 1, 'CONCACAF': 2, 'CAF': 3, 'AFC': 4, 'OFC': 5, 'UNKNOWN': 6}
+
+
+def tournament_weight(tournament):
+    """Importance weight of a tournament name (qualifier level if unknown)"""
+    lowered = tournament.lower()
+    for key, weight in TOURNAMENT_WEIGHT.items():
+        if key.lower() in lowered:
+            return weight
+    return 2
+
+
+def confederation_code(team):
+    """CONF_ENCODING value of a team's confederation"""
+    return CONF_ENCODING[CONFEDERATION_MAP.get(team, 'UNKNOWN')]
+
+
+def match_row(home, away, home_features, away_features, neutral=True,
+              tournament='FIFA World Cup'):
+    """
+    One model input row in FEATURE_COLS order
+
+    Args:
+        home, away: Team names (for the confederation features)
+        home_features, away_features: dicts keyed by TEAM_FEATURES; missing
+            entries fall back to NEUTRAL_FORM ('elo' is required)
+        neutral: Whether the match is on neutral ground
+        tournament: Tournament name for the importance weight
+
+    Returns:
+        list of floats (NaN where a value is unknown)
+    """
+    sides = {}
+    for side, features in (('home', home_features), ('away', away_features)):
+        values = dict(NEUTRAL_FORM)
+        values.update({k: v for k, v in features.items() if v is not None})
+        sides[side] = values
+
+    home_values, away_values = sides['home'], sides['away']
+    row = {
+        'elo_home': home_values['elo'],
+        'elo_away': away_values['elo'],
+        'elo_diff': home_values['elo'] - away_values['elo'],
+        'is_neutral': int(neutral),
+        'tournament_weight': tournament_weight(tournament),
+        'days_rest_home': home_values['days_rest'],
+        'days_rest_away': away_values['days_rest'],
+        'days_rest_diff': home_values['days_rest'] - away_values['days_rest'],
+        'conf_home': confederation_code(home),
+        'conf_away': confederation_code(away),
+    }
+    row['same_conf'] = int(row['conf_home'] == row['conf_away'])
+    for side, values in sides.items():
+        row[f'elo_delta_{side}_5'] = values['elo_delta_5']
+        row[f'elo_delta_{side}_10'] = values['elo_delta_10']
+        for name in TEAM_FEATURES[3:-1]:
+            row[f'{name}_{side}'] = values[name]
+
+    return [math.nan if row[col] is None else float(row[col]) for col in FEATURE_COLS]
@@ -0,0 +1,293 @@
+"""
+History - Columnar, memory-mapped cache of the historical CSVs
+
+results.csv, goalscorers.csv and shootouts.csv are parsed once into one .npy
+file per column under HISTORY_CACHE_DIR: dates as day ordinals, teams as
+interned IDs with former names (former_names.csv) already resolved to the
+current ones, scores and minutes as small ints. Later loads memory-map the
+arrays, so nothing is copied or re-parsed. A table is rebuilt automatically
+when its source CSV (or former_names.csv) changes size or mtime.
+
+Team IDs are shared by all tables and only ever appended to, so an ID stays
+valid across rebuilds. Builds hold a lock file (teams.json.lock) from
+reading the team table to writing it back, so two processes building at
+once cannot hand out the same ID to different teams.
+"""
+
+import csv
+import json
+import os
+from contextlib import contextmanager
+from datetime import date
+import numpy as np
+from config import HISTORY_DIR, HISTORY_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX: concurrent builds are not serialised
+    fcntl = None
+
+
+# Bump when the column layout changes to force a rebuild
+SCHEMA_VERSION = 1
+
+# Missing team / minute marker in ID and minute columns
+MISSING = -1
+
+
+def to_ordinal(iso_date):
+    """'YYYY-MM-DD' -> proleptic Gregorian day ordinal"""
+    return date.fromisoformat(iso_date).toordinal()
+
+
+def from_ordinal(ordinal):
+    """Day ordinal -> 'YYYY-MM-DD'"""
+    return date.fromordinal(int(ordinal)).isoformat()
+
+
+def _flag(value):
+    return value.upper() == 'TRUE'
+
+
+class Vocabulary:
+    """Append-only string <-> int ID table"""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def intern(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class FormerNames:
+    """former_names.csv: historical team names mapped to current ones by date"""
+
+    def __init__(self, path):
+        self.spans = {}  # former name -> [(current, first ordinal, last ordinal)]
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                self.spans.setdefault(row['former'], []).append(
+                    (row['current'], to_ordinal(row['start_date']), to_ordinal(row['end_date'])))
+
+    def resolve(self, name, ordinal):
+        """Current name for a team as it was called on a given day"""
+        for current, start, end in self.spans.get(name, ()):
+            if start <= ordinal <= end:
+                return current
+        return name
+
+
+# Per table: source file and its columns as (name, dtype, parser). Parsers
+# get the row dict, the day ordinal and a resolver for team-name fields.
+def _team(field):
+    return lambda row, day, team: team(row[field], day)
+
+
+def _optional_team(field):
+    return lambda row, day, team: team(row[field], day) if row[field] not in ('', 'NA') else MISSING
+
+
+TABLES = {
+    'results': ('results.csv', [
+        ('date', np.int32, lambda row, day, team: day),
+        ('home', np.int16, _team('home_team')),
+        ('away', np.int16, _team('away_team')),
+        ('home_score', np.int8, lambda row, day, team: int(row['home_score'])),
+        ('away_score', np.int8, lambda row, day, team: int(row['away_score'])),
+        ('tournament', np.int16, None),  # Interned per table, see _build
+        ('neutral', np.bool_, lambda row, day, team: _flag(row['neutral'])),
+    ]),
+    'goalscorers': ('goalscorers.csv', [
+        ('date', np.int32, lambda row, day, team: day),
+        ('home', np.int16, _team('home_team')),
+        ('away', np.int16, _team('away_team')),
+        ('team', np.int16, _team('team')),
+        ('scorer', np.int32, None),
+        ('minute', np.int16,
+         lambda row, day, team: int(row['minute']) if row['minute'].isdigit() else MISSING),
+        ('own_goal', np.bool_, lambda row, day, team: _flag(row['own_goal'])),
+        ('penalty', np.bool_, lambda row, day, team: _flag(row['penalty'])),
+    ]),
+    'shootouts': ('shootouts.csv', [
+        ('date', np.int32, lambda row, day, team: day),
+        ('home', np.int16, _team('home_team')),
+        ('away', np.int16, _team('away_team')),
+        ('winner', np.int16, _team('winner')),
+        ('first_shooter', np.int16, _optional_team('first_shooter')),
+    ]),
+}
+
+# Columns holding interned strings other than teams: column -> source field
+_LABEL_FIELDS = {'tournament': 'tournament', 'scorer': 'scorer'}
+
+
+class Table:
+    """Memory-mapped columns of one historical dataset"""
+
+    def __init__(self, name, columns, labels):
+        self.name = name
+        self.columns = columns  # column name -> read-only np.memmap
+        self.labels = labels    # column name -> list of strings (tournament, scorer)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __len__(self):
+        return len(self.columns['date'])
+
+
+class History:
+    def __init__(self, data_dir=HISTORY_DIR, cache_dir=HISTORY_CACHE_DIR):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self.former_names_file = os.path.join(data_dir, 'former_names.csv')
+        self._tables = {}
+        self._former = None
+        self.teams = Vocabulary(self._read_json(self._teams_path(), []))
+
+    # ------------------------------------------------------------------
+    # Public access
+    # ------------------------------------------------------------------
+    def table(self, name):
+        """Columns of 'results', 'goalscorers' or 'shootouts' (built if stale)"""
+        stale = self._stale(name)
+        if stale:
+            self._build(name)
+        if stale or name not in self._tables:
+            self._tables[name] = self._load(name)
+        return self._tables[name]
+
+    @property
+    def results(self):
+        return self.table('results')
+
+    @property
+    def goalscorers(self):
+        return self.table('goalscorers')
+
+    @property
+    def shootouts(self):
+        return self.table('shootouts')
+
+    def team_id(self, name, on=None):
+        """ID of a team name (resolved as of ISO date `on` if given), or MISSING"""
+        if on is not None:
+            name = self.former_names.resolve(name, to_ordinal(on))
+        return self.teams.ids.get(name, MISSING)
+
+    def team_name(self, team_id):
+        return self.teams.names[team_id]
+
+    @property
+    def former_names(self):
+        if self._former is None:
+            self._former = FormerNames(self.former_names_file)
+        return self._former
+
+    # ------------------------------------------------------------------
+    # Cache files
+    # ------------------------------------------------------------------
+    def _teams_path(self):
+        return os.path.join(self.cache_dir, 'teams.json')
+
+    @contextmanager
+    def _teams_lock(self):
+        """Exclusive lock on the shared team table (released when the file closes)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(f'{self._teams_path()}.lock', 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _table_dir(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _source_stamp(self, name):
+        """Size and mtime of the files a table is derived from"""
+        stamp = {}
+        for path in (os.path.join(self.data_dir, TABLES[name][0]), self.former_names_file):
+            info = os.stat(path)
+            stamp[os.path.basename(path)] = [info.st_size, info.st_mtime_ns]
+        return stamp
+
+    def _stale(self, name):
+        manifest = self._read_json(os.path.join(self._table_dir(name), 'manifest.json'), None)
+        return (manifest is None
+                or manifest.get('schema') != SCHEMA_VERSION
+                or manifest.get('sources') != self._source_stamp(name))
+
+    @staticmethod
+    def _read_json(path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path, value):
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    # Build / load
+    # ------------------------------------------------------------------
+    def _build(self, name):
+        """Parse a source CSV once and write its columns as .npy files"""
+        source, columns = TABLES[name]
+        former = self.former_names
+
+        labels = {column: Vocabulary() for column, _, parse in columns if parse is None}
+
+        def team(value, day):
+            return self.teams.intern(former.resolve(value, day))
+
+        values = {column: [] for column, _, _ in columns}
+        with self._teams_lock():
+            # Reload the shared team table in case another process extended it
+            self.teams = Vocabulary(self._read_json(self._teams_path(), self.teams.names))
+            with open(os.path.join(self.data_dir, source), 'r', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    day = to_ordinal(row['date'])
+                    for column, _, parse in columns:
+                        if parse is None:
+                            label = row[_LABEL_FIELDS[column]]
+                            values[column].append(labels[column].intern(label))
+                        else:
+                            values[column].append(parse(row, day, team))
+            self._write_json(self._teams_path(), self.teams.names)
+
+        table_dir = self._table_dir(name)
+        os.makedirs(table_dir, exist_ok=True)
+        for column, dtype, _ in columns:
+            path = os.path.join(table_dir, f'{column}.npy')
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                np.save(f, np.array(values[column], dtype=dtype))
+            os.replace(tmp, path)
+
+        # Manifest last: a table without a current manifest is rebuilt
+        self._write_json(os.path.join(table_dir, 'manifest.json'), {
+            'schema': SCHEMA_VERSION,
+            'sources': self._source_stamp(name),
+            'rows': len(values['date']),
+            'labels': {column: vocab.names for column, vocab in labels.items()},
+        })
+
+    def _load(self, name):
+        table_dir = self._table_dir(name)
+        manifest = self._read_json(os.path.join(table_dir, 'manifest.json'), None)
+        self.teams = Vocabulary(self._read_json(self._teams_path(), self.teams.names))
+        columns = {
+            column: np.load(os.path.join(table_dir, f'{column}.npy'), mmap_mode='r')
+            for column, _, _ in TABLES[name][1]
+        }
+        return Table(name, columns, manifest['labels'])
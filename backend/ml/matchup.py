@@ -0,0 +1,173 @@
+"""
+Matchup - Pairwise expected-goals matrix from the trained XGBoost goal models
+
+The two regressors trained in notebooks/ML.ipynb (home goals, away goals) are
+unpickled once per process. For a tournament's teams every ordered pair is
+scored in a single predict call per model, and the result is kept as dense
+team x team matrices so simulations only ever do an index lookup. Matrices
+are persisted under CACHE_DIR, keyed by the model file hashes, the team list
+and the team inputs used.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+from config import CACHE_DIR, MODEL_HOME_FILE, MODEL_AWAY_FILE, RATINGS_FILE, TEAM_ALIASES
+from .features import match_row
+
+
+# Unpickled models by path, loaded once per process
+_MODELS = {}
+
+
+def load_model(path):
+    """Unpickle a trained goal model (cached per process)"""
+    if path not in _MODELS:
+        with open(path, 'rb') as f:
+            _MODELS[path] = pickle.load(f)
+    return _MODELS[path]
+
+
+def file_hash(path):
+    """sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def rating_features(team_names, ratings_file=RATINGS_FILE):
+    """
+    Per-team model inputs from a ratings JSON ({team: elo}); form inputs are
+    left to NEUTRAL_FORM
+
+    Returns:
+        dict: team name -> {'elo': rating}
+    """
+    with open(ratings_file, 'r') as f:
+        ratings = json.load(f)
+    return {name: {'elo': ratings[TEAM_ALIASES.get(name, name)]} for name in team_names}
+
+
+class MatchupMatrix:
+    """Dense expected goals for every ordered pair of teams"""
+
+    def __init__(self, team_names, home_goals, away_goals):
+        self.team_names = list(team_names)
+        self.index = {name: i for i, name in enumerate(self.team_names)}
+        self.home_goals = home_goals  # [i, j] = goals of i hosting j
+        self.away_goals = away_goals  # [i, j] = goals of j visiting i
+
+    def expected_goals(self, team_a, team_b):
+        """(goals of team_a, goals of team_b) with team_a as the nominal home side"""
+        i = self.index[team_a]
+        j = self.index[team_b]
+        return self.home_goals[i, j], self.away_goals[i, j]
+
+    def reindex(self, team_names):
+        """Matrices reordered (and restricted) to the given team order"""
+        order = np.array([self.index[name] for name in team_names])
+        return MatchupMatrix(team_names,
+                             self.home_goals[np.ix_(order, order)],
+                             self.away_goals[np.ix_(order, order)])
+
+    def save(self, path):
+        """Write atomically as .npz"""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, team_names=np.array(self.team_names),
+                     home_goals=self.home_goals, away_goals=self.away_goals)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['team_names'].tolist(), data['home_goals'], data['away_goals'])
+
+
+class MatchupModel:
+    def __init__(self, home_file=MODEL_HOME_FILE, away_file=MODEL_AWAY_FILE,
+                 cache_dir=CACHE_DIR):
+        self.home_file = home_file
+        self.away_file = away_file
+        self.cache_dir = cache_dir
+        self.model_home = load_model(home_file)
+        self.model_away = load_model(away_file)
+        self.model_hash = hashlib.sha256(
+            (file_hash(home_file) + file_hash(away_file)).encode()).hexdigest()
+
+    def cache_key(self, team_names, team_features, neutral=True, tournament='FIFA World Cup'):
+        """Key of a matrix: model hashes, team list and every input that shapes it"""
+        payload = json.dumps({
+            'model': self.model_hash,
+            'teams': list(team_names),
+            'features': [team_features[name] for name in team_names],
+            'neutral': neutral,
+            'tournament': tournament,
+        }, sort_keys=True, default=float)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def predict_matrix(self, team_names, team_features, neutral=True,
+                       tournament='FIFA World Cup'):
+        """
+        Batch-predict expected goals for every ordered pair of teams
+
+        Args:
+            team_names: Teams of the tournament
+            team_features: team name -> per-team inputs (see features.TEAM_FEATURES)
+            neutral: Neutral-ground flag for every pairing
+            tournament: Tournament name for the importance weight
+
+        Returns:
+            MatchupMatrix
+        """
+        n = len(team_names)
+        pairs = [(i, j) for i in range(n) for j in range(n) if i != j]
+        rows = np.array([
+            match_row(team_names[i], team_names[j],
+                      team_features[team_names[i]], team_features[team_names[j]],
+                      neutral, tournament)
+            for i, j in pairs
+        ], dtype=np.float32)
+
+        # One inference call per model for the whole tournament
+        home_pred = np.clip(self.model_home.predict(rows), 0, None)
+        away_pred = np.clip(self.model_away.predict(rows), 0, None)
+
+        home_goals = np.zeros((n, n))
+        away_goals = np.zeros((n, n))
+        index = np.array(pairs).T
+        home_goals[index[0], index[1]] = home_pred
+        away_goals[index[0], index[1]] = away_pred
+        return MatchupMatrix(team_names, home_goals, away_goals)
+
+    def matrix(self, team_names, team_features=None, neutral=True,
+               tournament='FIFA World Cup'):
+        """
+        Matrix for a tournament, from CACHE_DIR when an identical one was built
+
+        Args:
+            team_names: Teams of the tournament
+            team_features: team name -> per-team inputs, e.g.
+                FeatureStore.team_features (default: rating_features)
+            neutral, tournament: Match context shared by every pairing
+
+        Returns:
+            MatchupMatrix
+        """
+        team_names = list(team_names)
+        if team_features is None:
+            team_features = rating_features(team_names)
+
+        key = self.cache_key(team_names, team_features, neutral, tournament)
+        path = os.path.join(self.cache_dir, f'matchup-{key}.npz')
+        if os.path.exists(path):
+            return MatchupMatrix.load(path)
+
+        matrix = self.predict_matrix(team_names, team_features, neutral, tournament)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        matrix.save(path)
+        return matrix
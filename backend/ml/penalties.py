@@ -0,0 +1,151 @@
+"""
+Penalties - Shootout win model fitted on shootouts.csv
+
+A two-coefficient logistic model with no intercept (it is symmetric in
+the two sides):
+
+    P(A wins) = sigmoid(b_elo * (elo_A - elo_B) / 100 + b_first * first)
+
+elo_A - elo_B is the Elo gap on the eve of the match (one replay of the
+results history with EloEngine), first is +1 if A took the first kick, -1
+if B did and 0 where shootouts.csv does not say.
+
+In a simulation the coin toss is still to come, so win_probability
+averages the two orders and works on the simulator's 0-100 scale (mapped
+back through SIM_ELO_FLOOR / SIM_ELO_CEILING). It is the shootout model
+sim.ShootoutTable expects (TournamentEngine.use_shootout_model).
+"""
+
+import json
+import math
+import os
+import numpy as np
+from config import SHOOTOUT_MODEL_FILE, SIM_ELO_CEILING, SIM_ELO_FLOOR
+from .elo import EloEngine
+from .history import History, MISSING
+
+
+SHOOTOUT_MODEL_VERSION = 1
+RIDGE = 1e-3        # L2 penalty keeping the fit finite on tiny samples
+NEWTON_STEPS = 25
+
+
+def _sigmoid(x):
+    return 1 / (1 + math.exp(-x))
+
+
+def shootout_samples(history):
+    """
+    (elo_diff, first, won) rows, one per shootout found in the results
+
+    The rating gap is taken before the match itself is applied. Shootouts
+    without a matching results row are skipped.
+    """
+    shootouts = history.shootouts
+    results = history.results
+    names = history.teams.names
+    pending = {
+        (day, home, away): (winner, first)
+        for day, home, away, winner, first in zip(*(shootouts[c].tolist() for c in
+                                                    ('date', 'home', 'away', 'winner',
+                                                     'first_shooter')))
+    }
+
+    elo = EloEngine(checkpoint_file=None)
+    tournaments = results.labels['tournament']
+    samples = []
+    columns = [results[c].tolist() for c in
+               ('date', 'home', 'away', 'home_score', 'away_score', 'tournament', 'neutral')]
+    for day, home, away, home_score, away_score, tournament, neutral in zip(*columns):
+        home_name, away_name = names[home], names[away]
+        shootout = pending.pop((day, home, away), None)
+        if shootout is not None:
+            winner, first = shootout
+            diff = elo.rating(home_name) - elo.rating(away_name)
+            side = 0 if first == MISSING else 1 if first == home else -1
+            samples.append((diff, side, int(winner == home)))
+        elo.rate_match(home_name, away_name, home_score, away_score,
+                       tournaments[tournament], neutral)
+    return samples
+
+
+class ShootoutModel:
+    def __init__(self, elo_coef=0.0, first_coef=0.0, samples=0, log_loss=None):
+        self.elo_coef = elo_coef      # Per 100 Elo points of gap
+        self.first_coef = first_coef  # Kicking first
+        self.samples = samples
+        self.log_loss = log_loss      # In-sample, per shootout
+
+    @classmethod
+    def fit(cls, history=None):
+        """Fit on every shootout in the history (Newton's method, light ridge)"""
+        rows = shootout_samples(history or History())
+        if not rows:
+            return cls()
+        data = np.array(rows, dtype=np.float64)
+        x = np.column_stack([data[:, 0] / 100, data[:, 1]])
+        y = data[:, 2]
+        coef = np.zeros(2)
+        for _ in range(NEWTON_STEPS):
+            p = 1 / (1 + np.exp(-x @ coef))
+            gradient = x.T @ (p - y) + RIDGE * coef
+            hessian = (x * (p * (1 - p))[:, None]).T @ x + RIDGE * np.eye(2)
+            step = np.linalg.solve(hessian, gradient)
+            coef -= step
+            if np.abs(step).max() < 1e-10:
+                break
+        p = np.clip(1 / (1 + np.exp(-x @ coef)), 1e-12, 1 - 1e-12)
+        log_loss = float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+        return cls(float(coef[0]), float(coef[1]), len(rows), log_loss)
+
+    def probability(self, elo_diff, first=0):
+        """P(A wins) for an Elo gap elo_A - elo_B and first = +1 / -1 / 0"""
+        return _sigmoid(self.elo_coef * elo_diff / 100 + self.first_coef * first)
+
+    def win_probability(self, elo_a, elo_b):
+        """P(team_a wins) on the simulator's 0-100 scale, before the coin toss"""
+        diff = (elo_a - elo_b) * (SIM_ELO_CEILING - SIM_ELO_FLOOR) / 100
+        return (self.probability(diff, 1) + self.probability(diff, -1)) / 2
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def to_dict(self):
+        return {'elo_coef': self.elo_coef, 'first_coef': self.first_coef,
+                'samples': self.samples, 'log_loss': self.log_loss}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['elo_coef'], data['first_coef'], data['samples'], data['log_loss'])
+
+    def save(self, path, sources=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': SHOOTOUT_MODEL_VERSION, 'sources': sources,
+                       **self.to_dict()}, f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def cached(cls, path=SHOOTOUT_MODEL_FILE, history=None):
+        """The model saved at path, refitted when results.csv or shootouts.csv changed"""
+        history = history or History()
+        sources = {}
+        for name in ('results.csv', 'shootouts.csv'):
+            info = os.stat(os.path.join(history.data_dir, name))
+            sources[name] = [info.st_size, info.st_mtime_ns]
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == SHOOTOUT_MODEL_VERSION and data.get('sources') == sources:
+                return cls.from_dict(data)
+        model = cls.fit(history)
+        model.save(path, sources)
+        return model
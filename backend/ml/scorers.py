@@ -0,0 +1,184 @@
+"""
+Scorers - Per-team goalscorer distributions from goalscorers.csv
+
+Every goal a team scored in the history counts towards one outcome slot,
+weighted by recency (half-life HALF_LIFE_DAYS; goals older than
+MAX_AGE_DAYS are dropped):
+
+    own goal            credited to the team, put in by an opponent
+    penalty by player   one slot per penalty scorer
+    open play by player one slot per scorer
+
+Each team's slots are precomputed into a Walker alias table, so drawing a
+goal's scorer and kind costs one uniform and one lookup whatever the squad
+size. TeamScorers samples single goals (Match events); ScorerModel.arrays
+stacks every team's table into flat numpy arrays for batch draws
+(sim.golden_boot).
+"""
+
+import numpy as np
+from config import TEAM_ALIASES
+from .history import History, to_ordinal
+
+
+HALF_LIFE_DAYS = 730
+MAX_AGE_DAYS = 8 * 365
+
+# Slot kinds
+OPEN_PLAY, PENALTY, OWN_GOAL = 0, 1, 2
+KIND_NAMES = ('open_play', 'penalty', 'own_goal')
+
+
+class AliasTable:
+    """Walker alias table over len(weights) outcomes"""
+
+    __slots__ = ('prob', 'alias', 'n')
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(weights)
+        if n == 0 or weights.sum() <= 0:
+            raise ValueError('An alias table needs a positive weight')
+        scaled = weights * n / weights.sum()
+        prob = np.ones(n)
+        alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            s, g = small.pop(), large[-1]
+            prob[s] = scaled[s]
+            alias[s] = g
+            scaled[g] -= 1 - scaled[s]
+            if scaled[g] < 1:
+                small.append(large.pop())
+        # Leftovers are 1 up to rounding
+        self.prob = prob.tolist()
+        self.alias = alias.tolist()
+        self.n = n
+
+    def sample(self, u):
+        """Outcome index from one uniform in [0, 1)"""
+        x = u * self.n
+        i = int(x)
+        return i if x - i < self.prob[i] else self.alias[i]
+
+
+class TeamScorers:
+    """One team's goal outcomes: slot -> (player or None for own goals, kind)"""
+
+    __slots__ = ('team', 'players', 'slot_player', 'slot_kind', 'table')
+
+    def __init__(self, team, players, slot_player, slot_kind, weights):
+        self.team = team
+        self.players = players          # Scorer names, index = player ID within the team
+        self.slot_player = slot_player  # Player ID per slot (-1 = own goal)
+        self.slot_kind = slot_kind      # OPEN_PLAY / PENALTY / OWN_GOAL per slot
+        self.table = AliasTable(weights)
+
+    def sample(self, u):
+        """(scorer name or None, kind name) of one goal from one uniform"""
+        slot = self.table.sample(u)
+        player = self.slot_player[slot]
+        return (self.players[player] if player >= 0 else None), KIND_NAMES[self.slot_kind[slot]]
+
+
+class ScorerModel:
+    def __init__(self, teams, as_of):
+        self.teams = teams  # team name -> TeamScorers
+        self.as_of = as_of  # Day ordinal the recency weights count back from
+
+    @classmethod
+    def fit(cls, as_of, history=None, half_life=HALF_LIFE_DAYS, max_age=MAX_AGE_DAYS):
+        """
+        Distributions from the goalscorers history
+
+        Args:
+            as_of: ISO date or day ordinal; only earlier goals count. Pass the
+                fixture's kickoff (TournamentEngine.kickoff) so a past
+                tournament is not simulated with later squads
+            history: ml.History (default: HISTORY_DIR)
+        """
+        history = history or History()
+        goals = history.goalscorers
+        names = history.teams.names
+        scorers = goals.labels['scorer']
+        day = np.asarray(goals['date'])
+        if isinstance(as_of, str):
+            as_of = to_ordinal(as_of)
+
+        age = as_of - day
+        keep = (age > 0) & (age <= max_age)
+        weight = 0.5 ** (age[keep] / half_life)
+        kind = np.where(np.asarray(goals['own_goal'])[keep], OWN_GOAL,
+                        np.where(np.asarray(goals['penalty'])[keep], PENALTY, OPEN_PLAY))
+        team = np.asarray(goals['team'])[keep]
+        scorer = np.asarray(goals['scorer'])[keep]
+
+        # Sum weights per (team, kind, scorer); own goals pool into one slot
+        scorer = np.where(kind == OWN_GOAL, -1, scorer)
+        keys, inverse = np.unique(np.stack([team, kind, scorer]), axis=1, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=weight)
+
+        slots = {}
+        for (team_id, slot_kind, scorer_id), total in zip(keys.T.tolist(), totals.tolist()):
+            slots.setdefault(names[team_id], []).append((slot_kind, scorer_id, total))
+
+        teams = {}
+        for name, team_slots in slots.items():
+            players = []
+            ids = {}
+            slot_player, slot_kind, weights = [], [], []
+            for kind_code, scorer_id, total in team_slots:
+                if scorer_id < 0:
+                    player = -1
+                else:
+                    if scorer_id not in ids:
+                        ids[scorer_id] = len(players)
+                        players.append(scorers[scorer_id])
+                    player = ids[scorer_id]
+                slot_player.append(player)
+                slot_kind.append(kind_code)
+                weights.append(total)
+            teams[name] = TeamScorers(name, players, slot_player, slot_kind, weights)
+        return cls(teams, as_of)
+
+    def team(self, name):
+        """TeamScorers of a team (fixture spellings resolved), or None without history"""
+        return self.teams.get(TEAM_ALIASES.get(name, name))
+
+    def arrays(self, team_names):
+        """
+        Every team's alias table stacked for batch sampling
+
+        Returns:
+            dict of numpy arrays: 'offset' and 'size' per team (size 0 = no
+            history), per slot 'prob', 'alias' (absolute slot index),
+            'player' (index into 'players', -1 = own goal) and 'kind';
+            plus 'players' and 'player_team' lists
+        """
+        offset, size = [], []
+        prob, alias, player, kind = [], [], [], []
+        players, player_team = [], []
+        for name in team_names:
+            scorers = self.team(name)
+            offset.append(len(prob))
+            if scorers is None:
+                size.append(0)
+                continue
+            size.append(scorers.table.n)
+            prob += scorers.table.prob
+            alias += [offset[-1] + a for a in scorers.table.alias]
+            player += [len(players) + p if p >= 0 else -1 for p in scorers.slot_player]
+            kind += scorers.slot_kind
+            players += scorers.players
+            player_team += [name] * len(scorers.players)
+        return {
+            'offset': np.array(offset, dtype=np.int64),
+            'size': np.array(size, dtype=np.int64),
+            'prob': np.array(prob, dtype=np.float64),
+            'alias': np.array(alias, dtype=np.int64),
+            'player': np.array(player, dtype=np.int64),
+            'kind': np.array(kind, dtype=np.int8),
+            'players': players,
+            'player_team': player_team,
+        }
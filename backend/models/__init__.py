@@ -1,10 +1,10 @@
 from .stats import Stats
 from .team import Team
-from .match import EventType, MatchEvent, MatchState, MatchResult, Match
+from .match import EventType, MatchEvent, MatchState, MatchResult, TimelineView, Match
 from .group import Group
 from .bracket import BracketNode
 
 __all__ = [
     'Stats', 'Team', 'EventType', 'MatchEvent', 'MatchState',
-    'MatchResult', 'Match', 'Group', 'BracketNode'
+    'MatchResult', 'TimelineView', 'Match', 'Group', 'BracketNode'
 ]
@@ -19,6 +19,6 @@ class BracketNode:
                 self.winner = self.match.team_a
             elif self.match.result == MatchResult.B_WIN:
                 self.winner = self.match.team_b
-            elif self.match.penalties_result:
-                self.winner = self.match.penalties_result[2]
+            elif self.match.shootout_winner:
+                self.winner = self.match.shootout_winner
         return self.winner
@@ -19,12 +19,64 @@ class Group:
                 match = Match(self.teams[i], self.teams[j], is_group=True)
                 self.matches.append(match)
 
-    def compute_standings(self):
-        """Sort teams by points, then goal diff"""
-        sorted_teams = sorted(
-            self.teams,
-            key=lambda t: (t.points, t.goal_diff),
-            reverse=True
-        )
+    def reset(self):
+        """Drop scheduled matches and standings from a previous run"""
+        self.matches = []
+        self.standings = None
+
+    def table(self):
+        """
+        Group record of every team from the played matches
+
+        Returns:
+            dict: team -> {'points', 'goal_difference', 'goals_for', 'fair_play'}
+            (fair play: -1 per yellow card, -4 per red card)
+        """
+        table = {team: {'points': 0, 'goal_difference': 0, 'goals_for': 0, 'fair_play': 0}
+                 for team in self.teams}
+        for match in self.matches:
+            for team, (gf, ga), yellow, red in (
+                    (match.team_a, match.final_score, match.yellow_a, match.red_a),
+                    (match.team_b, match.final_score[::-1], match.yellow_b, match.red_b)):
+                record = table[team]
+                record['points'] += 3 if gf > ga else 1 if gf == ga else 0
+                record['goal_difference'] += gf - ga
+                record['goals_for'] += gf
+                record['fair_play'] -= yellow + 4 * red
+        return table
+
+    def compute_standings(self, tiebreakers=('points', 'goal_difference'), qualifiers=2):
+        """
+        Sort teams by the tiebreakers in order and return the top qualifiers
+
+        tiebreakers: criteria of sim.formats.TIEBREAKERS; head_to_head ranks the
+            teams level on the criteria before it by their matches against each
+            other. Teams level on everything keep group order.
+        """
+        if tiebreakers == ('points', 'goal_difference'):
+            keys = {team: (team.points, team.goal_diff) for team in self.teams}
+        else:
+            table = self.table()
+            keys = {team: () for team in self.teams}
+            for criterion in tiebreakers:
+                if criterion == 'head_to_head':
+                    keys = self._head_to_head(keys)
+                else:
+                    keys = {team: key + (table[team][criterion],) for team, key in keys.items()}
+        sorted_teams = sorted(self.teams, key=keys.get, reverse=True)
         self.standings = sorted_teams
-        return sorted_teams[:2]  # Return top 2 qualifiers
+        return sorted_teams[:qualifiers]
+
+    def _head_to_head(self, keys):
+        """keys extended by points, goal diff and goals in matches between level teams"""
+        mini = {team: [0, 0, 0] for team in self.teams}
+        for match in self.matches:
+            if keys[match.team_a] != keys[match.team_b]:
+                continue
+            for team, (gf, ga) in ((match.team_a, match.final_score),
+                                   (match.team_b, match.final_score[::-1])):
+                record = mini[team]
+                record[0] += 3 if gf > ga else 1 if gf == ga else 0
+                record[1] += gf - ga
+                record[2] += gf
+        return {team: key + tuple(mini[team]) for team, key in keys.items()}
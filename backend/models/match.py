@@ -1,12 +1,89 @@
 """
-Match simulation classes - EventType, MatchEvent, MatchState, MatchResult, Match
+Match simulation classes - EventType, MatchEvent, MatchState, MatchResult,
+TimelineView, Match
 """
 
+from collections.abc import Sequence
 from enum import Enum
+from functools import lru_cache
+import math
 import random
 import time
 
 
+# Cap on goals drawn from a model's expected-goals rate
+MAX_MODEL_GOALS = 15
+
+# Cards per match: 0-MAX_YELLOWS yellows, a red with probability RED_CARD_RATE
+MAX_YELLOWS = 4
+RED_CARD_RATE = 0.08
+
+# Shootouts: at least SHOOTOUT_ROUNDS rounds, then sudden death. Replays of
+# sides the Elo kick rule can never separate (a coin toss in
+# penalty_win_probability) score each kick with this probability instead
+PENALTY_CONVERSION = 0.75
+SHOOTOUT_ROUNDS = 5
+
+
+def poisson_goals(mean, u):
+    """Inverse-CDF Poisson draw from one uniform, capped at MAX_MODEL_GOALS"""
+    k = 0
+    p = math.exp(-mean)
+    cdf = p
+    while u > cdf and k < MAX_MODEL_GOALS:
+        k += 1
+        p *= mean / k
+        cdf += p
+    return k
+
+
+def _kick_values(elo):
+    """P(kick worth 0, 1, 2) under the original rule int(0.92 + u * elo / 100)"""
+    elo = max(elo, 1e-9)
+    p1 = min(1.0, max(0.0, 1 - 8 / elo))
+    p2 = min(1.0, max(0.0, 1 - 108 / elo))
+    return 1 - p1, p1 - p2, p2
+
+
+def _kick(kick, u):
+    """Value of one kick with P(0, 1, 2) = kick, from one uniform"""
+    return 0 if u < kick[0] else 1 if u < kick[0] + kick[1] else 2
+
+
+@lru_cache(maxsize=65536)
+def penalty_win_probability(elo_a, elo_b):
+    """
+    P(team_a wins a shootout) under the original Elo kick rule, in closed form
+
+    Five kicks a side scoring int(0.92 + u * elo / 100) each, then rounds
+    until the totals differ. Sides that can never separate get a coin toss.
+    """
+    kick_a = _kick_values(elo_a)
+    kick_b = _kick_values(elo_b)
+
+    def five_kicks(kick):
+        total = [1.0]
+        for _ in range(SHOOTOUT_ROUNDS):
+            total = [sum(total[i] * kick[k - i] for i in range(len(total)) if 0 <= k - i < 3)
+                     for k in range(len(total) + 2)]
+        return total
+
+    a_ahead = level = 0.0
+    for ka, pa in enumerate(five_kicks(kick_a)):
+        for kb, pb in enumerate(five_kicks(kick_b)):
+            if ka > kb:
+                a_ahead += pa * pb
+            elif ka == kb:
+                level += pa * pb
+
+    # Sudden death: the first decisive round settles it
+    round_a = kick_a[1] * kick_b[0] + kick_a[2] * (kick_b[0] + kick_b[1])
+    round_b = kick_b[1] * kick_a[0] + kick_b[2] * (kick_a[0] + kick_a[1])
+    decisive = round_a + round_b
+    sudden_death = round_a / decisive if decisive > 0 else 0.5
+    return a_ahead + level * sudden_death
+
+
 # ============================================================================
 # EventType Enum - Types of match events
 # ============================================================================
@@ -25,12 +102,14 @@ class EventType(Enum):
 # MatchEvent Class - Represents timeline events in a match
 # ============================================================================
 class MatchEvent:
+    __slots__ = ('minute', 'type', 'team', 'player', 'meta')
+
     def __init__(self, minute, event_type, team, player=None, meta=None):
         self.minute = minute
         self.type = event_type
         self.team = team  # Reference to Team object
         self.player = player  # Optional string
-        self.meta = meta or {}  # e.g., {'shot_xg': 0.3, 'assist': 'Player X'}
+        self.meta = meta or {}  # Optional dict, e.g. {'shot_xg': 0.3, 'assist': 'Player X'}
 
     def apply_to(self, match_state):
         """Update transient match state"""
@@ -63,6 +142,10 @@ class MatchEvent:
 # MatchState Class - Transient value object used during match simulation
 # ============================================================================
 class MatchState:
+    __slots__ = ('team_a', 'team_b', 'current_minute', 'score_a', 'score_b',
+                 'attack_mod_a', 'def_mod_a', 'attack_mod_b', 'def_mod_b',
+                 'red_cards_a', 'red_cards_b', 'yellow_a', 'yellow_b', 'momentum')
+
     def __init__(self, team_a, team_b):
         self.team_a = team_a
         self.team_b = team_b
@@ -99,111 +182,291 @@ class MatchResult(Enum):
     DRAW = "DRAW"
 
 
+# ============================================================================
+# TimelineView - What generate_timeline returns
+# ============================================================================
+class TimelineView(Sequence):
+    """
+    Read-only sequence of a match's events
+
+    Indexing, iterating or measuring it reads match.events, so the timeline
+    is only built if the caller of generate_timeline actually uses it.
+    """
+
+    __slots__ = ('_match',)
+
+    def __init__(self, match):
+        self._match = match
+
+    def __getitem__(self, index):
+        return self._match.events[index]
+
+    def __len__(self):
+        return len(self._match.events)
+
+    def __eq__(self, other):
+        if isinstance(other, TimelineView):
+            other = other._match.events
+        return self._match.events == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._match.events)
+
+
 # ============================================================================
 # Match Class - Manages match simulation and events
 # ============================================================================
 class Match:
+    """
+    One fixture
+
+    generate_timeline draws only the score and the card counts. The
+    minute-level events are rebuilt from a stored seed the first time
+    `events` is read (replays, exports), so matches simulated for their
+    result alone never allocate events or a MatchState.
+    """
+
+    __slots__ = ('team_a', 'team_b', 'is_group', 'scheduled_minute_range',
+                 'final_score', 'result', 'shootout_winner',
+                 'match_state', 'yellow_a', 'yellow_b', 'red_a', 'red_b',
+                 '_score', '_timeline_seed', '_events', '_shootout_seed', '_penalty_rounds')
+
     def __init__(self, team_a, team_b, is_group=True):
         self.team_a = team_a
         self.team_b = team_b
         self.is_group = is_group
         self.scheduled_minute_range = 90
 
-        self.events = []
         self.final_score = None  # (int, int)
         self.result = None  # MatchResult enum
-        self.penalties_result = None  # Optional (score_a, score_b, winner)
-
-        self.match_state = None  # Created during play
-
-    def generate_timeline(self, sim_params=None):
+        self.shootout_winner = None  # Team, when a shootout was played
+        self._shootout_seed = None
+        self._penalty_rounds = None
+
+        # Drawn by generate_timeline
+        self.yellow_a = self.yellow_b = 0
+        self.red_a = self.red_b = 0
+        self._score = None
+        self._timeline_seed = None
+        self._events = None
+
+        self.match_state = None  # Created when events are replayed
+
+    @property
+    def events(self):
+        """Timeline sorted by minute, built on first access"""
+        if self._events is None:
+            self._events = self._build_events() if self._timeline_seed is not None else []
+        return self._events
+
+    @events.setter
+    def events(self, events):
+        self._events = events
+        self._score = None
+        self._timeline_seed = None
+
+    @property
+    def penalty_rounds(self):
+        """Running (pen_a, pen_b) after each shootout round, built on first access"""
+        if self.shootout_winner is None:
+            return ()
+        if self._penalty_rounds is None:
+            self._penalty_rounds = self._build_penalty_rounds()
+        return self._penalty_rounds
+
+    @property
+    def penalties_result(self):
+        """(score_a, score_b, winner) of the shootout, or None"""
+        if self.shootout_winner is None:
+            return None
+        pen_a, pen_b = self.penalty_rounds[-1]
+        return pen_a, pen_b, self.shootout_winner
+
+    def generate_timeline(self, sim_params=None, rng=random, expected_goals=None):
         #Generate events based on team ELOs - preserves original scoring formula
-        score_a = int(6 * random.random() * self.team_a.elo / 100)
-        score_b = int(6 * random.random() * self.team_b.elo / 100)
-
-        # Apply ELO swing logic from original (upset avoidance)
-        if score_a == score_b and self.team_b.elo - self.team_a.elo > 20:
-            if random.random() > 0.01:
-                score_a = int(6 * random.random() * self.team_a.elo / 100)
-        if score_a > score_b and self.team_b.elo - self.team_a.elo > 20:
-            if random.random() > 0.01:
-                score_a, score_b = score_b, score_a
-
+        # rng: random.Random instance (or the random module) driving all draws
+        # expected_goals: optional (goals_a, goals_b) means from a matchup model;
+        #   when given, scores are Poisson draws instead of the ELO formula
+        # Returns the events as a TimelineView, built only if it is read
+        if expected_goals is not None:
+            score_a = poisson_goals(expected_goals[0], rng.random())
+            score_b = poisson_goals(expected_goals[1], rng.random())
+        else:
+            rate = sim_params['base_goal_rate'] if sim_params else 6
+            score_a = int(rate * rng.random() * self.team_a.elo / 100)
+            score_b = int(rate * rng.random() * self.team_b.elo / 100)
+
+            # Apply ELO swing logic from original (upset avoidance)
+            if score_a == score_b and self.team_b.elo - self.team_a.elo > 20:
+                if rng.random() > 0.01:
+                    score_a = int(rate * rng.random() * self.team_a.elo / 100)
+            if score_a > score_b and self.team_b.elo - self.team_a.elo > 20:
+                if rng.random() > 0.01:
+                    score_a, score_b = score_b, score_a
+        self._score = (score_a, score_b)
+
+        # Cards: 0-4 yellows and a red in ~8% of matches (FIXED: indentation
+        # bug from line 202); one bit per card picks the side, bit 4 the red's
+        yellow_count = rng.randint(0, MAX_YELLOWS)
+        red = rng.random() < RED_CARD_RATE
+        sides = rng.getrandbits(5)
+        self.yellow_a = (sides & ((1 << yellow_count) - 1)).bit_count()
+        self.yellow_b = yellow_count - self.yellow_a
+        self.red_a = int(red and not sides & 16)
+        self.red_b = int(red and bool(sides & 16))
+
+        # Minutes are drawn from their own stream only if someone asks
+        self._timeline_seed = rng.getrandbits(32)
+        self._events = None
+        return TimelineView(self)
+
+    def _build_events(self):
+        """Timeline consistent with the drawn score and cards"""
+        rng = random.Random(self._timeline_seed)
+        events = []
         # Create goal events at random minutes
-        self.events = []
-        for i in range(score_a):
-            minute = int(random.random() * 90)
-            self.events.append(MatchEvent(minute, EventType.GOAL, self.team_a))
-        for i in range(score_b):
-            minute = int(random.random() * 90)
-            self.events.append(MatchEvent(minute, EventType.GOAL, self.team_b))
-
-        # Add cards
-        yellow_count = random.randint(0, 4)
-        for _ in range(yellow_count):
-            minute = random.randint(1, 90)
-            team = random.choice([self.team_a, self.team_b])
-            self.events.append(MatchEvent(minute, EventType.YELLOW, team))
-
-        # Red card logic (FIXED: indentation bug from line 202)
-        red_chance = random.random()
-        if red_chance < 0.08:  # ~8% of matches have a red
-            minute = random.randint(20, 85)
-            team = random.choice([self.team_a, self.team_b])
-            self.events.append(MatchEvent(minute, EventType.RED, team))
-
-        self.events.sort(key=lambda e: e.minute)
-        return self.events
-
-    def play(self, replay_mode=True, delay=0.1):
+        for team, goals in ((self.team_a, self._score[0]), (self.team_b, self._score[1])):
+            for _ in range(goals):
+                events.append(MatchEvent(int(rng.random() * 90), EventType.GOAL, team))
+        for team, yellows in ((self.team_a, self.yellow_a), (self.team_b, self.yellow_b)):
+            for _ in range(yellows):
+                events.append(MatchEvent(rng.randint(1, 90), EventType.YELLOW, team))
+        if self.red_a or self.red_b:
+            team = self.team_a if self.red_a else self.team_b
+            events.append(MatchEvent(rng.randint(20, 85), EventType.RED, team))
+
+        # Scorers come last so minutes and cards match a run without scorer tables
+        for event in events:
+            if event.type == EventType.GOAL and event.team.scorers is not None:
+                player, kind = event.team.scorers.sample(rng.random())
+                event.player = player
+                if kind != 'open_play':
+                    event.meta = {kind: True}
+
+        events.sort(key=lambda e: e.minute)
+        return events
+
+    def play(self, replay_mode=True, delay=0.1, verbose=True):
         """Replay events minute by minute or finalize immediately"""
-        # Create transient match state
-        self.match_state = MatchState(self.team_a, self.team_b)
-
-        # Replay events
-        if replay_mode:
+        if replay_mode or self._score is None:
+            # Replay events on a transient match state
+            self.match_state = MatchState(self.team_a, self.team_b)
             for event in self.events:
                 event.apply_to(self.match_state)
-                time.sleep(delay)
+                if replay_mode:
+                    time.sleep(delay)
+            self._finalize((self.match_state.score_a, self.match_state.score_b))
         else:
-            # Immediate finalization
-            for event in self.events:
-                event.apply_to(self.match_state)
+            # Immediate finalization from the drawn score
+            self._finalize(self._score)
 
-        self.final_score = (self.match_state.score_a, self.match_state.score_b)
+        # Print match result (preserve original format)
+        if verbose:
+            print(f"{self.team_a.name} - {self.team_b.name} {self.final_score[0]} - {self.final_score[1]}")
+
+    async def replay(self, clock):
+        """
+        Async stream of (event, state) pairs, paced by a shared sim.replay.ReplayClock
+
+        Each event is yielded once the clock reaches its minute, with the
+        stream's own MatchState after applying it (so several viewers can
+        replay the same match at once). Full time is at minute 90, then any
+        shootout rounds follow as PENALTY_TAKEN events at minutes 91, 92, ...
+        (meta holds the round and running score). Nothing blocks the event
+        loop; the outcome is the one already drawn, as with
+        play(replay_mode=False).
+        """
+        state = MatchState(self.team_a, self.team_b)
+        for event in self.events:
+            await clock.wait_for(event.minute)
+            state.current_minute = event.minute
+            event.apply_to(state)
+            yield event, state
+
+        await clock.wait_for(self.scheduled_minute_range)
+        state.current_minute = self.scheduled_minute_range
+        self.match_state = state
+        self._finalize((state.score_a, state.score_b))
+
+        for i, (pen_a, pen_b) in enumerate(self.penalty_rounds, start=1):
+            minute = self.scheduled_minute_range + i
+            await clock.wait_for(minute)
+            state.current_minute = minute
+            yield MatchEvent(minute, EventType.PENALTY_TAKEN, None,
+                             meta={'round': i, 'score': (pen_a, pen_b)}), state
+
+    def _finalize(self, score):
+        """Final score and result"""
+        self.final_score = score
 
         # Determine result
-        if self.match_state.score_a > self.match_state.score_b:
+        if score[0] > score[1]:
             self.result = MatchResult.A_WIN
-        elif self.match_state.score_b > self.match_state.score_a:
+        elif score[1] > score[0]:
             self.result = MatchResult.B_WIN
         else:
             self.result = MatchResult.DRAW
 
-        # Print match result (preserve original format)
-        print(f"{self.team_a.name} - {self.team_b.name} {self.final_score[0]} - {self.final_score[1]}")
-
-    def play_penalties(self, delay=0.1):
-        """Preserve original penalty logic"""
-        print(" play penalties")
-        i = 0
-        pen_a = 0
-        pen_b = 0
-        pen_diff = 0
-
-        while pen_diff < 1 or i < 5:
-            pen_a = int(0.92 + random.random() * self.team_a.elo / 100) + pen_a
-            pen_b = int(0.92 + random.random() * self.team_b.elo / 100) + pen_b
-            pen_diff = abs(pen_a - pen_b)
-            i += 1
-            time.sleep(delay)
-            print(pen_a, pen_b, i)
-
-        winner = self.team_a if pen_a > pen_b else self.team_b
-        print(f"Penalty score {self.team_a.name} {pen_a} {self.team_b.name} {pen_b}")
-
-        self.penalties_result = (pen_a, pen_b, winner)
-        return winner
+    def play_penalties(self, delay=0, rng=random, verbose=True, on_round=None,
+                       win_probability=None):
+        """
+        Decide a shootout with one draw
+
+        win_probability: P(team_a wins), e.g. from a sim.shootout.ShootoutTable
+            (None = the original Elo kick rule, penalty_win_probability)
+        on_round: optional callback(number, pen_a, pen_b) after each round
+        delay: seconds to pause after each replayed round (0 = no pause)
+
+        The kick-by-kick sequence is only built when something asks for it
+        (verbose, on_round, penalty_rounds), conditioned on the winner.
+        """
+        if win_probability is None:
+            win_probability = penalty_win_probability(self.team_a.elo, self.team_b.elo)
+        u = rng.random()
+        self.shootout_winner = self.team_a if u < win_probability else self.team_b
+        self._shootout_seed = u
+        self._penalty_rounds = None
+
+        if verbose or on_round is not None or delay:
+            if verbose:
+                print(" play penalties")
+            for i, (pen_a, pen_b) in enumerate(self.penalty_rounds, start=1):
+                if delay:
+                    time.sleep(delay)
+                if on_round is not None:
+                    on_round(i, pen_a, pen_b)
+                if verbose:
+                    print(pen_a, pen_b, i)
+            if verbose:
+                pen_a, pen_b, _ = self.penalties_result
+                print(f"Penalty score {self.team_a.name} {pen_a} {self.team_b.name} {pen_b}")
+        return self.shootout_winner
+
+    def _build_penalty_rounds(self):
+        """
+        Kick sequence ending in a win for shootout_winner (rejection sampling)
+
+        Kicks follow the Elo rule penalty_win_probability is computed from,
+        so the replayed scores are those of the shootouts it decides.
+        """
+        rng = random.Random(self._shootout_seed)
+        a_wins = self.shootout_winner is self.team_a
+        kick_a = _kick_values(self.team_a.elo)
+        kick_b = _kick_values(self.team_b.elo)
+        if kick_a == kick_b and max(kick_a) == 1:
+            # Every kick worth the same on both sides: never decided by the rule
+            kick_a = kick_b = (1 - PENALTY_CONVERSION, PENALTY_CONVERSION, 0)
+        while True:
+            rounds = []
+            pen_a = pen_b = 0
+            while len(rounds) < SHOOTOUT_ROUNDS or pen_a == pen_b:
+                pen_a += _kick(kick_a, rng.random())
+                pen_b += _kick(kick_b, rng.random())
+                rounds.append((pen_a, pen_b))
+            if (pen_a > pen_b) == a_wins:
+                return rounds
 
     def update_team_stats(self):
         """Final step: increment Team.stats with GF, GA, minutes_played, etc."""
@@ -218,6 +481,11 @@ class Match:
         self.team_b.add_minutes(90)
         self.team_b.stats.matches_played += 1
 
+        self.team_a.stats.yellow_count += self.yellow_a
+        self.team_a.stats.red_count += self.red_a
+        self.team_b.stats.yellow_count += self.yellow_b
+        self.team_b.stats.red_count += self.red_b
+
         # Update group stage specific tracking
         if self.is_group:
             if self.result == MatchResult.A_WIN:
@@ -4,6 +4,9 @@ Stats - Value object for team statistics
 
 
 class Stats:
+    __slots__ = ('GF', 'GA', 'minutes_played', 'matches_played', 'clean_sheets',
+                 'yellow_count', 'red_count', 'xG')
+
     def __init__(self):
         self.GF = 0  # Goals For
         self.GA = 0  # Goals Against
@@ -14,6 +17,17 @@ class Stats:
         self.red_count = 0
         self.xG = 0.0  # Optional
 
+    def reset(self):
+        """Zero every counter so the object can be reused for another run"""
+        self.GF = 0
+        self.GA = 0
+        self.minutes_played = 0
+        self.matches_played = 0
+        self.clean_sheets = 0
+        self.yellow_count = 0
+        self.red_count = 0
+        self.xG = 0.0
+
     def per_90(self, stat_name):
         """Get any stat per 90 minutes"""
         if self.minutes_played == 0:
@@ -6,6 +6,9 @@ from .stats import Stats
 
 
 class Team:
+    __slots__ = ('name', 'elo', 'group', 'stats', 'eliminated', 'seed',
+                 'user_predictions', 'points', 'goal_diff', 'scorers')
+
     def __init__(self, name, elo, group):
         self.name = name
         self.elo = elo
@@ -15,7 +18,8 @@ class Team:
         # Meta
         self.eliminated = False
         self.seed = None
-        self.user_prediction = None
+        self.user_predictions = []  # Bracket slots the user picked this team for
+        self.scorers = None  # Optional ml.scorers.TeamScorers naming goal scorers
 
         # Group stage tracking
         self.points = 0
@@ -33,6 +37,13 @@ class Team:
         """Add minutes played"""
         self.stats.minutes_played += minutes
 
+    def reset(self):
+        """Reset tournament state (stats, points, elimination) for a fresh run"""
+        self.stats.reset()
+        self.eliminated = False
+        self.points = 0
+        self.goal_diff = 0
+
     def reset_match_state(self):
         """Reset transient per-match fields (cards, temp mods)"""
         pass
@@ -1,3 +1,23 @@
 from .tournament_engine import TournamentEngine
+from .vectorized_engine import VectorizedEngine, TournamentBatch
+from .monte_carlo import MonteCarloResult, ROUNDS
+from .parallel import run_parallel, chunk_seed
+from .exact_engine import ExactEngine
+from .sample_store import SampleStore
+from .cache import SimulationCache
+from .events import EventBus, ConsoleSink, NDJSONSink, CollectorSink
+from .instrumentation import Instrumentation
+from .snapshot import TournamentSnapshot
+from .shootout import ShootoutTable
+from .golden_boot import GoldenBoot, run_golden_boot
+from .formats import TournamentFormat, FORMATS, get_format
+from .sweep import Sweep, run_sweep, elo_variants, param_variants
 
-__all__ = ['TournamentEngine']
+__all__ = [
+    'TournamentEngine', 'VectorizedEngine', 'TournamentBatch', 'MonteCarloResult', 'ROUNDS',
+    'run_parallel', 'chunk_seed', 'ExactEngine', 'SampleStore',
+    'SimulationCache', 'EventBus', 'ConsoleSink', 'NDJSONSink', 'CollectorSink',
+    'Instrumentation', 'TournamentSnapshot', 'ShootoutTable',
+    'GoldenBoot', 'run_golden_boot', 'TournamentFormat', 'FORMATS', 'get_format',
+    'Sweep', 'run_sweep', 'elo_variants', 'param_variants'
+]
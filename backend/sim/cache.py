@@ -0,0 +1,215 @@
+"""
+SimulationCache - Content-addressed store of finished simulation runs in CACHE_DIR
+
+A run's key hashes everything that determines its outcome except its
+length: the team file contents, the loaded Elo values and groups,
+sim_params (minus the replay delay), the matchup matrix, the shootout
+model, seed, engine and chunk size. Entries are named <key>-<n_sims>.json (aggregate counters) and
+optionally <key>-<n_sims>.samples.npz (per-simulation arrays for a
+SampleStore).
+
+Runs are made of seeded chunks (sim.parallel), so a cached run of m
+simulations, with m a multiple of the chunk size, is extended to n by
+running only chunks m / chunk_size onwards. The result is identical to a
+fresh run of n.
+
+Writes go to a unique temporary file and are renamed into place, so
+concurrent processes never see partial entries. Reads refresh an entry's
+mtime, and the least recently used entries are deleted once the directory
+exceeds max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import numpy as np
+from config import CACHE_DIR, CACHE_MAX_BYTES
+from ml.matchup import file_hash
+from .monte_carlo import MonteCarloResult
+from .parallel import DEFAULT_CHUNK_SIZE, build_engine, run_parallel
+from .sample_store import SampleStore
+from .vectorized_engine import TournamentBatch
+
+
+# Bump when the entry format or the simulation semantics change
+CACHE_VERSION = 2
+
+_ENTRY = re.compile(r'^([0-9a-f]{32})-(\d+)\.(json|samples\.npz)$')
+
+
+class SimulationCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    def key(self, teams_file, sim_params=None, seed=0, engine='vectorized',
+            chunk_size=DEFAULT_CHUNK_SIZE, matchup_file=None, shootout_file=None):
+        """Key of a run configuration (everything but its simulation count)"""
+        tournament = build_engine(teams_file, sim_params, 'scalar')
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'teams_file': file_hash(teams_file),
+            'teams': [[team.name, team.elo, team.group] for team in tournament.teams],
+            'sim_params': {k: v for k, v in tournament.sim_params.items() if k != 'delay'},
+            'model': file_hash(matchup_file) if matchup_file else None,
+            'shootout_model': file_hash(shootout_file) if shootout_file else None,
+            'seed': seed,
+            'engine': engine,
+            'chunk_size': chunk_size,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, key, n_sims, kind='json'):
+        return os.path.join(self.cache_dir, f'{key}-{n_sims}.{kind}')
+
+    def entries(self, key, kind='json'):
+        """Simulation counts cached for a key, ascending"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        counts = []
+        for name in os.listdir(self.cache_dir):
+            match = _ENTRY.match(name)
+            if match and match.group(1) == key and match.group(3) == kind:
+                counts.append(int(match.group(2)))
+        return sorted(counts)
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+    def load(self, key, n_sims):
+        """Cached MonteCarloResult for exactly n_sims, or None"""
+        path = self._path(key, n_sims)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._touch(path)
+        return MonteCarloResult.from_dict(data)
+
+    def store(self, key, result):
+        """Write a result under its key and simulation count"""
+        self._write(self._path(key, result.n_sims),
+                    lambda f: f.write(json.dumps(result.to_dict()).encode()))
+        self._evict()
+
+    def run(self, teams_file, n_sims, seed=0, engine='vectorized', sim_params=None,
+            workers=None, chunk_size=DEFAULT_CHUNK_SIZE, matchup_file=None, shootout_file=None):
+        """
+        run_parallel through the cache
+
+        Returns the cached result for the same configuration and n_sims if
+        there is one; otherwise extends the largest cached run whose length
+        is a multiple of chunk_size (or starts from scratch) and caches the
+        result.
+
+        Returns:
+            MonteCarloResult
+        """
+        key = self.key(teams_file, sim_params, seed, engine, chunk_size, matchup_file,
+                       shootout_file)
+        result = self.load(key, n_sims)
+        if result is not None:
+            return result
+
+        base = None
+        for m in reversed(self.entries(key)):
+            if m < n_sims and m % chunk_size == 0:
+                base = self.load(key, m)
+                if base is not None:
+                    break
+
+        done = base.n_sims if base else 0
+        extra = run_parallel(teams_file, n_sims - done, seed, workers, engine, chunk_size,
+                             sim_params, first_chunk=done // chunk_size,
+                             matchup_file=matchup_file, shootout_file=shootout_file)
+        result = base.merge(extra) if base else extra
+        self.store(key, result)
+        return result
+
+    # ------------------------------------------------------------------
+    # Per-simulation samples
+    # ------------------------------------------------------------------
+    def store_samples(self, key, store):
+        """Write a SampleStore's simulations and generator state"""
+        batch = store.batch()
+
+        def write(f):
+            np.savez(f, rng_state=json.dumps(store.rng.bit_generator.state),
+                     **{field: getattr(batch, field) for field in TournamentBatch.FIELDS})
+
+        self._write(self._path(key, store.n_sims, 'samples.npz'), write)
+        self._evict()
+
+    def load_samples(self, key, engine, seed=None):
+        """
+        SampleStore holding the largest cached sample set for a key
+
+        The generator resumes where the cached store stopped, so extending
+        it continues the same stream. Without cached samples an empty store
+        seeded with `seed` is returned.
+        """
+        store = SampleStore(engine, seed)
+        for n_sims in reversed(self.entries(key, 'samples.npz')):
+            path = self._path(key, n_sims, 'samples.npz')
+            try:
+                with np.load(path) as data:
+                    batch = TournamentBatch(*(data[field] for field in TournamentBatch.FIELDS))
+                    rng_state = json.loads(str(data['rng_state']))
+            except FileNotFoundError:
+                continue
+            self._touch(path)
+            store.rng.bit_generator.state = rng_state
+            return store.add_batch(batch)
+        return store
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    def _write(self, path, write):
+        """Write through a unique temp file and rename it into place"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not _ENTRY.match(name):
+                continue
+            try:
+                info = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            files.append((info.st_mtime_ns, info.st_size, name))
+            total += info.st_size
+
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,209 @@
+"""
+Events - Typed tournament events and the sinks that consume them
+
+TournamentEngine emits events to its EventBus instead of printing. A sink
+is any callable taking one event; ConsoleSink reproduces the original
+console output, NDJSONSink writes one JSON object per line and
+CollectorSink keeps the events in memory.
+
+The engine checks `bus.sinks` before building an event, so with no sink
+attached (or in quiet mode) nothing is allocated or formatted.
+"""
+
+import json
+import sys
+
+
+class Event:
+    """Base class; `kind` names the event in serialized form"""
+
+    __slots__ = ()
+    kind = 'event'
+
+    def to_dict(self):
+        """JSON-ready payload (teams by name)"""
+        return {'event': self.kind}
+
+
+class RoundStarted(Event):
+    __slots__ = ('round_name',)
+    kind = 'round_started'
+
+    def __init__(self, round_name):
+        self.round_name = round_name  # Knockout round (plan.knockout_labels): '16', ..., 'final'
+
+    def to_dict(self):
+        return {'event': self.kind, 'round': self.round_name}
+
+
+class MatchFinished(Event):
+    __slots__ = ('match', 'round_name')
+    kind = 'match_finished'
+
+    def __init__(self, match, round_name):
+        self.match = match
+        self.round_name = round_name  # Group name or knockout round
+
+    def to_dict(self):
+        match = self.match
+        return {'event': self.kind, 'round': self.round_name,
+                'team_a': match.team_a.name, 'team_b': match.team_b.name,
+                'score': list(match.final_score)}
+
+
+class PenaltyRound(Event):
+    __slots__ = ('match', 'number', 'score_a', 'score_b')
+    kind = 'penalty_round'
+
+    def __init__(self, match, number, score_a, score_b):
+        self.match = match
+        self.number = number  # 1-based shootout round
+        self.score_a = score_a  # Running shootout score
+        self.score_b = score_b
+
+    def to_dict(self):
+        return {'event': self.kind, 'team_a': self.match.team_a.name,
+                'team_b': self.match.team_b.name, 'round': self.number,
+                'score': [self.score_a, self.score_b]}
+
+
+class ShootoutFinished(Event):
+    __slots__ = ('match', 'winner')
+    kind = 'shootout_finished'
+
+    def __init__(self, match, winner):
+        self.match = match
+        self.winner = winner
+
+    def to_dict(self):
+        pen_a, pen_b, _ = self.match.penalties_result
+        return {'event': self.kind, 'team_a': self.match.team_a.name,
+                'team_b': self.match.team_b.name, 'score': [pen_a, pen_b],
+                'winner': self.winner.name}
+
+
+class GroupStandings(Event):
+    __slots__ = ('group', 'qualifiers')
+    kind = 'group_standings'
+
+    def __init__(self, group, qualifiers):
+        self.group = group
+        self.qualifiers = qualifiers  # [winner, runner-up]
+
+    def to_dict(self):
+        return {'event': self.kind, 'group': self.group.name,
+                'standings': [{'team': t.name, 'points': t.points, 'goal_diff': t.goal_diff}
+                              for t in self.group.standings],
+                'qualifiers': [t.name for t in self.qualifiers]}
+
+
+class Champion(Event):
+    __slots__ = ('team',)
+    kind = 'champion'
+
+    def __init__(self, team):
+        self.team = team
+
+    def to_dict(self):
+        return {'event': self.kind, 'team': self.team.name}
+
+
+class EventBus:
+    def __init__(self):
+        self.sinks = []  # Callables taking one Event
+
+    def subscribe(self, sink):
+        """Attach a sink; returns it (for later unsubscribe)"""
+        self.sinks.append(sink)
+        return sink
+
+    def unsubscribe(self, sink):
+        self.sinks.remove(sink)
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink(event)
+
+
+# ============================================================================
+# Sinks
+# ============================================================================
+class ConsoleSink:
+    """The simulator's original console output"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def __call__(self, event):
+        out = self.stream
+        if isinstance(event, MatchFinished):
+            match = event.match
+            print(f"{match.team_a.name} - {match.team_b.name} "
+                  f"{match.final_score[0]} - {match.final_score[1]}", file=out)
+        elif isinstance(event, PenaltyRound):
+            if event.number == 1:
+                print(" play penalties", file=out)
+            print(event.score_a, event.score_b, event.number, file=out)
+        elif isinstance(event, ShootoutFinished):
+            match = event.match
+            pen_a, pen_b, _ = match.penalties_result
+            print(f"Penalty score {match.team_a.name} {pen_a} {match.team_b.name} {pen_b}",
+                  file=out)
+        elif isinstance(event, GroupStandings):
+            teams = event.group.teams
+            print("Games finished!", file=out)
+            print([t.points for t in teams], file=out)
+            print([t.goal_diff for t in teams], file=out)
+            print(f"winner {event.qualifiers[0].name}", file=out)
+            print(f"Runner-up {event.qualifiers[1].name}", file=out)
+        elif isinstance(event, RoundStarted):
+            if event.round_name == 'final':
+                print("final", file=out)
+            print(f" knockout {event.round_name} stage", file=out)
+        elif isinstance(event, Champion):
+            print(f"\nChampion: {event.team.name}", file=out)
+
+
+class NDJSONSink:
+    """One JSON object per event and line; usable as a context manager"""
+
+    def __init__(self, target):
+        # target: path (opened for appending) or a text file object
+        if isinstance(target, str):
+            self.file = open(target, 'a')
+            self._owned = True
+        else:
+            self.file = target
+            self._owned = False
+
+    def __call__(self, event):
+        self.file.write(json.dumps(event.to_dict()) + '\n')
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CollectorSink:
+    """Keeps every event in memory"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def of(self, event_type):
+        """Collected events of one type"""
+        return [event for event in self.events if isinstance(event, event_type)]
+
+    def clear(self):
+        self.events = []
@@ -0,0 +1,285 @@
+"""
+ExactEngine - Noise-free advancement probabilities for the fixed 2018 bracket
+
+Scorelines of Match.generate_timeline have a small closed-form distribution,
+so nothing here is sampled:
+
+1. Each group's (winner, runner-up) distribution comes from a DP over its six
+   matches, whose states are the teams' (points, goal diff) totals.
+2. Every R16 match is fed by a pair of groups, and each pair feeds exactly
+   two R16 matches (A1-B2 and B1-A2, ...). The 144 joint outcomes of a pair
+   give both matches' winner distributions at once.
+3. Groups A-D decide quarter-finals 1 and 3, groups E-H quarter-finals 2
+   and 4, so the joint distribution of the quarter-final winners within each
+   half is built from its two group pairs; the halves are independent.
+4. Semi-finals and the final follow in closed form from those two joints and
+   the pairwise knockout win matrix (90 minutes, then the ShootoutTable).
+
+The results are ground truth for validating the Monte Carlo engines.
+"""
+
+from itertools import product
+import numpy as np
+from .monte_carlo import ROUNDS
+from .tournament_engine import R16_PAIRINGS
+from .vectorized_engine import GROUP_MATCHES
+from .shootout import ShootoutTable
+
+
+# Group DP state: per team a field points * 128 + goal diff + 64, in base 2048
+_GD_OFFSET = 64
+_POINTS_RADIX = 128
+_TEAM_RADIX = 2048
+
+
+class ExactEngine:
+    def __init__(self, groups, sim_params=None, shootouts=None):
+        self.teams = [team for group in groups for team in group.teams]
+        self.team_names = [team.name for team in self.teams]
+        self.elo = [team.elo for team in self.teams]
+        self.sim_params = dict(sim_params or {'base_goal_rate': 6})
+
+        if any(len(group.teams) != 4 for group in groups) or len(groups) != len(R16_PAIRINGS):
+            raise ValueError("ExactEngine supports the 8 groups of 4 feeding the R16 bracket")
+        self.group_teams = [list(range(4 * g, 4 * g + 4)) for g in range(len(groups))]
+
+        self._match_cache = {}
+        self.shootout_win = ShootoutTable.build(self.team_names, self.elo, shootouts).win
+        self.knockout_win = self._knockout_matrix()
+
+    @classmethod
+    def from_tournament(cls, engine):
+        """
+        Build from a loaded TournamentEngine (same teams, groups, params and shootout model)
+
+        Raises:
+            ValueError: for formats other than the classic one, and for
+                engines scoring matches with a matchup model (the exact
+                distributions follow the Elo formula only)
+        """
+        if not engine.plan.is_classic:
+            raise ValueError(f"ExactEngine supports the classic format, not '{engine.plan.name}'")
+        if engine.matchup is not None:
+            raise ValueError('ExactEngine follows the Elo scoring formula; '
+                             'it cannot use a matchup model')
+        return cls(engine.groups, engine.sim_params, engine.shootout_model)
+
+    # ------------------------------------------------------------------
+    # Single match
+    # ------------------------------------------------------------------
+    def _goals_distribution(self, elo):
+        """P(int(rate * u * elo / 100) == k) for u ~ U[0, 1), as a list over k"""
+        scale = self.sim_params['base_goal_rate'] * elo / 100
+        if scale <= 0:
+            return [1.0]
+        probs = []
+        k = 0
+        while k < scale:
+            probs.append(min(1.0, (k + 1) / scale) - k / scale)
+            k += 1
+        return probs
+
+    def scoreline_distribution(self, a, b):
+        """
+        Exact {(score_a, score_b): probability} for team IDs a vs b
+
+        Follows Match.generate_timeline: independent draws, then the
+        favoured team_b gets a level score re-drawn (99%) and a win for
+        team_a reversed (99%).
+        """
+        key = (a, b)
+        if key in self._match_cache:
+            return self._match_cache[key]
+
+        goals_a = self._goals_distribution(self.elo[a])
+        goals_b = self._goals_distribution(self.elo[b])
+        underdog_b = self.elo[b] - self.elo[a] > 20
+
+        dist = {}
+        for (sa, pa), (sb, pb) in product(enumerate(goals_a), enumerate(goals_b)):
+            p = pa * pb
+            if underdog_b and sa == sb:
+                dist[(sa, sb)] = dist.get((sa, sb), 0.0) + 0.01 * p
+                for redraw, pr in enumerate(goals_a):
+                    dist[(redraw, sb)] = dist.get((redraw, sb), 0.0) + 0.99 * p * pr
+            else:
+                dist[(sa, sb)] = dist.get((sa, sb), 0.0) + p
+
+        if underdog_b:
+            swapped = {}
+            for (sa, sb), p in dist.items():
+                if sa > sb:
+                    swapped[(sa, sb)] = swapped.get((sa, sb), 0.0) + 0.01 * p
+                    swapped[(sb, sa)] = swapped.get((sb, sa), 0.0) + 0.99 * p
+                else:
+                    swapped[(sa, sb)] = swapped.get((sa, sb), 0.0) + p
+            dist = swapped
+
+        self._match_cache[key] = dist
+        return dist
+
+    def _knockout_matrix(self):
+        """win[a, b] = P(a beats b in a knockout match with a as team_a)"""
+        n = len(self.teams)
+        win = np.zeros((n, n))
+        for a, b in product(range(n), range(n)):
+            if a == b:
+                continue
+            dist = self.scoreline_distribution(a, b)
+            p_win = sum(p for (sa, sb), p in dist.items() if sa > sb)
+            p_draw = sum(p for (sa, sb), p in dist.items() if sa == sb)
+            win[a, b] = p_win + p_draw * self.shootout_win[a, b]
+        return win
+
+    # ------------------------------------------------------------------
+    # Group stage
+    # ------------------------------------------------------------------
+    def group_distribution(self, group_index):
+        """
+        {(winner ID, runner-up ID): probability} for one group
+
+        Only points and goal difference decide Group.compute_standings, so
+        each match collapses to a goal-difference distribution. States are
+        the four teams' (points, goal diff) packed into one integer; a match
+        adds a fixed delta per outcome, and equal states are merged after
+        every match.
+        """
+        team_ids = self.group_teams[group_index]
+        weights = _TEAM_RADIX ** np.arange(4, dtype=np.int64)
+
+        codes = np.array([_GD_OFFSET * weights.sum()], dtype=np.int64)
+        probs = np.ones(1)
+        for a, b in GROUP_MATCHES:
+            diffs = {}
+            for (sa, sb), p in self.scoreline_distribution(team_ids[a], team_ids[b]).items():
+                diffs[sa - sb] = diffs.get(sa - sb, 0.0) + p
+            diff = np.array(list(diffs), dtype=np.int64)
+            pts_a = np.where(diff > 0, 3, np.where(diff == 0, 1, 0))
+            pts_b = np.where(diff < 0, 3, np.where(diff == 0, 1, 0))
+            delta = ((pts_a * _POINTS_RADIX + diff) * weights[a]
+                     + (pts_b * _POINTS_RADIX - diff) * weights[b])
+
+            merged = (codes[:, None] + delta[None, :]).ravel()
+            merged_p = (probs[:, None] * np.array(list(diffs.values()))[None, :]).ravel()
+            codes, inverse = np.unique(merged, return_inverse=True)
+            probs = np.bincount(inverse.ravel(), weights=merged_p)
+
+        # Sort key per team: its field, then group order for ties (stable sort)
+        fields = (codes[:, None] // weights[None, :]) % _TEAM_RADIX
+        order = np.argsort(-(fields * 4 + (3 - np.arange(4))), axis=1)
+        outcome = np.zeros((4, 4))
+        np.add.at(outcome, (order[:, 0], order[:, 1]), probs)
+
+        return {
+            (team_ids[i], team_ids[j]): outcome[i, j]
+            for i, j in product(range(4), range(4)) if outcome[i, j] > 0
+        }
+
+    # ------------------------------------------------------------------
+    # Knockout
+    # ------------------------------------------------------------------
+    def _match_winner(self, side_a, side_b):
+        """
+        Winner distributions of knockout matches between independent sides
+
+        Args:
+            side_a, side_b: (..., n) team distributions; side_a is team_a
+
+        Returns:
+            (..., n) winner distribution
+        """
+        win = self.knockout_win
+        return side_a * (side_b @ win.T) + side_b * (side_a @ (1 - win))
+
+    def _bracket_halves(self):
+        """
+        Split the R16 into halves of correlated quarter-finals
+
+        Returns:
+            list of (quarters, blocks): the two quarter-final indices of a
+            half, and for each of its group pairs the R16 matches it feeds
+            (one per quarter-final, in quarter order)
+        """
+        blocks = {}
+        for m, (i, j) in enumerate(R16_PAIRINGS):
+            blocks.setdefault(frozenset((i // 2, j // 2)), []).append(m)
+
+        halves = {}
+        for groups, matches in blocks.items():
+            quarters = tuple(sorted(m // 2 for m in matches))
+            halves.setdefault(quarters, []).append(sorted(matches))
+
+        if any(len(q) != 2 or len(b) != 2 for q, b in halves.items()):
+            raise ValueError("R16 pairings do not split into two-quarter halves")
+        return sorted(halves.items())
+
+    def probabilities(self):
+        """
+        Exact advancement table, same shape as MonteCarloResult.probabilities()
+
+        Returns:
+            dict: team name -> {round name: probability of reaching it}
+        """
+        n = len(self.teams)
+        reach = {round_name: np.zeros(n) for round_name in ROUNDS}
+
+        groups = []
+        for g in range(len(self.group_teams)):
+            outcomes = self.group_distribution(g)
+            for (first, second), p in outcomes.items():
+                reach['group_win'][first] += p
+                reach['R16'][first] += p
+                reach['R16'][second] += p
+            groups.append(list(outcomes.items()))
+
+        # Winner distribution of every R16 match for each joint outcome of
+        # the group pair feeding it: r16[m] = (probs (O,), winners (O, n))
+        r16 = {}
+        for m, (i, j) in enumerate(R16_PAIRINGS):
+            g, h = sorted((i // 2, j // 2))
+            probs, winners = [], []
+            for ((g1, g2), pg), ((h1, h2), ph) in product(groups[g], groups[h]):
+                slot_team = {2 * g: g1, 2 * g + 1: g2, 2 * h: h1, 2 * h + 1: h2}
+                a, b = slot_team[i], slot_team[j]
+                row = np.zeros(n)
+                row[a] = self.knockout_win[a, b]
+                row[b] = 1 - self.knockout_win[a, b]
+                probs.append(pg * ph)
+                winners.append(row)
+            r16[m] = (np.array(probs), np.array(winners))
+            reach['QF'] += r16[m][0] @ r16[m][1]
+
+        # Joint (first quarter-final winner, second quarter-final winner) per half
+        joints = []
+        for quarters, (block_1, block_2) in self._bracket_halves():
+            p1, x1 = r16[block_1[0]]
+            _, y1 = r16[block_1[1]]
+            p2, x2 = r16[block_2[0]]
+            _, y2 = r16[block_2[1]]
+            # Quarter-final q plays the winners of R16 matches 2q (team_a) and 2q + 1
+            first = self._match_winner(x1[:, None, :], x2[None, :, :])
+            second = self._match_winner(y1[:, None, :], y2[None, :, :])
+            joint = np.einsum('ij,ijt,ijs->ts', np.outer(p1, p2), first, second)
+            joints.append((quarters, joint))
+
+        # Semi-finals pair quarter-finals (0, 1) and (2, 3): J1 holds (QF0, QF2)
+        # winners and J2 holds (QF1, QF3), so SF1 = J1 rows vs J2 rows and
+        # SF2 = J1 columns vs J2 columns
+        (_, j1), (_, j2) = joints
+        win = self.knockout_win
+        lose = 1 - win
+        for joint in (j1, j2):
+            reach['SF'] += joint.sum(axis=1) + joint.sum(axis=0)
+
+        # finals[a, b] = P(final is a (SF1 winner) vs b (SF2 winner))
+        finals = (j1 * (win @ j2 @ win.T)
+                  + (j1 @ lose) * (win @ j2)
+                  + (lose.T @ j1) * (j2 @ win.T)
+                  + j2 * (lose.T @ j1 @ lose))
+        reach['F'] += finals.sum(axis=1) + finals.sum(axis=0)
+        reach['champion'] += (finals * win).sum(axis=1) + (finals * lose).sum(axis=0)
+
+        return {
+            name: {round_name: float(reach[round_name][i]) for round_name in ROUNDS}
+            for i, name in enumerate(self.team_names)
+        }
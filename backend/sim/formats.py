@@ -0,0 +1,451 @@
+"""
+Formats - Tournament format definitions compiled into static plans
+
+A TournamentFormat says how many groups of how many teams play, how many
+qualify from each group (plus how many of the best third-placed teams), how
+group ties are broken and how the qualifiers are wired into the knockout
+bracket. Its plan property compiles it once into a FormatPlan of index
+arrays and lookup tables; TournamentEngine and VectorizedEngine only index
+into the plan, so every format runs through the same code.
+
+Bracket slots are named like set_prediction slots: 'A1' (winner of group A),
+'B2' (runner-up of group B), and '3-ABCDF' for the third-placed team of one
+of groups A, B, C, D or F, whichever the best-third allocation puts there.
+The first-round matches are listed in bracket order: the winners of matches
+2k and 2k + 1 meet in the next round.
+
+Tiebreakers, applied in order (higher is better on every criterion):
+    points           3 per win, 1 per draw
+    goal_difference  over all group matches
+    goals_for        over all group matches
+    head_to_head     points, goal difference and goals scored in the matches
+                     between the teams still level on the criteria before it
+    fair_play        -1 per yellow card, -4 per red card
+Listing head_to_head twice re-applies it to the teams the first pass left
+level, on their matches only (FIFA 2026). Teams level on every criterion
+keep their group order. The best third-placed teams are compared on the
+same criteria, head_to_head left out.
+
+Not modelled: the drawing of lots and FIFA ranking criteria (level teams
+keep group order). FIFA's best-third allocation table for 2026 (Annex C of
+the regulations) is not shipped: WORLD_CUP_2026 reads it from
+THIRD_PLACE_2026_FILE when that file exists, and otherwise matches every
+combination automatically (_allocate_thirds). Those matchings respect the
+bracket slots but need not be the pairings FIFA publishes;
+FormatPlan.automatic_thirds counts them.
+"""
+
+from itertools import combinations
+import json
+import os
+import numpy as np
+from config import THIRD_PLACE_2026_FILE
+from models.match import MAX_YELLOWS
+
+
+TIEBREAKERS = ('points', 'goal_difference', 'goals_for', 'head_to_head', 'fair_play')
+SIMPLE_TIEBREAKERS = ('points', 'goal_difference')
+
+# FIFA World Cup regulations: 2018 puts head-to-head after the overall
+# criteria, 2026 straight after points and re-applies it to the teams still
+# level before moving on
+FIFA_2018_TIEBREAKERS = ('points', 'goal_difference', 'goals_for', 'head_to_head', 'fair_play')
+FIFA_2026_TIEBREAKERS = ('points', 'head_to_head', 'head_to_head', 'goal_difference',
+                         'goals_for', 'fair_play')
+
+# Fair-play deductions per card
+YELLOW_POINTS = -1
+RED_POINTS = -4
+
+# Key component range for goal totals and differences (|value| < 128; a
+# group of four stays far inside even at MAX_MODEL_GOALS per match)
+GOAL_RADIX = 256
+FAIR_PLAY_FLOOR = -(MAX_YELLOWS * YELLOW_POINTS + RED_POINTS)  # Worst deduction per match
+
+# Exact sort keys: float32 while the key fits its mantissa, float64 beyond,
+# and several float64 words compared in turn when one is not enough
+_FLOAT32_EXACT = 2 ** 24
+_FLOAT64_EXACT = 2 ** 53
+
+# Compare-exchange pairs of an optimal 4-element sorting network
+_SORT_NETWORK_4 = [(0, 1), (2, 3), (0, 2), (1, 3), (1, 2)]
+
+
+def round_name(n_teams):
+    """Stage name reached by n_teams teams: 'R32', 'R16', 'QF', 'SF', 'F'"""
+    return {8: 'QF', 4: 'SF', 2: 'F'}.get(n_teams, f'R{n_teams}')
+
+
+def round_robin(group_size):
+    """Group.schedule_matches order of (team_a, team_b) local positions"""
+    return list(combinations(range(group_size), 2))
+
+
+def sorting_network(size):
+    """Compare-exchange pairs ordering size elements (odd-even transposition)"""
+    if size == 4:
+        return list(_SORT_NETWORK_4)
+    return [(i, i + 1) for step in range(size) for i in range(step % 2, size - 1, 2)]
+
+
+class TournamentFormat:
+    def __init__(self, name, groups, bracket, group_size=4, qualifiers=2, best_thirds=0,
+                 tiebreakers=FIFA_2018_TIEBREAKERS, third_place_table=None):
+        """
+        Args:
+            name: Short name ('classic', '2018', '2026')
+            groups: Group letters, in group order
+            bracket: First-round matches in bracket order, as slot-name pairs
+            group_size: Teams per group
+            qualifiers: Teams going through from every group
+            best_thirds: Extra qualifiers among the third-placed teams
+            tiebreakers: Ordered group criteria (see TIEBREAKERS)
+            third_place_table: Optional {qualifying groups, e.g. 'ABCDEFGH':
+                group letter per third-place slot in bracket order}, or the
+                path of a JSON file holding one (read when the plan compiles,
+                skipped if missing); allocations it leaves out are matched
+                automatically
+        """
+        unknown = set(tiebreakers) - set(TIEBREAKERS)
+        if unknown or not tiebreakers or tiebreakers[0] != 'points':
+            raise ValueError(f"Tiebreakers must start with 'points' and come from {TIEBREAKERS}")
+        self.name = name
+        self.groups = list(groups)
+        self.bracket = [tuple(pair) for pair in bracket]
+        self.group_size = group_size
+        self.qualifiers = qualifiers
+        self.best_thirds = best_thirds
+        self.tiebreakers = tuple(tiebreakers)
+        self.third_place_table = (third_place_table if isinstance(third_place_table, str)
+                                  else dict(third_place_table or {}))
+        self._plan = None
+
+    @property
+    def plan(self):
+        """The compiled FormatPlan (compiled on first use)"""
+        if self._plan is None:
+            self._plan = FormatPlan(self)
+        return self._plan
+
+
+class FormatPlan:
+    """
+    Static arrays and tables of one TournamentFormat
+
+    Qualifier slots: the direct qualifiers in group order, rank within
+    group (A1, A2, B1, B2, ...), then one slot per third-place bracket
+    position. first_round indexes them pairwise in bracket order.
+    """
+
+    def __init__(self, tournament_format):
+        f = tournament_format
+        self.name = f.name
+        self.group_letters = list(f.groups)
+        self.n_groups = len(f.groups)
+        self.group_size = f.group_size
+        self.qualifiers = f.qualifiers
+        self.best_thirds = f.best_thirds
+        self.tiebreakers = f.tiebreakers
+        self.third_tiebreakers = tuple(c for c in f.tiebreakers if c != 'head_to_head')
+        self.uses_cards = 'fair_play' in f.tiebreakers
+
+        # Group stage
+        self.group_matches = round_robin(f.group_size)
+        self.match_a = np.array([a for a, _ in self.group_matches])
+        self.match_b = np.array([b for _, b in self.group_matches])
+        # (side, match) of every match each position plays, for per-team sums
+        self.team_matches = [[(side, match) for match, pair in enumerate(self.group_matches)
+                              for side, team in enumerate(pair) if team == position]
+                             for position in range(f.group_size)]
+        self.positions = np.arange(f.group_size - 1, -1, -1)[:, None, None]
+        self.sort_network = sorting_network(f.group_size)
+        self.key_radices = self._key_radices()
+        # Words above the last are folded into it as one rank digit per word
+        # (see sim.vectorized_engine._rank), so they leave room for that
+        self.key_words = _split_words(self.key_radices,
+                                      f.group_size * self.key_radices[-1][1])
+        # Each word summed in float32 while exact, and the sort key (the top
+        # word with one rank digit per word below, then the position) too
+        products = [int(np.prod([radix for _, radix in word], dtype=object))
+                    for word in self.key_words]
+        self.word_dtypes = [np.float32 if product < _FLOAT32_EXACT else np.float64
+                            for product in products]
+        if len(products) > 1:
+            products[0] *= (f.group_size ** (len(products) - 1)) * self.key_radices[-1][1]
+        self.key_dtype = np.float32 if products[0] < _FLOAT32_EXACT else np.float64
+        self.key_segments = self._key_segments()
+        # Goals per match the scoreline tables cover: every score GOAL_RADIX
+        # can rank over a group's matches
+        self.score_limit = (GOAL_RADIX // 2 - 1) // (f.group_size - 1) + 1
+        self.score_tables = self._score_tables()
+
+        # Bracket
+        slots = {f'{letter}{rank + 1}': g * f.qualifiers + rank
+                 for g, letter in enumerate(f.groups) for rank in range(f.qualifiers)}
+        third_groups = []
+        for a, b in f.bracket:
+            for name in (a, b):
+                if name.startswith('3-'):
+                    slots[name] = len(slots)
+                    third_groups.append([f.groups.index(letter) for letter in name[2:]])
+                elif name not in slots:
+                    raise ValueError(f"Unknown bracket slot '{name}'")
+        names = [name for pair in f.bracket for name in pair]
+        n_teams = len(names)
+        if sorted(slots[name] for name in names) != list(range(len(slots))):
+            raise ValueError('Every qualifier slot must appear in the bracket exactly once')
+        if n_teams < 2 or n_teams & (n_teams - 1):
+            raise ValueError('The first knockout round needs a power-of-two number of teams')
+        if len(third_groups) != f.best_thirds:
+            raise ValueError(f'{f.best_thirds} best thirds need as many third-place slots')
+        self.slot_names = sorted(slots, key=slots.get)
+        self.first_round = np.array([slots[name] for name in names])
+        self.n_direct = f.qualifiers * self.n_groups
+        self.n_knockout = n_teams - 1
+
+        # Stage names reached, group winners first, then one per knockout round
+        stages = []
+        size = n_teams
+        while size > 1:
+            stages.append(round_name(size))
+            size //= 2
+        self.stages = stages + ['champion']
+        self.rounds = ['group_win'] + self.stages
+        # Knockout round labels of TournamentEngine.knockout_matches and events
+        self.knockout_labels = [str(n_teams >> k) for k in range(len(stages) - 1)] + ['final']
+
+        # Best-third allocation: bitmask of qualifying groups -> group per third slot
+        self.third_lookup = {}
+        self.third_table = np.full((1 << self.n_groups if third_groups else 1, len(third_groups)),
+                                   -1, dtype=np.int8)
+        self.automatic_thirds = 0  # Allocations not taken from third_place_table
+        table = _third_place_table(f.third_place_table)
+        if third_groups:
+            for chosen in combinations(range(self.n_groups), f.best_thirds):
+                key = ''.join(f.groups[g] for g in chosen)
+                if key in table:
+                    assignment = tuple(f.groups.index(letter) for letter in table[key])
+                    if (sorted(assignment) != list(chosen)
+                            or any(g not in allowed
+                                   for g, allowed in zip(assignment, third_groups))):
+                        raise ValueError(f"Third-place allocation {table[key]} for groups "
+                                         f"{key} does not fit the bracket's third slots")
+                else:
+                    assignment = _allocate_thirds(chosen, third_groups)
+                    self.automatic_thirds += 1
+                if assignment is None:
+                    raise ValueError(f'No third-place allocation for groups {key}')
+                mask = sum(1 << g for g in chosen)
+                self.third_lookup[mask] = assignment
+                self.third_table[mask] = assignment
+
+    def _key_radices(self):
+        """(component, radix) of the packed group sort key, most significant first"""
+        matches = self.group_size - 1
+        points = 3 * matches + 1
+        components = []
+        passes = 0
+        for criterion in self.tiebreakers:
+            if criterion == 'points':
+                components.append(('points', points))
+            elif criterion == 'goal_difference':
+                components.append(('goal_difference', GOAL_RADIX))
+            elif criterion == 'goals_for':
+                components.append(('goals_for', GOAL_RADIX))
+            elif criterion == 'fair_play':
+                components.append(('fair_play', matches * FAIR_PLAY_FLOOR + 1))
+            else:
+                # 'h2h_points', then 'h2h2_points' when re-applied, and so on
+                passes += 1
+                prefix = 'h2h_' if passes == 1 else f'h2h{passes}_'
+                components += [(prefix + 'points', points),
+                               (prefix + 'goal_difference', GOAL_RADIX),
+                               (prefix + 'goals_for', GOAL_RADIX)]
+        # Position radix a power of two, so the digit reads back with a bit mask
+        return components + [('position', 1 << (self.group_size - 1).bit_length())]
+
+    def _key_segments(self):
+        """
+        Runs of key components packed per match in float32
+
+        Returns:
+            list of (key word, weight in the word, weight in the thirds' key
+            or None, [(statistic, weight within the run)], head_to_head); a
+            run breaks between words, where a head-to-head pass starts or
+            ends and before its radix product would leave float32's exact
+            range
+        """
+        weights = {}
+        word_of = {}
+        for word, radices in enumerate(self.key_words):
+            weights.update(_weights(radices))
+            word_of.update((name, word) for name, _ in radices)
+        third_weights = _weights([(name, radix) for name, radix in self.key_radices
+                                  if name in self.third_tiebreakers])
+        runs = []
+        for name, radix in self.key_radices[:-1]:
+            h2h_pass = name.split('_', 1)[0] if name.startswith('h2h') else None
+            run = runs[-1] if runs else None
+            if (run is None or run['pass'] != h2h_pass or run['word'] != word_of[name]
+                    or run['product'] * radix >= _FLOAT32_EXACT):
+                run = {'pass': h2h_pass, 'word': word_of[name], 'product': 1, 'names': []}
+                runs.append(run)
+            run['product'] *= radix
+            run['names'].append(name)
+        segments = []
+        for run in runs:
+            low = run['names'][-1]
+            segments.append((run['word'], weights[low], third_weights.get(low),
+                             [(name.split('_', 1)[1] if run['pass'] else name,
+                               weights[name] // weights[low])
+                              for name in run['names']],
+                             run['pass'] is not None))
+        return segments
+
+    def _score_tables(self):
+        """
+        {run: (2, score_limit ** 2 + 1) float32} packed value of each key
+        segment's run for either side of a match, by scoreline
+        a * score_limit + b; the extra last entry is 0, for matches a
+        head-to-head pass leaves out
+
+        fair_play depends on the cards rather than the score, so it is left
+        out and added per match.
+        """
+        goals = np.arange(self.score_limit, dtype=np.float32)
+        score_a, score_b = (side.ravel() for side in np.meshgrid(goals, goals, indexing='ij'))
+        diff = score_a - score_b
+        points = np.where(diff > 0, 3, np.where(diff < 0, 0, 1)).astype(np.float32)
+        stats = {'points': (points, np.where(diff == 0, 1, 3 - points)),
+                 'goal_difference': (diff, -diff), 'goals_for': (score_a, score_b)}
+        tables = {}
+        for _, _, _, components, _ in self.key_segments:
+            run = tuple(components)
+            if run not in tables:
+                tables[run] = np.array([
+                    sum((stats[name][side] * inner for name, inner in components
+                         if name in stats), np.zeros_like(diff)).tolist() + [0]
+                    for side in (0, 1)], dtype=np.float32)
+        return tables
+
+    @property
+    def is_classic(self):
+        """True when the plan plays CLASSIC's groups, tiebreakers and bracket"""
+        classic = CLASSIC.plan
+        return (self.tiebreakers == classic.tiebreakers and self.group_size == classic.group_size
+                and self.n_groups == classic.n_groups and self.qualifiers == classic.qualifiers
+                and np.array_equal(self.first_round, classic.first_round))
+
+
+def _weights(radices):
+    """
+    Component -> weight packing lexicographic components into one number
+
+    Each weight exceeds the largest spread of everything below it, so
+    sum(weight * value) orders like the component tuple as long as every
+    component's range is narrower than its radix (no offsets needed).
+    """
+    weights = {}
+    weight = 1
+    for name, radix in reversed(radices):
+        weights[name] = weight
+        weight *= radix
+    return weights
+
+
+def _split_words(radices, headroom):
+    """
+    radices cut into runs, most significant first, whose products stay
+    exact in float64 (all but the last also times headroom); comparing the
+    runs' packed values in turn orders like the whole component tuple. A
+    head-to-head pass stays in one run.
+    """
+    units = []
+    for name, radix in radices:
+        h2h_pass = name.split('_', 1)[0] if name.startswith('h2h') else None
+        if units and h2h_pass and units[-1][0] == h2h_pass:
+            units[-1][1].append((name, radix))
+        else:
+            units.append((h2h_pass, [(name, radix)]))
+    words = [[]]
+    product = 1
+    limit = _FLOAT64_EXACT
+    for _, unit in reversed(units):
+        unit_product = int(np.prod([radix for _, radix in unit], dtype=object))
+        if words[-1] and product * unit_product >= limit:
+            words.append([])
+            product = 1
+            limit = _FLOAT64_EXACT // headroom
+        if unit_product >= limit:
+            raise ValueError('Tiebreakers do not fit an exact sort key')
+        words[-1][:0] = unit
+        product *= unit_product
+    return words[::-1]
+
+
+def _third_place_table(table):
+    """A third_place_table dict, read from its JSON file when given a path"""
+    if not isinstance(table, str):
+        return table
+    if not os.path.exists(table):
+        return {}
+    with open(table, 'r') as f:
+        return json.load(f)
+
+
+def _allocate_thirds(chosen, third_groups):
+    """First matching of the chosen groups to the third slots (slot order, then group order)"""
+    assignment = [None] * len(third_groups)
+    used = set()
+
+    def place(slot):
+        if slot == len(third_groups):
+            return True
+        for g in chosen:
+            if g not in used and g in third_groups[slot]:
+                used.add(g)
+                assignment[slot] = g
+                if place(slot + 1):
+                    return True
+                used.discard(g)
+        return False
+
+    return tuple(assignment) if place(0) else None
+
+
+# The simulator's original rules: 2018 bracket, points then goal difference
+CLASSIC = TournamentFormat(
+    'classic', 'ABCDEFGH',
+    [('A1', 'B2'), ('C1', 'D2'), ('E1', 'F2'), ('G1', 'H2'),
+     ('B1', 'A2'), ('D1', 'C2'), ('F1', 'E2'), ('H1', 'G2')],
+    tiebreakers=SIMPLE_TIEBREAKERS)
+
+WORLD_CUP_2018 = TournamentFormat('2018', CLASSIC.groups, CLASSIC.bracket,
+                                  tiebreakers=FIFA_2018_TIEBREAKERS)
+
+# 48 teams: 12 groups of 4, the top two and the eight best thirds reach a
+# round of 32 (FIFA match schedule 73-88, listed in bracket order); thirds
+# are placed by FIFA's Annex C table when THIRD_PLACE_2026_FILE provides it
+WORLD_CUP_2026 = TournamentFormat(
+    '2026', 'ABCDEFGHIJKL',
+    [('E1', '3-ABCDF'), ('I1', '3-CDFGH'), ('A2', 'B2'), ('F1', 'C2'),
+     ('K2', 'L2'), ('H1', 'J2'), ('D1', '3-BEFIJ'), ('G1', '3-AEHIJ'),
+     ('C1', 'F2'), ('E2', 'I2'), ('A1', '3-CEFHI'), ('L1', '3-EHIJK'),
+     ('J1', 'H2'), ('D2', 'G2'), ('B1', '3-EFGIJ'), ('K1', '3-DEIJL')],
+    best_thirds=8, tiebreakers=FIFA_2026_TIEBREAKERS, third_place_table=THIRD_PLACE_2026_FILE)
+
+FORMATS = {f.name: f for f in (CLASSIC, WORLD_CUP_2018, WORLD_CUP_2026)}
+DEFAULT_FORMAT = CLASSIC
+
+
+def get_format(tournament_format=None):
+    """TournamentFormat from a format, a FORMATS name or None (DEFAULT_FORMAT)"""
+    if tournament_format is None:
+        return DEFAULT_FORMAT
+    if isinstance(tournament_format, TournamentFormat):
+        return tournament_format
+    try:
+        return FORMATS[tournament_format]
+    except KeyError:
+        raise ValueError(f"Unknown format '{tournament_format}' "
+                         f"(expected one of {', '.join(FORMATS)})") from None
@@ -0,0 +1,162 @@
+"""
+GoldenBoot - Top-scorer probabilities accumulated over many simulated tournaments
+
+Every simulated goal gets a scorer from its team's alias table
+(ml.ScorerModel.arrays), drawn in bulk with numpy: one uniform per goal,
+no per-event objects. Per-player goals of each simulation land in a
+(sims, players) array for one chunk at a time; the chunk's top scorers take
+the Golden Boot, sharing it equally on a tie (assists and minutes, FIFA's
+tiebreakers, are not simulated). Only the per-player totals are kept.
+
+Goals of teams without a scoring history, and own goals, count towards no
+player (see unattributed and own_goals).
+"""
+
+import numpy as np
+from .monte_carlo import MonteCarloResult
+
+
+# Simulations whose per-player counts are held at once
+CHUNK_SIMS = 2000
+
+
+class GoldenBoot:
+    def __init__(self, model, team_names):
+        """
+        Args:
+            model: ml.ScorerModel
+            team_names: Teams in the column order of the goal arrays recorded
+                (VectorizedEngine.team_names for record_batch)
+        """
+        from ml.scorers import OWN_GOAL, PENALTY
+        self.team_names = list(team_names)
+        tables = model.arrays(self.team_names)
+        self.players = tables['players']
+        self.player_team = tables['player_team']
+        self._offset = tables['offset']
+        self._size = tables['size']
+        self._prob = tables['prob']
+        self._alias = tables['alias']
+        self._player = tables['player']
+        self._own_goal = tables['kind'] == OWN_GOAL
+        self._penalty = tables['kind'] == PENALTY
+
+        n_players, n_teams = len(self.players), len(self.team_names)
+        self.n_sims = 0
+        self.wins = np.zeros(n_players)                       # Golden Boots, ties shared
+        self.goals = np.zeros(n_players, dtype=np.int64)      # Goals over all simulations
+        self.penalties = np.zeros(n_players, dtype=np.int64)  # Of which penalties
+        self.own_goals = np.zeros(n_teams, dtype=np.int64)    # Credited to each team
+        self.unattributed = np.zeros(n_teams, dtype=np.int64)  # Teams without history
+
+    def record_goals(self, goals, rng):
+        """
+        Draw scorers for a (sims, teams) array of goals per team and count them
+
+        rng: numpy Generator
+        """
+        goals = np.asarray(goals, dtype=np.int64)
+        for start in range(0, goals.shape[0], CHUNK_SIMS):
+            self._record_chunk(goals[start:start + CHUNK_SIMS], rng)
+        return self
+
+    def _record_chunk(self, goals, rng):
+        n_sims, n_teams = goals.shape
+        n_players = len(self.players)
+        known = self._size > 0
+        self.unattributed += goals.sum(axis=0) * ~known
+        goals = goals * known
+
+        # One entry per goal: its simulation and team
+        flat = goals.ravel()
+        sim = np.repeat(np.arange(n_sims * n_teams) // n_teams, flat)
+        team = np.repeat(np.tile(np.arange(n_teams), n_sims), flat)
+
+        # Walker alias draw: column from the integer part, coin from the fraction
+        x = rng.random(len(team)) * self._size[team]
+        column = x.astype(np.int64)
+        slot = self._offset[team] + column
+        slot = np.where(x - column < self._prob[slot], slot, self._alias[slot])
+
+        own = self._own_goal[slot]
+        self.own_goals += np.bincount(team[own], minlength=n_teams)
+        sim, slot = sim[~own], slot[~own]
+        player = self._player[slot]
+        self.penalties += np.bincount(player[self._penalty[slot]], minlength=n_players)
+
+        counts = np.bincount(sim * n_players + player,
+                             minlength=n_sims * n_players).reshape(n_sims, n_players)
+        self.goals += counts.sum(axis=0)
+        top = counts.max(axis=1, initial=0)[:, None]
+        leaders = (counts == top) & (top > 0)
+        shares = leaders / np.maximum(leaders.sum(axis=1, keepdims=True), 1)
+        self.wins += shares.sum(axis=0)
+        self.n_sims += n_sims
+
+    def record_batch(self, engine, batch, rng):
+        """Count a VectorizedEngine TournamentBatch (engine.team_names order)"""
+        return self.record_goals(engine.team_goals(batch), rng)
+
+    def record_tournament(self, teams, rng):
+        """Count one scalar tournament from the teams' stats.GF"""
+        goals = dict.fromkeys(self.team_names, 0)
+        for team in teams:
+            goals[team.name] = team.stats.GF
+        return self.record_goals([[goals[name] for name in self.team_names]], rng)
+
+    def merge(self, other):
+        """Add the counters of another GoldenBoot over the same teams and model"""
+        for field in ('wins', 'goals', 'penalties', 'own_goals', 'unattributed'):
+            getattr(self, field)[:] += getattr(other, field)
+        self.n_sims += other.n_sims
+        return self
+
+    def probabilities(self, top=None):
+        """
+        Golden Boot table, most likely winner first
+
+        Returns:
+            list of dicts: player, team, golden_boot (probability of
+            finishing top scorer), expected_goals and expected_penalties per
+            tournament
+        """
+        n = self.n_sims or 1
+        wins, goals, penalties = self.wins.tolist(), self.goals.tolist(), self.penalties.tolist()
+        order = np.lexsort((-self.goals, -self.wins))[:top]
+        return [
+            {'player': self.players[i], 'team': self.player_team[i],
+             'golden_boot': wins[i] / n, 'expected_goals': goals[i] / n,
+             'expected_penalties': penalties[i] / n}
+            for i in order.tolist()
+        ]
+
+    def to_dict(self, top=None):
+        """JSON-ready summary"""
+        n = self.n_sims or 1
+        return {
+            'n_sims': self.n_sims,
+            'players': self.probabilities(top),
+            'own_goals': {name: count / n for name, count in
+                          zip(self.team_names, self.own_goals.tolist())},
+            'unattributed': {name: count / n for name, count in
+                             zip(self.team_names, self.unattributed.tolist()) if count},
+        }
+
+
+def run_golden_boot(engine, model, n_sims, seed=None, batch_size=50000):
+    """
+    Simulate n_sims tournaments with a VectorizedEngine and tally the Golden Boot
+
+    Returns:
+        (MonteCarloResult, GoldenBoot)
+    """
+    rng = np.random.default_rng(seed)
+    result = MonteCarloResult(engine.team_names, engine.plan.rounds)
+    boot = GoldenBoot(model, engine.team_names)
+    done = 0
+    while done < n_sims:
+        batch = engine.simulate_batch(min(batch_size, n_sims - done), rng)
+        engine.record(result, batch)
+        boot.record_batch(engine, batch, rng)
+        done += batch.n_sims
+    return result, boot
@@ -0,0 +1,176 @@
+"""
+Instrumentation - Per-phase timers and counters for TournamentEngine
+
+Enabled with TournamentEngine.enable_instrumentation(); while the engine's
+`instrumentation` is None the hot path only tests that attribute.
+
+Stage phases are timed on every call, in wall and CPU time (process_time is
+a system call, but there are only a handful of stages per tournament).
+Per-match phases would need clock reads around every match, so only one
+run in `sample_every` of each stage times them; their reported wall time
+is the sampled mean per call times the exact number of calls. Counters
+are exact.
+
+    timeline     Match.generate_timeline + play (score and card draws)
+    penalties    Match.play_penalties
+    stats        Match.update_team_stats
+    standings    Group.compute_standings
+    group_stage  TournamentEngine.simulate_group_stage
+    knockout     TournamentEngine.simulate_knockout_round
+    tournament   TournamentEngine.simulate_tournament
+    export       export.export_snapshot
+"""
+
+from time import perf_counter, process_time
+
+
+MATCH_PHASES = ('timeline', 'penalties', 'stats', 'standings')
+STAGE_PHASES = ('group_stage', 'knockout', 'tournament', 'export')
+PHASES = MATCH_PHASES + STAGE_PHASES
+COUNTERS = ('tournaments', 'matches', 'shootouts', 'penalty_rounds', 'events')
+DEFAULT_SAMPLE_EVERY = 8
+
+_HELP = {
+    'tournaments': 'Tournaments simulated',
+    'matches': 'Matches played',
+    'shootouts': 'Penalty shootouts played',
+    'penalty_rounds': 'Penalty shootout rounds replayed (kick sequences are built on demand)',
+    'events': 'Timeline events drawn (goals and cards)',
+}
+
+
+class Instrumentation:
+    def __init__(self, sample_every=DEFAULT_SAMPLE_EVERY):
+        self.sample_every = sample_every  # 1 = time every match
+        self.calls = dict.fromkeys(PHASES, 0)          # Exact
+        self.wall = dict.fromkeys(PHASES, 0.0)         # Per-match phases: sampled calls only
+        self.timed = dict.fromkeys(MATCH_PHASES, 0)    # Sampled calls of per-match phases
+        self.cpu = dict.fromkeys(STAGE_PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._runs = dict.fromkeys(STAGE_PHASES, 0)
+
+    def sample(self, stage):
+        """Whether the stage about to run should time its per-match phases"""
+        runs = self._runs[stage]
+        self._runs[stage] = runs + 1
+        return runs % self.sample_every == 0
+
+    @staticmethod
+    def start():
+        """(wall, cpu) clock readings opening a stage phase"""
+        return perf_counter(), process_time()
+
+    def stop(self, phase, started):
+        """Close a stage phase opened with start()"""
+        wall, cpu = started
+        self.wall[phase] += perf_counter() - wall
+        self.cpu[phase] += process_time() - cpu
+        self.calls[phase] += 1
+
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+
+    def add(self, phase, seconds, calls):
+        """Add wall time a sampled stage measured over `calls` calls of a per-match phase"""
+        self.wall[phase] += seconds
+        self.timed[phase] += calls
+
+    def count_matches(self, matches):
+        """Count played matches (and their phase calls), timeline events and shootouts"""
+        counters = self.counters
+        shootouts = 0
+        for m in matches:
+            counters['events'] += (m.final_score[0] + m.final_score[1] + m.yellow_a
+                                   + m.yellow_b + m.red_a + m.red_b)
+            if m.shootout_winner is not None:
+                shootouts += 1
+                if m._penalty_rounds is not None:
+                    counters['penalty_rounds'] += len(m._penalty_rounds)
+        counters['matches'] += len(matches)
+        counters['shootouts'] += shootouts
+        self.calls['timeline'] += len(matches)
+        self.calls['stats'] += len(matches)
+        self.calls['penalties'] += shootouts
+
+    def wall_seconds(self, phase):
+        """Wall time of a phase (per-match phases extrapolated from their sampled calls)"""
+        if phase in self.timed:
+            timed = self.timed[phase]
+            return self.wall[phase] * self.calls[phase] / timed if timed else 0.0
+        return self.wall[phase]
+
+    def merge(self, other):
+        """Add another Instrumentation's figures (e.g. from a worker process)"""
+        for phase in PHASES:
+            self.calls[phase] += other.calls[phase]
+            self.wall[phase] += other.wall[phase]
+        for phase in MATCH_PHASES:
+            self.timed[phase] += other.timed[phase]
+        for phase in STAGE_PHASES:
+            self.cpu[phase] += other.cpu[phase]
+        for counter in COUNTERS:
+            self.counters[counter] += other.counters[counter]
+        return self
+
+    def reset(self):
+        self.__init__(self.sample_every)
+
+    def simulations_per_second(self):
+        """Tournaments per second of simulate_tournament wall time"""
+        wall = self.wall['tournament']
+        return self.counters['tournaments'] / wall if wall else 0.0
+
+    def report(self):
+        """
+        Structured report
+
+        Returns:
+            dict: 'phases' (phase -> calls, wall_seconds, and cpu_seconds
+            for stage phases or timed_calls for sampled per-match phases),
+            'counters' and 'simulations_per_second'
+        """
+        phases = {}
+        for phase in PHASES:
+            phases[phase] = {'calls': self.calls[phase], 'wall_seconds': self.wall_seconds(phase)}
+            if phase in self.cpu:
+                phases[phase]['cpu_seconds'] = self.cpu[phase]
+            else:
+                phases[phase]['timed_calls'] = self.timed[phase]
+        return {
+            'phases': phases,
+            'counters': dict(self.counters),
+            'simulations_per_second': self.simulations_per_second(),
+        }
+
+    def prometheus(self, prefix='tournament_sim'):
+        """The report in the Prometheus text exposition format"""
+        lines = [
+            f'# HELP {prefix}_phase_seconds_total Wall time spent per simulation phase',
+            f'# TYPE {prefix}_phase_seconds_total counter',
+        ]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{phase}"}} {self.wall_seconds(phase):.9g}'
+                  for phase in PHASES]
+        lines += [
+            f'# HELP {prefix}_phase_cpu_seconds_total CPU time spent per simulation stage',
+            f'# TYPE {prefix}_phase_cpu_seconds_total counter',
+        ]
+        lines += [f'{prefix}_phase_cpu_seconds_total{{phase="{phase}"}} {self.cpu[phase]:.9g}'
+                  for phase in STAGE_PHASES]
+        lines += [
+            f'# HELP {prefix}_phase_calls_total Times each simulation phase ran',
+            f'# TYPE {prefix}_phase_calls_total counter',
+        ]
+        lines += [f'{prefix}_phase_calls_total{{phase="{phase}"}} {self.calls[phase]}'
+                  for phase in PHASES]
+        for counter in COUNTERS:
+            lines += [
+                f'# HELP {prefix}_{counter}_total {_HELP[counter]}',
+                f'# TYPE {prefix}_{counter}_total counter',
+                f'{prefix}_{counter}_total {self.counters[counter]}',
+            ]
+        lines += [
+            f'# HELP {prefix}_simulations_per_second Tournaments per second of simulation time',
+            f'# TYPE {prefix}_simulations_per_second gauge',
+            f'{prefix}_simulations_per_second {self.simulations_per_second():.9g}',
+        ]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,253 @@
+"""
+MonteCarloResult - Advancement counters accumulated over many simulated tournaments
+"""
+
+import math
+import random
+
+# Stages a team can reach, in bracket order
+ROUNDS = ['group_win', 'R16', 'QF', 'SF', 'F', 'champion']
+
+# Two-sided 95% normal quantile
+Z_95 = 1.96
+
+
+def wilson_interval(p, n, z=Z_95):
+    """
+    Wilson score interval for a binomial proportion
+
+    Args:
+        p: Observed proportion
+        n: (Effective) number of trials; math.inf gives (p, p)
+        z: Normal quantile of the confidence level
+
+    Returns:
+        (low, high)
+    """
+    if not n:
+        return 0.0, 1.0
+    if math.isinf(n):
+        return p, p
+    z2 = z * z / n
+    center = (p + z2 / 2) / (1 + z2)
+    half = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n)) / (1 + z2)
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class AntitheticRandom(random.Random):
+    """
+    random.Random that can replay the previous tournament's uniforms as 1 - u
+
+    The engine calls begin() before each tournament and mark() before each
+    match. A mirrored tournament gets, match by match, 1 - u of the draws the
+    match with the same index consumed in the original; past the end of a
+    recorded match it falls back to fresh draws. Integer draws (card counts,
+    minutes via randint/choice) are never mirrored.
+    """
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.mirror = False
+        self._blocks = []
+        self._block = -1
+        self._replay = iter(())
+
+    def begin(self, mirror):
+        """Start a tournament: an original (recorded) or its mirror"""
+        self.mirror = mirror
+        if not mirror:
+            self._blocks = []
+        self._block = -1
+        self._replay = iter(())
+
+    def mark(self):
+        """Start the next match's block of uniforms"""
+        self._block += 1
+        if not self.mirror:
+            self._blocks.append([])
+        elif self._block < len(self._blocks):
+            self._replay = iter(self._blocks[self._block])
+        else:
+            self._replay = iter(())
+
+    def random(self):
+        if self.mirror:
+            u = next(self._replay, None)
+            return super().random() if u is None else 1.0 - u
+        u = super().random()
+        if self._blocks:
+            self._blocks[-1].append(u)
+        return u
+
+    def getrandbits(self, k):
+        # Overriding it makes random.Random derive randint/choice from these
+        # bits rather than from random(), so they stay out of the mirrored stream
+        return super().getrandbits(k)
+
+
+class MonteCarloResult:
+    def __init__(self, team_names, rounds=ROUNDS):
+        self.team_names = list(team_names)
+        self.rounds = list(rounds)
+        self.n_sims = 0
+
+        # counts[team][round] = number of simulations in which team reached round
+        self.counts = {name: dict.fromkeys(self.rounds, 0) for name in self.team_names}
+
+        # goals[team] = goals scored across all simulations (penalty shootouts excluded)
+        self.goals = dict.fromkeys(self.team_names, 0)
+
+        # Antithetic runs: number of (original, mirror) pairs and, per team and
+        # round, the pairs in which both tournaments reached it
+        self.pairs = 0
+        self.both = {name: dict.fromkeys(self.rounds, 0) for name in self.team_names}
+
+    def record(self, progress, teams=()):
+        """
+        Count one simulated tournament
+
+        Args:
+            progress: dict mapping round name -> list of Team objects reaching it
+            teams: Team objects whose stats.GF should be added to the goal totals
+        """
+        for round_name, reached in progress.items():
+            for team in reached:
+                self.counts[team.name][round_name] += 1
+        for team in teams:
+            self.goals[team.name] += team.stats.GF
+        self.n_sims += 1
+
+    def record_pair(self, first, second):
+        """
+        Count an antithetic pair (after recording both tournaments)
+
+        Args:
+            first, second: dict mapping round name -> team names reaching it
+        """
+        for round_name, reached in first.items():
+            for name in reached & second[round_name]:
+                self.both[name][round_name] += 1
+        self.pairs += 1
+
+    def merge(self, other):
+        """Add the counters of another result for the same teams and rounds"""
+        for own_table, other_table in ((self.counts, other.counts), (self.both, other.both)):
+            for name, rounds in other_table.items():
+                own = own_table[name]
+                for round_name, count in rounds.items():
+                    own[round_name] += count
+        for name, goals in other.goals.items():
+            self.goals[name] += goals
+        self.n_sims += other.n_sims
+        self.pairs += other.pairs
+        return self
+
+    def to_dict(self):
+        """JSON-serializable counters (see from_dict)"""
+        return {
+            'team_names': self.team_names,
+            'rounds': self.rounds,
+            'n_sims': self.n_sims,
+            'counts': self.counts,
+            'goals': self.goals,
+            'pairs': self.pairs,
+            'both': self.both,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        result = cls(data['team_names'], data['rounds'])
+        result.n_sims = data['n_sims']
+        result.counts = data['counts']
+        result.goals = data['goals']
+        result.pairs = data.get('pairs', 0)
+        result.both = data.get('both', result.both)
+        return result
+
+    def probabilities(self):
+        """
+        Advancement table
+
+        Returns:
+            dict: team name -> {round name: probability of reaching it}
+        """
+        n = self.n_sims or 1
+        return {
+            name: {round_name: count / n for round_name, count in rounds.items()}
+            for name, rounds in self.counts.items()
+        }
+
+    def effective_sims(self, name, round_name):
+        """
+        Independent-sample equivalent of n_sims for one probability
+
+        Plain runs return n_sims. Antithetic runs estimate the variance of
+        the pair means from the both-reached counts and return the number of
+        independent tournaments giving the same variance.
+        """
+        n = self.n_sims
+        if not self.pairs or not n:
+            return n
+        count = self.counts[name][round_name]
+        p = count / n
+        if p * (1 - p) == 0:
+            return n
+        pair_variance = (count + 2 * self.both[name][round_name]) / (4 * self.pairs) - p * p
+        if pair_variance <= 0:
+            return math.inf
+        return self.pairs * p * (1 - p) / pair_variance
+
+    def intervals(self, z=Z_95):
+        """
+        Wilson confidence intervals for the advancement table
+
+        Returns:
+            dict: team name -> {round name: (low, high)}
+        """
+        n = self.n_sims or 1
+        return {
+            name: {
+                round_name: wilson_interval(count / n, self.effective_sims(name, round_name), z)
+                for round_name, count in rounds.items()
+            }
+            for name, rounds in self.counts.items()
+        }
+
+    def max_half_width(self, z=Z_95):
+        """Widest half-interval over every team and round"""
+        return max(((high - low) / 2 for rounds in self.intervals(z).values()
+                    for low, high in rounds.values()), default=0.0)
+
+    def goals_per_tournament(self):
+        """Average goals scored per simulated tournament, by team"""
+        n = self.n_sims or 1
+        return {name: goals / n for name, goals in self.goals.items()}
+
+
+def run_adaptive(run_chunk, target=0.002, z=Z_95, chunk_size=2000, max_sims=2000000):
+    """
+    Simulate in chunks until every advancement probability is known to +/- target
+
+    After each chunk the widest confidence half-interval is checked; the next
+    chunk is sized from the 1/sqrt(n) shrinkage needed to reach the target,
+    at most doubling the run so it stops close to the first sufficient size.
+
+    Args:
+        run_chunk: Callable(n) -> MonteCarloResult for n more tournaments
+        target: Wanted half-width, as a probability (0.002 = 0.2 points)
+        z: Normal quantile of the confidence level
+        chunk_size: First and smallest chunk
+        max_sims: Stop here even if the target is not met
+
+    Returns:
+        MonteCarloResult: see intervals(z) and n_sims
+    """
+    result = run_chunk(min(chunk_size, max_sims))
+    while result.n_sims < max_sims:
+        width = result.max_half_width(z)
+        if width <= target:
+            break
+        wanted = int(result.n_sims * (width / target) ** 2 * 1.1) - result.n_sims
+        n = min(max(wanted, chunk_size), result.n_sims, max_sims - result.n_sims)
+        result.merge(run_chunk(n))
+    return result
@@ -0,0 +1,126 @@
+"""
+Parallel - Process-pool Monte Carlo runner with deterministic chunk seeding
+
+A run of N simulations is cut into fixed-size chunks. Chunk i always gets the
+seed chunk_seed(seed, i) and always has the same size, so the merged counters
+depend only on (seed, N, chunk_size) - never on how many workers ran them or
+in which order they finished.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .tournament_engine import TournamentEngine
+from .vectorized_engine import VectorizedEngine
+from .monte_carlo import MonteCarloResult
+
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Per-process engine, built once by _init_worker
+_worker_engine = None
+
+
+def chunk_seed(seed, index):
+    """Independent, reproducible 64-bit seed for chunk `index` of master `seed`"""
+    digest = hashlib.sha256(f'{seed}:{index}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+def plan_chunks(n_sims, chunk_size=DEFAULT_CHUNK_SIZE, first_chunk=0):
+    """List of (chunk index, simulations in chunk) covering n_sims"""
+    chunks = []
+    index = first_chunk
+    while n_sims > 0:
+        n = min(chunk_size, n_sims)
+        chunks.append((index, n))
+        n_sims -= n
+        index += 1
+    return chunks
+
+
+def build_engine(teams_file, sim_params=None, engine='vectorized', matchup_file=None,
+                 shootout_file=None):
+    """
+    Load a quiet engine of the requested kind ('scalar' or 'vectorized')
+
+    matchup_file: optional saved ml.MatchupMatrix (.npz) to score matches with
+    shootout_file: optional saved ml.ShootoutModel (.json) to decide shootouts with
+    """
+    tournament = TournamentEngine(delay=0)
+    tournament.load_data(teams_file)
+    if sim_params:
+        tournament.sim_params.update(sim_params)
+    if matchup_file:
+        from ml.matchup import MatchupMatrix
+        tournament.use_matchup_model(MatchupMatrix.load(matchup_file))
+    if shootout_file:
+        from ml.penalties import ShootoutModel
+        tournament.use_shootout_model(ShootoutModel.load(shootout_file))
+
+    if engine == 'scalar':
+        return tournament
+    if engine == 'vectorized':
+        return VectorizedEngine.from_tournament(tournament)
+    raise ValueError(f"Unknown engine '{engine}' (expected 'scalar' or 'vectorized')")
+
+
+def _init_worker(teams_file, sim_params, engine, matchup_file=None, shootout_file=None):
+    global _worker_engine
+    _worker_engine = build_engine(teams_file, sim_params, engine, matchup_file, shootout_file)
+
+
+def _run_chunk(args):
+    """Worker entry point: counters for one chunk"""
+    seed, index, n = args
+    return _worker_engine.run_monte_carlo(n, seed=chunk_seed(seed, index))
+
+
+def run_parallel(teams_file, n_sims, seed=0, workers=None, engine='vectorized',
+                 chunk_size=DEFAULT_CHUNK_SIZE, sim_params=None, first_chunk=0,
+                 matchup_file=None, shootout_file=None):
+    """
+    Split n_sims across a process pool and merge the per-chunk counters
+
+    Args:
+        teams_file: Team JSON file every worker loads
+        n_sims: Total number of tournaments
+        seed: Master seed; the merged result is identical for any worker count
+        workers: Number of processes (None = os.cpu_count(), 1 = run in-process)
+        engine: 'vectorized' or 'scalar'
+        chunk_size: Simulations per seeded chunk (part of the reproducibility key)
+        sim_params: Overrides applied on top of TournamentEngine.sim_params
+        first_chunk: Index of the first chunk; running n more simulations from
+            chunk m // chunk_size extends a run of m (a multiple of chunk_size)
+            exactly as if m + n had been requested
+        matchup_file: Optional saved MatchupMatrix every worker scores with
+        shootout_file: Optional saved ShootoutModel every worker decides shootouts with
+
+    Returns:
+        MonteCarloResult: merged advancement counts and goal totals
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = [(seed, index, n) for index, n in plan_chunks(n_sims, chunk_size, first_chunk)]
+    init_args = (teams_file, sim_params, engine, matchup_file, shootout_file)
+
+    if not jobs:
+        return build_engine(*init_args).run_monte_carlo(0)
+
+    if workers == 1 or len(jobs) == 1:
+        _init_worker(*init_args)
+        return _merge(map(_run_chunk, jobs))
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                             initializer=_init_worker,
+                             initargs=init_args) as pool:
+        return _merge(pool.map(_run_chunk, jobs))
+
+
+def _merge(parts):
+    """Sum chunk results into one MonteCarloResult"""
+    total = None
+    for part in parts:
+        if total is None:
+            total = MonteCarloResult(part.team_names, part.rounds)
+        total.merge(part)
+    return total
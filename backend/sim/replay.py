@@ -0,0 +1,110 @@
+"""
+Replay - Non-blocking match replays on a shared asyncio clock
+
+Match.play(replay_mode=True) sleeps once per event, holding a thread for the
+whole match. Here a ReplayClock ticks match minutes on the event loop and
+every Match.replay stream simply awaits the minute of its next event, so the
+matches of a matchday (or any number of viewers' replays) advance together
+without threads. Tournaments are still simulated instantly; replays only
+pace the timelines that were already drawn.
+"""
+
+import asyncio
+from config import DEFAULT_DELAY
+
+
+# Group.matches indices played on each matchday: (0-1, 2-3), (0-2, 1-3), (0-3, 1-2)
+GROUP_MATCHDAYS = [(0, 5), (1, 4), (2, 3)]
+
+
+class ReplayClock:
+    """
+    Match clock shared by concurrent replays
+
+    Minute 0 is when the clock is created. Ticks happen only while some
+    replay is waiting for a later minute, one every seconds_per_minute.
+    """
+
+    def __init__(self, seconds_per_minute=DEFAULT_DELAY):
+        self.seconds_per_minute = seconds_per_minute
+        self.minute = 0
+        self._waiters = {}  # minute -> asyncio.Event
+        self._task = None
+
+    async def wait_for(self, minute):
+        """Return once the clock has reached `minute`"""
+        if minute <= self.minute:
+            return
+        event = self._waiters.get(minute)
+        if event is None:
+            event = self._waiters[minute] = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._tick())
+        await event.wait()
+
+    async def _tick(self):
+        while self._waiters:
+            await asyncio.sleep(self.seconds_per_minute)
+            self.minute += 1
+            event = self._waiters.pop(self.minute, None)
+            if event is not None:
+                event.set()
+
+
+async def replay_matches(matches, clock=None, on_event=None):
+    """
+    Replay matches concurrently on one clock
+
+    Args:
+        matches: Match objects with generated timelines
+        clock: ReplayClock to share (default: a new one at DEFAULT_DELAY per minute)
+        on_event: Optional callback(match, event, state) for every streamed event
+
+    Returns:
+        list of final scores, in match order
+    """
+    clock = clock or ReplayClock()
+
+    async def run(match):
+        async for event, state in match.replay(clock):
+            if on_event is not None:
+                on_event(match, event, state)
+        return match.final_score
+
+    return await asyncio.gather(*(run(match) for match in matches))
+
+
+def matchdays(engine):
+    """
+    (label, matches) per matchday of the last simulated tournament
+
+    Group matchdays hold one slot of every group at once; each knockout
+    round is one matchday.
+    """
+    days = []
+    for day, slots in enumerate(GROUP_MATCHDAYS, start=1):
+        days.append((f'Matchday {day}',
+                     [group.matches[i] for group in engine.groups for i in slots]))
+    for round_name in engine.plan.knockout_labels:
+        if round_name in engine.knockout_matches:
+            days.append((round_name, engine.knockout_matches[round_name]))
+    return days
+
+
+async def replay_tournament(engine, seconds_per_minute=DEFAULT_DELAY, on_event=None,
+                            on_matchday=None):
+    """
+    Replay the engine's last simulated tournament matchday by matchday
+
+    Each matchday gets a fresh clock and all of its matches play at once.
+
+    Args:
+        engine: TournamentEngine after simulate_tournament()
+        seconds_per_minute: Wall time per match minute
+        on_event: Optional callback(match, event, state)
+        on_matchday: Optional callback(label, matches) before each matchday
+    """
+    for label, matches in matchdays(engine):
+        if on_matchday is not None:
+            on_matchday(label, matches)
+        await replay_matches(matches, ReplayClock(seconds_per_minute), on_event)
@@ -0,0 +1,266 @@
+"""
+SampleStore - Stored per-simulation outcomes for instant "what if my picks hold" updates
+
+A large batch of tournaments is kept as compact TournamentBatch segments. Every
+bracket slot (group finishing places A1..H2 and the winner of each knockout
+match) gets an inverted index per segment: simulation indices sorted by the
+team in that slot. Conditioning on picks is then a few index-range lookups and
+a sorted-array intersection; new tournaments are only simulated when too few
+stored ones agree with the picks.
+"""
+
+import numpy as np
+from .monte_carlo import MonteCarloResult, ROUNDS
+from .vectorized_engine import TournamentBatch
+
+
+class ConditionalResult(MonteCarloResult):
+    """MonteCarloResult of SampleStore.conditional, with the sample count it was asked for"""
+
+    def __init__(self, team_names, rounds=ROUNDS, min_samples=0):
+        super().__init__(team_names, rounds)
+        self.min_samples = min_samples
+
+    @property
+    def too_few_samples(self):
+        """Whether the simulation cap stopped short of min_samples matching tournaments"""
+        return self.n_sims < self.min_samples
+
+
+def slot_names(engine):
+    """
+    Names of the bracket slots, in TournamentBatch slot-array column order
+
+    Group places are '<letter><place>' for every direct qualifier (A1, A2,
+    B1, ...); knockout winners are named by the round played, e.g.
+    'R16-1'..'R16-8', 'QF-1'..'QF-4', 'SF-1', 'SF-2' and 'F'.
+    """
+    plan = engine.plan
+    names = []
+    for group_name in engine.group_names:
+        letter = group_name.split()[-1]
+        names.extend(f'{letter}{place + 1}' for place in range(plan.qualifiers))
+
+    n_round = len(engine.first_round) // 2
+    for round_name in plan.stages[:-2]:
+        names.extend(f'{round_name}-{i + 1}' for i in range(n_round))
+        n_round //= 2
+    names.append('F')
+    return names
+
+
+def batch_slots(batch, qualifiers=2):
+    """(n, n_slots) team ID in every bracket slot of each simulation"""
+    places = batch.standings[:, :, :qualifiers].reshape(batch.n_sims, -1)
+    return np.concatenate([places, batch.ko_winners], axis=1)
+
+
+class _Segment:
+    """One stored batch and its per-slot inverted index"""
+
+    def __init__(self, batch, start, qualifiers=2):
+        self.batch = batch
+        self.start = start  # Global index of the segment's first simulation
+        self.slots = batch_slots(batch, qualifiers)
+
+        # order[:, k] lists simulation indices sorted by the team in slot k;
+        # bounds[k, t]:bounds[k, t + 1] is the run holding team t
+        n_teams = int(self.slots.max()) + 1 if self.slots.size else 0
+        self.order = np.argsort(self.slots, axis=0, kind='stable').astype(np.int32)
+        sorted_slots = np.take_along_axis(self.slots, self.order, axis=0)
+        self.bounds = np.stack([
+            np.searchsorted(sorted_slots[:, k], np.arange(n_teams + 1))
+            for k in range(self.slots.shape[1])
+        ])
+
+    def matching(self, picks):
+        """Sorted local indices of simulations agreeing with (slot, team ID) picks"""
+        runs = []
+        for k, team in picks:
+            if team + 1 >= self.bounds.shape[1]:
+                return np.empty(0, dtype=np.int32)
+            runs.append(self.order[self.bounds[k, team]:self.bounds[k, team + 1], k])
+        if not runs:
+            return np.arange(self.batch.n_sims, dtype=np.int32)
+
+        runs.sort(key=len)
+        selected = runs[0]
+        for run in runs[1:]:
+            if not len(selected):
+                break
+            selected = np.intersect1d(selected, run, assume_unique=True)
+        return selected
+
+
+class SampleStore:
+    def __init__(self, engine, seed=None):
+        self.engine = engine  # VectorizedEngine producing the samples
+        self.rng = np.random.default_rng(seed)
+        self.slot_names = slot_names(engine)
+        self.slot_index = {name: k for k, name in enumerate(self.slot_names)}
+        self.team_index = {name: i for i, name in enumerate(engine.team_names)}
+        self.segments = []
+        self.n_sims = 0
+
+    def extend(self, n_sims, batch_size=50000):
+        """Simulate and store n_sims more tournaments"""
+        while n_sims > 0:
+            n = min(batch_size, n_sims)
+            self.add_batch(self.engine.simulate_batch(n, self.rng))
+            n_sims -= n
+        return self
+
+    def add_batch(self, batch):
+        """Store an already simulated batch (e.g. loaded from SimulationCache)"""
+        self.segments.append(_Segment(batch.compact(), self.n_sims, self.engine.plan.qualifiers))
+        self.n_sims += batch.n_sims
+        return self
+
+    def batch(self):
+        """All stored simulations as one TournamentBatch"""
+        return TournamentBatch.concatenate([segment.batch for segment in self.segments])
+
+    def check_picks(self, picks):
+        """
+        Raise ValueError unless the picks name known slots and teams and can all happen
+
+        The checks conditional runs first, without touching the samples.
+        """
+        self._check_possible(picks, self._encode(picks))
+
+    def _encode(self, picks):
+        """Translate {slot name: team name} picks into (slot column, team ID) pairs"""
+        encoded = []
+        for slot, team in picks.items():
+            if slot not in self.slot_index:
+                raise ValueError(f"Unknown bracket slot '{slot}'")
+            if team not in self.team_index:
+                raise ValueError(f"Unknown team '{team}'")
+            encoded.append((self.slot_index[slot], self.team_index[team]))
+        return encoded
+
+    def _check_possible(self, picks, encoded):
+        """
+        Raise ValueError when the picks cannot all happen in the bracket
+
+        Every pick narrows the first-round positions its team can start
+        from: a group place to that place's position (and only for a team of
+        that group), a knockout win to the positions under that match. A
+        team also winning a match whose other picked child went to another
+        team must come from the remaining child. Positions any team is
+        pinned to are taken from the others until nothing changes.
+        """
+        plan = self.engine.plan
+        q = plan.qualifiers
+        group_size = plan.group_size
+        leaves = plan.first_round.tolist()
+        n_leaves = len(leaves)
+        # Groups that can fill each qualifier slot (third slots: any candidate group)
+        slot_groups = [{slot // q} for slot in range(plan.n_direct)]
+        slot_groups += [set(plan.third_table[:, t][plan.third_table[:, t] >= 0].tolist())
+                        for t in range(plan.best_thirds)]
+
+        def under(match):
+            """First-round positions feeding knockout match `match` (ko_winners order)"""
+            size, start = 2, 0
+            while match >= start + n_leaves // size:
+                start += n_leaves // size
+                size *= 2
+            first = (match - start) * size
+            return set(range(first, first + size)), start, size
+
+        names = {self.team_index[name]: name for name in picks.values()}
+        allowed = {}
+        winners = {}
+        for column, team in encoded:
+            group = team // group_size
+            possible = {j for j in range(n_leaves) if group in slot_groups[leaves[j]]}
+            if column < plan.n_direct:
+                possible &= {j for j in range(n_leaves) if leaves[j] == column}
+                if group != column // q:
+                    possible = set()
+            else:
+                possible &= under(column - plan.n_direct)[0]
+                winners[column - plan.n_direct] = team
+            allowed[team] = allowed.get(team, possible) & possible
+
+        for match, team in winners.items():
+            _, start, size = under(match)
+            if size == 2:
+                continue
+            child = start - n_leaves // (size // 2) + 2 * (match - start)
+            for mine, other in ((child, child + 1), (child + 1, child)):
+                if winners.get(mine, team) != team:
+                    allowed[team] &= under(other)[0]
+
+        changed = True
+        while changed:
+            changed = False
+            pinned = {}
+            for team, possible in allowed.items():
+                if not possible:
+                    raise ValueError(f"The picks for '{names[team]}' cannot all happen")
+                if len(possible) == 1:
+                    (leaf,) = possible
+                    if leaf in pinned:
+                        raise ValueError(f"The picks for '{names[pinned[leaf]]}' and "
+                                         f"'{names[team]}' cannot both happen")
+                    pinned[leaf] = team
+            for team, possible in allowed.items():
+                taken = {leaf for leaf, other in pinned.items() if other != team}
+                if possible & taken:
+                    allowed[team] = possible - taken
+                    changed = True
+
+    def matching(self, picks):
+        """Global indices of stored simulations agreeing with every pick"""
+        encoded = self._encode(picks)
+        parts = [segment.start + segment.matching(encoded) for segment in self.segments]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def conditional(self, picks, min_samples=2000, max_sims=400000, batch_size=50000):
+        """
+        Advancement counts over the simulations consistent with the picks
+
+        Stored samples are filtered through the slot index; only when fewer
+        than min_samples agree are more tournaments simulated and added to
+        the store. Each top-up at most doubles the store (less once the
+        observed match rate says fewer will do), up to max_sims in total.
+
+        Args:
+            picks: {slot name: team name}, e.g. engine.user_predictions
+            min_samples: Matching simulations wanted before answering
+            max_sims: Cap on the stored simulation count when topping up
+            batch_size: Tournaments per simulated array batch
+
+        Returns:
+            ConditionalResult: counts over the matching simulations (n_sims
+            is the number of matches); too_few_samples is set when max_sims
+            was reached with fewer than min_samples of them
+
+        Raises:
+            ValueError: for unknown slots or teams, and for picks the bracket
+                rules out (see _check_possible)
+        """
+        encoded = self._encode(picks)
+        self._check_possible(picks, encoded)
+        matched = sum(len(segment.matching(encoded)) for segment in self.segments)
+
+        while matched < min_samples and self.n_sims < max_sims:
+            n = max(batch_size, self.n_sims)
+            if matched:
+                wanted = int((min_samples - matched) * self.n_sims / matched * 1.2) + 1
+                n = min(n, max(batch_size, wanted))
+            first_new = len(self.segments)
+            self.extend(min(n, max_sims - self.n_sims), batch_size)
+            matched += sum(len(segment.matching(encoded))
+                           for segment in self.segments[first_new:])
+
+        result = ConditionalResult(self.engine.team_names, self.engine.plan.rounds, min_samples)
+        for segment in self.segments:
+            selected = segment.matching(encoded)
+            if len(selected) == segment.batch.n_sims:
+                self.engine.record(result, segment.batch)
+            elif len(selected):
+                self.engine.record(result, segment.batch.take(selected))
+        return result
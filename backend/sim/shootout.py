@@ -0,0 +1,42 @@
+"""
+Shootout - Pairwise penalty-shootout win probabilities
+
+A shootout model is anything with win_probability(elo_a, elo_b) on the
+simulator's 0-100 Elo scale: ml.ShootoutModel (fitted on shootouts.csv), or
+None for the original kick rule (models.match.penalty_win_probability).
+ShootoutTable evaluates it once per ordered pair of teams, so every engine
+decides a shootout with one uniform and a table lookup.
+"""
+
+import numpy as np
+from models.match import penalty_win_probability
+
+
+class ShootoutTable:
+    def __init__(self, team_names, win, elos=None):
+        self.team_names = list(team_names)
+        self.elos = None if elos is None else list(elos)  # Ratings the table was built for
+        self.win = np.asarray(win, dtype=np.float64)  # [a, b] = P(a beats b)
+        self.rows = self.win.tolist()                 # Same, for scalar lookups
+        self.ids = {name: i for i, name in enumerate(self.team_names)}
+
+    @classmethod
+    def build(cls, team_names, elos, model=None):
+        """
+        Table for teams with the given sim Elos
+
+        model: object with win_probability(elo_a, elo_b), or None for the
+            original Elo kick rule
+        """
+        probability = penalty_win_probability if model is None else model.win_probability
+        n = len(team_names)
+        win = np.full((n, n), 0.5)
+        for a in range(n):
+            for b in range(n):
+                if a != b:
+                    win[a, b] = probability(elos[a], elos[b])
+        return cls(team_names, win, elos)
+
+    def probability(self, team_a, team_b):
+        """P(team_a beats team_b in a shootout), by name"""
+        return self.rows[self.ids[team_a]][self.ids[team_b]]
@@ -0,0 +1,297 @@
+"""
+Snapshot - Mid-tournament state and forks of the remaining matches
+
+A TournamentSnapshot holds the results fixed so far as a few small int
+arrays, in VectorizedEngine's layout (team IDs are positions in the
+concatenated group lists):
+
+    group_scores  (G, 6, 2) goals per group match, -1 = not played
+    standings     (G, 4) finishing order of groups fixed without scores
+                  (restored from export_snapshot), -1 = not fixed
+    ko_scores     (K, 2) goals per knockout match (R16 ... final), -1 = unknown
+    ko_winners    (K,) winner per knockout match, -1 = not played
+
+Snapshots are immutable: with_result returns a copy with one more result,
+which costs a few hundred bytes. fork simulates only what is left, as
+array batches with the fixed results substituted, so no Team or Match
+object is copied.
+"""
+
+import numpy as np
+from .monte_carlo import MonteCarloResult
+from .tournament_engine import R16_PAIRINGS
+from .vectorized_engine import VectorizedEngine, GROUP_MATCHES, rank_groups
+
+
+# Knockout round name -> (first match index, matches)
+KNOCKOUT_SLOTS = {'16': (0, 8), '8': (8, 4), '4': (12, 2), 'final': (14, 1)}
+GROUP_MATCHES_PER_TEAM = 3
+
+
+class TournamentSnapshot:
+    def __init__(self, team_names, group_names, group_scores=None, standings=None,
+                 ko_scores=None, ko_winners=None):
+        self.team_names = list(team_names)
+        self.group_names = list(group_names)
+        n_groups = len(self.group_names)
+        n_knockout = 2 * n_groups - 1
+        self.group_scores = _array(group_scores, (n_groups, len(GROUP_MATCHES), 2))
+        self.standings = _array(standings, (n_groups, 4))
+        self.ko_scores = _array(ko_scores, (n_knockout, 2))
+        self.ko_winners = _array(ko_winners, (n_knockout,))
+        self._ids = {name: i for i, name in enumerate(self.team_names)}
+
+    @classmethod
+    def from_engine(cls, engine):
+        """
+        Results played so far in a TournamentEngine's current tournament
+
+        Take it at a stage boundary (e.g. after simulate_group_stage) or
+        after entering real results through the engine.
+        """
+        _check_format(engine)
+        snapshot = cls(*_names(engine.groups))
+        for g, group in enumerate(engine.groups):
+            for k, match in enumerate(group.matches):
+                if match.final_score is not None:
+                    snapshot.group_scores[g, k] = match.final_score
+
+        for round_name, matches in engine.knockout_matches.items():
+            start, _ = KNOCKOUT_SLOTS[round_name]
+            for k, match in enumerate(matches):
+                if match.final_score is None:
+                    continue
+                if match.shootout_winner is not None:
+                    winner = match.shootout_winner
+                elif match.final_score[0] > match.final_score[1]:
+                    winner = match.team_a
+                else:
+                    winner = match.team_b
+                snapshot.ko_scores[start + k] = match.final_score
+                snapshot.ko_winners[start + k] = snapshot._ids[winner.name]
+        return snapshot
+
+    @classmethod
+    def from_export(cls, data):
+        """
+        Snapshot from an export.export_snapshot dict
+
+        The export holds group tables rather than match scores, so finished
+        groups get fixed standings, and knockout winners are read back from
+        each team's matches played and elimination flag (scores unknown).
+        """
+        group_names = [group['name'] for group in data['groups']]
+        team_names = [name for group in data['groups'] for name in group['teams']]
+        snapshot = cls(team_names, group_names)
+        ids = snapshot._ids
+        for g, group in enumerate(data['groups']):
+            if group['standings']:
+                snapshot.standings[g] = [ids[row['team']] for row in group['standings']]
+        if (snapshot.standings[:, 0] < 0).any():
+            return snapshot
+
+        # Knockout matches played per team, and who is still in
+        teams = {team['name']: team for team in data['teams']}
+        played = [teams[name]['stats']['matches_played'] - GROUP_MATCHES_PER_TEAM
+                  for name in team_names]
+        alive = [not teams[name]['eliminated'] for name in team_names]
+
+        # A match of round `depth` was played once both teams have played
+        # more than `depth` knockout matches; the winner went further or is
+        # still in
+        sides = snapshot._bracket_sides()
+        for depth, (start, size) in enumerate(KNOCKOUT_SLOTS.values()):
+            for k in range(start, start + size):
+                a, b = sides[k]
+                if a < 0 or b < 0 or played[a] <= depth or played[b] <= depth:
+                    continue
+                if played[a] != played[b]:
+                    winner = a if played[a] > played[b] else b
+                else:
+                    winner = a if alive[a] else b
+                snapshot.ko_winners[k] = winner
+            sides = snapshot._bracket_sides()
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    @property
+    def stage(self):
+        """Next stage to play: 'group', '16', '8', '4', 'final' or 'done'"""
+        if not self._groups_decided().all():
+            return 'group'
+        for round_name, (start, size) in KNOCKOUT_SLOTS.items():
+            if (self.ko_winners[start:start + size] < 0).any():
+                return round_name
+        return 'done'
+
+    def copy(self):
+        return TournamentSnapshot(self.team_names, self.group_names, self.group_scores.copy(),
+                                  self.standings.copy(), self.ko_scores.copy(),
+                                  self.ko_winners.copy())
+
+    def with_result(self, team_a, team_b, score_a, score_b, winner=None):
+        """
+        Copy with one more real result
+
+        Group matches are found by their teams; a knockout result goes to
+        the match those teams contest in the fixed bracket, which needs
+        every earlier result feeding it. A level knockout score needs the
+        shootout `winner`.
+
+        Raises:
+            ValueError: unknown teams, negative scores (-1 means not
+                played), a shootout winner who did not play, or no open
+                match between the teams
+        """
+        a, b = self._id(team_a), self._id(team_b)
+        if score_a < 0 or score_b < 0:
+            raise ValueError(f'Scores cannot be negative: {score_a}-{score_b}')
+        snapshot = self.copy()
+
+        slot = self._group_slot(a, b)
+        if slot is not None:
+            g, k, swapped = slot
+            if snapshot.group_scores[g, k, 0] >= 0:
+                raise ValueError(f'{team_a} - {team_b} has already been played')
+            snapshot.group_scores[g, k] = (score_b, score_a) if swapped else (score_a, score_b)
+            return snapshot
+
+        k, swapped = self._knockout_slot(a, b)
+        if score_a == score_b:
+            if winner is None:
+                raise ValueError('A level knockout score needs the shootout winner')
+            winner_id = self._id(winner)
+            if winner_id not in (a, b):
+                raise ValueError(f'{winner} did not play {team_a} - {team_b}')
+        else:
+            winner_id = a if score_a > score_b else b
+        snapshot.ko_scores[k] = (score_b, score_a) if swapped else (score_a, score_b)
+        snapshot.ko_winners[k] = winner_id
+        return snapshot
+
+    def _id(self, name):
+        if name not in self._ids:
+            raise ValueError(f"Unknown team '{name}'")
+        return self._ids[name]
+
+    def _groups_decided(self):
+        """(G,) whether each group's standings are settled"""
+        return (self.standings[:, 0] >= 0) | (self.group_scores[..., 0] >= 0).all(axis=1)
+
+    def _group_slot(self, a, b):
+        """(group, match, swapped) of a group fixture, or None"""
+        if a == b:
+            raise ValueError('A match needs two different teams')
+        g, i = divmod(a, 4)
+        g_b, j = divmod(b, 4)
+        if g != g_b:
+            return None
+        if (i, j) in GROUP_MATCHES:
+            return g, GROUP_MATCHES.index((i, j)), False
+        return g, GROUP_MATCHES.index((j, i)), True
+
+    def _knockout_slot(self, a, b):
+        """(match index, swapped) of the open knockout match between two teams"""
+        if not self._groups_decided().all():
+            raise ValueError('Knockout results need the group stage to be complete')
+        sides = self._bracket_sides()
+        for k, (x, y) in enumerate(sides):
+            if self.ko_winners[k] >= 0 or x < 0 or y < 0:
+                continue
+            if (x, y) == (a, b):
+                return k, False
+            if (x, y) == (b, a):
+                return k, True
+        raise ValueError(f'No open knockout match between {self.team_names[a]} '
+                         f'and {self.team_names[b]}')
+
+    def _bracket_sides(self):
+        """(K, 2) teams of every knockout match as far as results fix them (-1 = open)"""
+        sides = np.full((len(self.ko_winners), 2), -1)
+        decided = self._groups_decided()
+        if not decided.all():
+            return sides
+
+        standings = self.standings.copy()
+        scored = standings[:, 0] < 0
+        if scored.any():
+            # Rank score-complete groups exactly as the engine does
+            scores = self.group_scores.transpose(1, 0, 2)[:, None].astype(np.float32)
+            group_teams = np.arange(len(self.team_names)).reshape(len(self.group_names), 4)
+            standings[scored] = rank_groups(scores[..., 0], scores[..., 1], group_teams)[0][scored]
+
+        sides[:len(R16_PAIRINGS)] = standings[:, :2].ravel()[np.array(R16_PAIRINGS)]
+        slots = list(KNOCKOUT_SLOTS.values())
+        for (start, size), (next_start, next_size) in zip(slots, slots[1:]):
+            sides[next_start:next_start + next_size] = \
+                self.ko_winners[start:start + size].reshape(-1, 2)
+        return sides
+
+    # ------------------------------------------------------------------
+    # Forks
+    # ------------------------------------------------------------------
+    def _engine(self, engine):
+        if not isinstance(engine, VectorizedEngine):
+            engine = VectorizedEngine.from_tournament(engine)
+        _check_format(engine)
+        if engine.team_names != self.team_names:
+            raise ValueError("The engine's teams do not match the snapshot")
+        return engine
+
+    def fork_batch(self, engine, n, rng):
+        """TournamentBatch of n continuations (engine: Vectorized or Tournament engine)"""
+        return self._engine(engine).simulate_batch(n, rng, fixed=self)
+
+    def fork(self, engine, n_sims, seed=None, batch_size=50000):
+        """
+        Simulate n_sims continuations from this state
+
+        Returns:
+            MonteCarloResult over the whole tournament (fixed results count
+            in every simulation)
+        """
+        engine = self._engine(engine)
+        rng = np.random.default_rng(seed)
+        result = MonteCarloResult(engine.team_names)
+        done = 0
+        while done < n_sims:
+            n = min(batch_size, n_sims - done)
+            engine.record(result, engine.simulate_batch(n, rng, fixed=self))
+            done += n
+        return result
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    def to_dict(self):
+        return {
+            'teams': self.team_names,
+            'groups': self.group_names,
+            'group_scores': self.group_scores.tolist(),
+            'standings': self.standings.tolist(),
+            'ko_scores': self.ko_scores.tolist(),
+            'ko_winners': self.ko_winners.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['teams'], data['groups'], data['group_scores'], data['standings'],
+                   data['ko_scores'], data['ko_winners'])
+
+
+def _array(values, shape):
+    if values is None:
+        return np.full(shape, -1, dtype=np.int16)
+    return np.array(values, dtype=np.int16).reshape(shape)
+
+
+def _check_format(engine):
+    """Snapshots use the classic layout (KNOCKOUT_SLOTS, R16_PAIRINGS)"""
+    if not engine.plan.is_classic:
+        raise ValueError(f"Snapshots support the classic format, not '{engine.plan.name}'")
+
+
+def _names(groups):
+    return [team.name for group in groups for team in group.teams], [group.name for group in groups]
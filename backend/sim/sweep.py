@@ -0,0 +1,188 @@
+"""
+Sweep - Sensitivity of advancement odds to Elo and parameter changes
+
+Every variant (Elo shifts for some teams and/or sim_params overrides) is
+simulated on the same random draws as the baseline: each batch's uniforms
+are drawn once, stored, and replayed to every variant's VectorizedEngine
+(common random numbers). A variant's tournaments then differ from the
+baseline's only where its changes flip a result, so the difference of two
+advancement probabilities has a far smaller variance than between
+independent runs. The per-simulation paired differences give its standard
+error directly; variance_ratio reports how many independent simulations
+each common-random-numbers simulation is worth.
+
+Variants are dicts:
+
+    name        Label (default: built from the changes)
+    elo         {team name: Elo points added}, sim scale as Team.elo
+    sim_params  {parameter: value} overriding the engine's, e.g.
+                {'base_goal_rate': 5}
+"""
+
+import numpy as np
+from .monte_carlo import MonteCarloResult, Z_95
+from .vectorized_engine import VectorizedEngine, _RecordedUniforms
+
+
+DEFAULT_BATCH_SIZE = 20000
+BASELINE = 'baseline'
+
+
+def elo_variants(team, shifts):
+    """Variants shifting one team's Elo by each of shifts"""
+    return [{'name': f'{team} {shift:+g}', 'elo': {team: shift}} for shift in shifts]
+
+
+def param_variants(param, values):
+    """Variants setting one sim_params entry to each of values"""
+    return [{'name': f'{param}={value}', 'sim_params': {param: value}} for value in values]
+
+
+def _variant_name(variant):
+    if 'name' in variant:
+        return variant['name']
+    changes = [f'{team} {shift:+g}' for team, shift in (variant.get('elo') or {}).items()]
+    changes += [f'{param}={value}' for param, value in (variant.get('sim_params') or {}).items()]
+    return ', '.join(changes) or BASELINE
+
+
+class Sweep:
+    def __init__(self, engine, variants):
+        """
+        Args:
+            engine: VectorizedEngine (or loaded TournamentEngine) of the
+                baseline
+            variants: List of variant dicts (see module docstring)
+
+        Raises:
+            ValueError: for duplicate variant names, and for Elo variants of
+                an engine with a matchup model (its goal tables ignore Elo,
+                so only shootouts would move)
+        """
+        if not isinstance(engine, VectorizedEngine):
+            engine = VectorizedEngine.from_tournament(engine)
+        if engine.goal_cdf is not None and any(variant.get('elo') for variant in variants):
+            raise ValueError('Elo variants need an engine without a matchup model: '
+                             'its goal tables do not depend on Elo')
+        self.names = [BASELINE] + [_variant_name(variant) for variant in variants]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError('Variant names must be unique')
+        self.engines = [engine] + [engine.variant(variant.get('elo'), variant.get('sim_params'))
+                                   for variant in variants]
+        self.team_names = engine.team_names
+        self.rounds = engine.plan.rounds
+        self.results = [MonteCarloResult(self.team_names, self.rounds) for _ in self.engines]
+
+        # (variants, rounds, teams) simulations where reaching the round
+        # differs from the baseline; the paired differences' second moment
+        self.changed = np.zeros((len(self.engines), len(self.rounds), len(self.team_names)),
+                                dtype=np.int64)
+
+    @property
+    def n_sims(self):
+        return self.results[0].n_sims
+
+    def simulate(self, n, rng):
+        """Simulate n tournaments per variant, every variant on the baseline's draws"""
+        draws = _RecordedUniforms(rng)
+        baseline = self._indicators(self.engines[0], self.engines[0].simulate_batch(n, draws),
+                                    self.results[0])
+        for k in range(1, len(self.engines)):
+            engine = self.engines[k]
+            reached = self._indicators(engine, engine.simulate_batch(n, draws.replayed()),
+                                       self.results[k])
+            self.changed[k] += (reached != baseline).sum(axis=1)
+        return self
+
+    def _indicators(self, engine, batch, result):
+        """Record a batch and return (rounds, n, teams) whether each team reached each round"""
+        engine.record(result, batch)
+        reached = np.zeros((len(self.rounds), batch.n_sims, len(self.team_names)), dtype=bool)
+        sims = np.arange(batch.n_sims)[:, None]
+        for r, ids in enumerate(engine._reached(batch).values()):
+            reached[r][sims, ids] = True
+        return reached
+
+    def probabilities(self):
+        """Variant name -> advancement table (MonteCarloResult.probabilities)"""
+        return {name: result.probabilities() for name, result in zip(self.names, self.results)}
+
+    def differences(self, z=Z_95):
+        """
+        Change of every advancement probability against the baseline
+
+        Returns:
+            dict: variant name -> team -> round -> {'difference',
+            'half_width' (z * paired standard error), 'independent_half_width'
+            (the same for two independent runs of n_sims each)}
+        """
+        n = self.n_sims or 1
+        base = self._counts(0) / n
+        table = {}
+        for k, name in enumerate(self.names[1:], start=1):
+            p = self._counts(k) / n
+            difference = p - base
+            paired = np.maximum(self.changed[k] / n - difference ** 2, 0)
+            independent = base * (1 - base) + p * (1 - p)
+            half_width = (z * np.sqrt(paired / n)).tolist()
+            independent_width = (z * np.sqrt(independent / n)).tolist()
+            difference = difference.tolist()
+            table[name] = {
+                team: {round_name: {'difference': difference[r][t],
+                                    'half_width': half_width[r][t],
+                                    'independent_half_width': independent_width[r][t]}
+                       for r, round_name in enumerate(self.rounds)}
+                for t, team in enumerate(self.team_names)
+            }
+        return table
+
+    def variance_ratio(self):
+        """
+        Variant name -> independent over paired variance of the differences
+
+        Summed over every team and round, so it is roughly how many
+        independent simulations per variant give the precision of one
+        common-random-numbers simulation (None when nothing changed).
+        """
+        n = self.n_sims or 1
+        base = self._counts(0) / n
+        ratios = {}
+        for k, name in enumerate(self.names[1:], start=1):
+            p = self._counts(k) / n
+            paired = np.maximum(self.changed[k] / n - (p - base) ** 2, 0).sum()
+            independent = (base * (1 - base) + p * (1 - p)).sum()
+            ratios[name] = float(independent / paired) if paired > 0 else None
+        return ratios
+
+    def _counts(self, k):
+        """(rounds, teams) advancement counts of variant k"""
+        counts = self.results[k].counts
+        return np.array([[counts[team][round_name] for team in self.team_names]
+                         for round_name in self.rounds], dtype=np.float64)
+
+    def to_dict(self, z=Z_95):
+        """JSON-ready summary"""
+        return {
+            'n_sims': self.n_sims,
+            'variants': self.names,
+            'probabilities': self.probabilities(),
+            'differences': self.differences(z),
+            'variance_ratio': self.variance_ratio(),
+        }
+
+
+def run_sweep(engine, variants, n_sims, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Simulate n_sims tournaments for the baseline and every variant on common draws
+
+    Returns:
+        Sweep
+    """
+    sweep = Sweep(engine, variants)
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done < n_sims:
+        n = min(batch_size, n_sims - done)
+        sweep.simulate(n, rng)
+        done += n
+    return sweep
@@ -3,14 +3,42 @@ TournamentEngine - Orchestrates entire tournament simulation
 """
 
 import json
+import random
+from datetime import date
+from time import perf_counter
 from models import Team, Group, Match, MatchResult
+from .monte_carlo import MonteCarloResult, AntitheticRandom, run_adaptive, Z_95
+from .shootout import ShootoutTable
+from .instrumentation import Instrumentation, DEFAULT_SAMPLE_EVERY
+from .formats import get_format
+from .events import (EventBus, RoundStarted, MatchFinished, PenaltyRound, ShootoutFinished,
+                     GroupStandings, Champion)
 
 
+# Round of 16 pairings of the classic format as indices into the qualifiers list
+# 0-A, 1-B, 2-C, 3-D, 4-E, 5-F, 6-G, 7-H
+# Winner positions: [0,1]=A, [2,3]=B, [4,5]=C, etc.
+R16_PAIRINGS = [
+    (0, 3),    # A1 vs B2
+    (4, 7),    # C1 vs D2
+    (8, 11),   # E1 vs F2
+    (12, 15),  # G1 vs H2
+    (2, 1),    # B1 vs A2
+    (6, 5),    # D1 vs C2
+    (10, 9),   # F1 vs E2
+    (14, 13)   # H1 vs G2
+]
+
 
 class TournamentEngine:
-    def __init__(self, delay=0.1):
+    def __init__(self, delay=0.1, tournament_format=None):
         self.teams = []
         self.groups = []
+
+        # sim.formats.TournamentFormat and its compiled plan (groups, tiebreakers, bracket)
+        self.format = get_format(tournament_format)
+        self.plan = self.format.plan
+
         self.bracket_root = None
         self.sim_params = {
             'delay': delay,
@@ -19,16 +47,64 @@ class TournamentEngine:
         }
         self.user_predictions = {}
 
-    def load_data(self, source='data/teams_2018.json'):
-        """Load tournament data from JSON file or hardcoded fallback"""
+        # Randomness and output for the current run (see run_monte_carlo)
+        self.rng = random
+        self.quiet = False
+
+        # Teams reaching each stage in the last simulated tournament
+        self.progress = {}
+
+        # Optional ml.MatchupMatrix replacing the ELO scoring formula
+        self.matchup = None
+
+        # Optional shootout model (e.g. ml.ShootoutModel; None = original kick
+        # rule) and its pairwise table, rebuilt when team Elos change
+        self.shootout_model = None
+        self._shootouts = None
+
+        # Optional ml.ScorerModel naming the scorer of every timeline goal
+        self.scorer_model = None
+
+        # ISO date of the loaded fixture's opening match (teams file 'kickoff',
+        # else 1 January of its 'year'); scorer models must not be fitted later
+        self.kickoff = None
+
+        # Knockout Match objects of the last tournament, by round name
+        self.knockout_matches = {}
+
+        # Typed progress events (sim.events); nothing is built without sinks
+        self.events = EventBus()
+
+        # Optional sim.instrumentation.Instrumentation (see enable_instrumentation)
+        self.instrumentation = None
+
+    def load_data(self, source='data/teams_2018.json', ratings=None):
+        """
+        Load tournament data from JSON file or hardcoded fallback
+
+        ratings: optional ml.EloEngine; when given, every team's elo comes from
+            its current rating (EloEngine.sim_elo) instead of the fixture
+        A JSON file may name its format (sim.formats.FORMATS), e.g.
+        "format": "2026"; otherwise the engine's format applies.
+
+        Raises:
+            ValueError: the attached scorer model was fitted after the
+                fixture's kickoff
+        """
         if source.endswith('.json'):
             # Load from JSON file
             with open(source, 'r') as f:
                 data = json.load(f)
 
             team_data = [(t['name'], t['elo'], t['group']) for t in data['teams']]
+            self.kickoff = data.get('kickoff') or (f"{data['year']}-01-01" if 'year' in data
+                                                   else None)
+            if 'format' in data:
+                self.format = get_format(data['format'])
+                self.plan = self.format.plan
         else:
             # Fallback: hardcoded data
+            self.kickoff = '2018-06-14'
             team_data = [
                 ("Russia", 18, "A"), ("Saudi Arabia", 10, "A"),
                 ("Uruguay", 54, "A"), ("Egypt", 42, "A"),
@@ -48,57 +124,255 @@ class TournamentEngine:
                 ("Senegal", 45, "H"), ("Japan", 38, "H")
             ]
 
+        self._check_scorer_model(self.scorer_model)
         for name, elo, group_name in team_data:
+            if ratings is not None:
+                elo = ratings.sim_elo(name)
             team = Team(name, elo, group_name)
+            if self.scorer_model is not None:
+                team.scorers = self.scorer_model.team(name)
             self.teams.append(team)
 
-        # Create groups
-        for group_letter in ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']:
+        self._build_groups()
+        self.refresh_shootouts()
+
+    def use_format(self, tournament_format):
+        """Play a TournamentFormat or FORMATS name; loaded teams are regrouped"""
+        self.format = get_format(tournament_format)
+        self.plan = self.format.plan
+        if self.teams:
+            self._build_groups()
+
+    def _build_groups(self):
+        """Groups of the loaded teams in the format's group order"""
+        self.groups = []
+        for group_letter in self.plan.group_letters:
             group_teams = [t for t in self.teams if t.group == group_letter]
+            if len(group_teams) != self.plan.group_size:
+                raise ValueError(f"Group {group_letter} has {len(group_teams)} teams; format "
+                                 f"'{self.plan.name}' plays groups of {self.plan.group_size}")
             group = Group(f"Group {group_letter}", group_teams)
             self.groups.append(group)
 
+    def use_matchup_model(self, matrix):
+        """Draw scores from a matchup model's expected goals (None = ELO formula)"""
+        self.matchup = matrix
+
+    def _expected_goals(self, match):
+        """Matchup-model goal means for a match, or None without a model"""
+        if self.matchup is None:
+            return None
+        return self.matchup.expected_goals(match.team_a.name, match.team_b.name)
+
+    def use_shootout_model(self, model):
+        """Decide shootouts with a model's win_probability (None = original kick rule)"""
+        self.shootout_model = model
+        self.refresh_shootouts()
+
+    def refresh_shootouts(self):
+        """
+        Rebuild the pairwise shootout table from the loaded teams' Elos
+
+        load_data and use_shootout_model call it; call it again after
+        changing any team.elo, since shootouts read the table only.
+        """
+        self._shootouts = ShootoutTable.build([team.name for team in self.teams],
+                                              [team.elo for team in self.teams],
+                                              self.shootout_model) if self.teams else None
+
+    def use_scorer_model(self, model):
+        """
+        Name goal scorers in match timelines from a model (None = anonymous goals)
+
+        Only the lazily built Match.events change; scores and every other
+        draw stay the same, so quiet runs cost nothing extra. Fit the model
+        as of the fixture: ScorerModel.fit(engine.kickoff).
+
+        Raises:
+            ValueError: the model was fitted after the loaded fixture's kickoff
+        """
+        self._check_scorer_model(model)
+        self.scorer_model = model
+        for team in self.teams:
+            team.scorers = None if model is None else model.team(team.name)
+
+    def _check_scorer_model(self, model):
+        """Reject a scorer model that has seen goals from after the fixture started"""
+        if model is None or self.kickoff is None:
+            return
+        if model.as_of > date.fromisoformat(self.kickoff).toordinal():
+            fitted = date.fromordinal(model.as_of).isoformat()
+            raise ValueError(f"Scorer model fitted as of {fitted}, after the fixture's kickoff "
+                             f"{self.kickoff}; fit it with as_of=engine.kickoff")
+
+    def _shootout_probability(self, match):
+        """P(team_a wins the shootout) from the pairwise table (see refresh_shootouts)"""
+        return self._shootouts.probability(match.team_a.name, match.team_b.name)
+
+    def set_prediction(self, slot, team_name):
+        """
+        Record a user pick, e.g. set_prediction('E1', 'Brazil') or ('QF-2', 'France')
+
+        Slots are the bracket slots of sim.sample_store.slot_names; the picks
+        in user_predictions feed SampleStore.conditional. A slot picked
+        again moves to the new team; a team keeps all of its slots.
+        """
+        team = next((t for t in self.teams if t.name == team_name), None)
+        if team is None:
+            raise ValueError(f"Unknown team '{team_name}'")
+        previous = self.user_predictions.get(slot)
+        if previous is not None:
+            next(t for t in self.teams if t.name == previous).user_predictions.remove(slot)
+        self.user_predictions[slot] = team_name
+        team.user_predictions.append(slot)
+
+    def clear_predictions(self):
+        """Drop all user picks"""
+        self.user_predictions = {}
+        for team in self.teams:
+            team.user_predictions = []
+
+    def reset(self):
+        """Clear per-run state on the loaded teams and groups"""
+        for team in self.teams:
+            team.reset()
+        for group in self.groups:
+            group.reset()
+        self.progress = {}
+        self.knockout_matches = {}
+
+    def enable_instrumentation(self, sample_every=DEFAULT_SAMPLE_EVERY):
+        """
+        Start collecting per-phase timers and counters; returns the Instrumentation
+
+        sample_every: time per-match phases in one run of each stage out of this many
+            (1 = every match; see sim.instrumentation)
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(sample_every)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Stop collecting; returns the collected Instrumentation (or None)"""
+        instrumentation, self.instrumentation = self.instrumentation, None
+        return instrumentation
+
+    def _bus(self):
+        """Event bus to emit to, or None (quiet or no sinks)"""
+        return None if self.quiet or not self.events.sinks else self.events
+
+    def _start_match(self):
+        """Align antithetic draws match by match (no-op for other generators)"""
+        if isinstance(self.rng, AntitheticRandom):
+            self.rng.mark()
+
     def simulate_group_stage(self):
-        """Simulate all group matches and return qualifiers"""
+        """
+        Simulate all group matches and return qualifiers
+
+        Returns:
+            list of Team in the plan's qualifier slot order: the direct
+            qualifiers (A1, A2, B1, ...), then the best thirds by bracket slot
+        """
+        plan = self.plan
         qualifiers = []
+        replay = not self.quiet and self.sim_params['delay'] > 0  # Paced replay
+        bus = self._bus()
+        inst = self.instrumentation
+        timed = inst.sample('group_stage') if inst else False
+        if inst:
+            started = inst.start()
+            timeline = stats = standings = 0.0
         for group in self.groups:
             group.schedule_matches()
             for match in group.matches:
-                match.generate_timeline(self.sim_params)
-                match.play(delay=self.sim_params['delay'])
+                if timed:
+                    t0 = perf_counter()
+                self._start_match()
+                match.generate_timeline(self.sim_params, rng=self.rng,
+                                        expected_goals=self._expected_goals(match))
+                match.play(replay_mode=replay, delay=self.sim_params['delay'], verbose=False)
+                if timed:
+                    t1 = perf_counter()
                 match.update_team_stats()
+                if timed:
+                    t2 = perf_counter()
+                    timeline += t1 - t0
+                    stats += t2 - t1
+                if bus:
+                    bus.emit(MatchFinished(match, group.name))
 
-            top_2 = group.compute_standings()
-            qualifiers.extend(top_2)
-
-            # Print group results (preserve original output)
-            print("Games finished!")
-            points_list = [t.points for t in group.teams]
-            gd_list = [t.goal_diff for t in group.teams]
-            print(points_list)
-            print(gd_list)
-            print(f"winner {top_2[0].name}")
-            print(f"Runner-up {top_2[1].name}")
+            if timed:
+                t0 = perf_counter()
+            top = group.compute_standings(plan.tiebreakers, plan.qualifiers)
+            if timed:
+                standings += perf_counter() - t0
+            qualifiers.extend(top)
+            if bus:
+                bus.emit(GroupStandings(group, top))
+        if plan.best_thirds:
+            qualifiers.extend(self._best_thirds())
 
+        if inst:
+            matches = [match for group in self.groups for match in group.matches]
+            if timed:
+                inst.add('timeline', timeline, len(matches))
+                inst.add('stats', stats, len(matches))
+                inst.add('standings', standings, len(self.groups))
+            inst.count_matches(matches)
+            inst.calls['standings'] += len(self.groups)
+            inst.stop('group_stage', started)
         return qualifiers
 
     def simulate_knockout_round(self, teams, round_name):
         """Simulate a knockout round (R16, QF, SF, F)"""
-        print(f" knockout {round_name} stage")
+        replay = not self.quiet and self.sim_params['delay'] > 0
+        bus = self._bus()
+        inst = self.instrumentation
+        timed = inst.sample('knockout') if inst else False
+        if inst:
+            started = inst.start()
+            timeline = penalties = stats = 0.0
+        if bus:
+            bus.emit(RoundStarted(round_name))
         winners = []
+        matches = self.knockout_matches[round_name] = []
 
         for i in range(0, len(teams), 2):
             match = Match(teams[i], teams[i+1], is_group=False)
-            match.generate_timeline(self.sim_params)
-            match.play(delay=self.sim_params['delay'])
+            matches.append(match)
+            if timed:
+                t0 = perf_counter()
+            self._start_match()
+            match.generate_timeline(self.sim_params, rng=self.rng,
+                                    expected_goals=self._expected_goals(match))
+            match.play(replay_mode=replay, delay=self.sim_params['delay'], verbose=False)
+            if timed:
+                timeline += perf_counter() - t0
+            if bus:
+                bus.emit(MatchFinished(match, round_name))
 
             # Handle draw in knockout
             if match.result == MatchResult.DRAW:
-                winner = match.play_penalties(delay=self.sim_params['delay'])
+                delay = self.sim_params['delay'] if replay else 0
+                if timed:
+                    t0 = perf_counter()
+                on_round = self._penalty_emitter(bus, match) if bus else None
+                winner = match.play_penalties(delay=delay, rng=self.rng, verbose=False,
+                                              on_round=on_round,
+                                              win_probability=self._shootout_probability(match))
+                if timed:
+                    penalties += perf_counter() - t0
+                if bus:
+                    bus.emit(ShootoutFinished(match, winner))
             else:
                 winner = match.team_a if match.result == MatchResult.A_WIN else match.team_b
 
+            if timed:
+                t0 = perf_counter()
             match.update_team_stats()
+            if timed:
+                stats += perf_counter() - t0
             winner.eliminated = False
             winners.append(winner)
 
@@ -106,36 +380,130 @@ class TournamentEngine:
             loser = match.team_b if winner == match.team_a else match.team_a
             loser.eliminated = True
 
+        if inst:
+            if timed:
+                inst.add('timeline', timeline, len(matches))
+                inst.add('penalties', penalties,
+                         sum(1 for m in matches if m.shootout_winner is not None))
+                inst.add('stats', stats, len(matches))
+            inst.count_matches(matches)
+            inst.stop('knockout', started)
         return winners
 
+    def _best_thirds(self):
+        """Best third-placed teams, placed into the bracket by the plan's allocation table"""
+        plan = self.plan
+        keys = []
+        for g, group in enumerate(self.groups):
+            record = group.table()[group.standings[plan.qualifiers]]
+            keys.append((tuple(record[c] for c in plan.third_tiebreakers), -g))
+        best = sorted(range(len(self.groups)), key=keys.__getitem__, reverse=True)
+        mask = sum(1 << g for g in best[:plan.best_thirds])
+        return [self.groups[g].standings[plan.qualifiers] for g in plan.third_lookup[mask]]
+
+    @staticmethod
+    def _penalty_emitter(bus, match):
+        """play_penalties on_round callback emitting PenaltyRound events"""
+        return lambda number, pen_a, pen_b: bus.emit(PenaltyRound(match, number, pen_a, pen_b))
+
     def simulate_tournament(self):
         """Orchestrates entire flow: group stage → knockout rounds → champion"""
+        inst = self.instrumentation
+        if inst:
+            started = inst.start()
+
         # Group stage
+        plan = self.plan
         qualifiers = self.simulate_group_stage()
+        self.progress = {
+            'group_win': [group.standings[0] for group in self.groups],
+            plan.stages[0]: qualifiers,
+        }
+
+        # Knockout rounds down the plan's bracket
+        teams = [qualifiers[i] for i in plan.first_round]
+        for label, stage in zip(plan.knockout_labels, plan.stages[1:]):
+            teams = self.simulate_knockout_round(teams, label)
+            self.progress[stage] = teams
+        champion = teams
+
+        if inst:
+            inst.stop('tournament', started)
+            inst.count('tournaments')
 
-        # Round of 16 (preserve original bracket structure)
-        # 0-A, 1-B, 2-C, 3-D, 4-E, 5-F, 6-G, 7-H
-        # Winner positions: [0,1]=A, [2,3]=B, [4,5]=C, etc.
-        r16_matchups = [
-            (qualifiers[0], qualifiers[3]),   # A1 vs B2
-            (qualifiers[4], qualifiers[7]),   # C1 vs D2
-            (qualifiers[8], qualifiers[11]),  # E1 vs F2
-            (qualifiers[12], qualifiers[15]), # G1 vs H2
-            (qualifiers[2], qualifiers[1]),   # B1 vs A2
-            (qualifiers[6], qualifiers[5]),   # D1 vs C2
-            (qualifiers[10], qualifiers[9]),  # F1 vs E2
-            (qualifiers[14], qualifiers[13])  # H1 vs G2
-        ]
-
-        r16_teams = []
-        for t1, t2 in r16_matchups:
-            r16_teams.extend([t1, t2])
-
-        quarter_finalists = self.simulate_knockout_round(r16_teams, "16")
-        semi_finalists = self.simulate_knockout_round(quarter_finalists, "8")
-        finalists = self.simulate_knockout_round(semi_finalists, "4")
-
-        print("final")
-        champion = self.simulate_knockout_round(finalists, "final")
+        bus = self._bus()
+        if bus:
+            bus.emit(Champion(champion[0]))
 
         return champion[0]
+
+    def run_monte_carlo(self, n_sims, seed=None, antithetic=False):
+        """
+        Run many quiet tournaments (no printing, no replay delay)
+
+        Per-run state is reset on the loaded Team/Group objects rather than
+        reloading them.
+
+        Args:
+            n_sims: Number of tournaments to simulate (rounded up to even
+                when antithetic)
+            seed: Seed for a private random.Random (None = nondeterministic)
+            antithetic: Pair every tournament with one replaying 1 - u of its
+                match uniforms (variance reduction)
+
+        Returns:
+            MonteCarloResult: per-team advancement counts; use
+            probabilities() for the table of group win/R16/QF/SF/F/champion odds
+        """
+        rng = AntitheticRandom(seed) if antithetic else random.Random(seed)
+        return self._run_chunk(n_sims, rng)
+
+    def run_to_precision(self, target=0.002, z=Z_95, seed=None, antithetic=False,
+                         chunk_size=2000, max_sims=2000000):
+        """
+        Run tournaments until every advancement probability is within +/- target
+
+        Args:
+            target: Wanted confidence half-width (0.002 = +/-0.2 points)
+            z: Normal quantile of the confidence level (1.96 = 95%)
+            seed: Seed for the private generator shared by all chunks
+            antithetic: Use antithetic pairs (see run_monte_carlo)
+            chunk_size: Tournaments in the first (and smallest) chunk
+            max_sims: Upper bound on tournaments
+
+        Returns:
+            MonteCarloResult: intervals(z) gives the reached intervals and
+            n_sims the tournaments used
+        """
+        rng = AntitheticRandom(seed) if antithetic else random.Random(seed)
+        return run_adaptive(lambda n: self._run_chunk(n, rng), target, z, chunk_size, max_sims)
+
+    def _run_chunk(self, n_sims, rng):
+        """Simulate n_sims quiet tournaments drawing from rng"""
+        result = MonteCarloResult([t.name for t in self.teams], self.plan.rounds)
+        saved_rng, saved_quiet = self.rng, self.quiet
+        self.rng = rng
+        self.quiet = True
+        try:
+            if isinstance(rng, AntitheticRandom):
+                for _ in range((n_sims + 1) // 2):
+                    first = self._run_one(result, mirror=False)
+                    second = self._run_one(result, mirror=True)
+                    result.record_pair(first, second)
+            else:
+                for _ in range(n_sims):
+                    self._run_one(result)
+        finally:
+            self.rng, self.quiet = saved_rng, saved_quiet
+            self.reset()
+        return result
+
+    def _run_one(self, result, mirror=None):
+        """Simulate and record one tournament; returns round -> set of team names"""
+        if mirror is not None:
+            self.rng.begin(mirror)
+        self.reset()
+        self.simulate_tournament()
+        result.record(self.progress, self.teams)
+        return {round_name: {team.name for team in reached}
+                for round_name, reached in self.progress.items()}
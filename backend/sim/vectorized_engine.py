@@ -0,0 +1,643 @@
+"""
+VectorizedEngine - NumPy tournament engine simulating many brackets as arrays
+
+Teams are integer IDs (position in the concatenated group lists) and Elo is a
+float array. Every random quantity of a batch is drawn up front as blocks of
+uniforms, so one tournament is a row across a handful of arrays instead of a
+graph of Team/Match objects. Score and upset rules mirror
+Match.generate_timeline, and shootouts use the same ShootoutTable as
+Match.play_penalties, so the outcome distribution matches TournamentEngine.
+Group sizes, tiebreakers and bracket wiring come from a compiled
+sim.formats.FormatPlan.
+"""
+
+import copy
+from itertools import combinations
+import numpy as np
+from models.match import MAX_MODEL_GOALS, MAX_YELLOWS, RED_CARD_RATE
+from .monte_carlo import MonteCarloResult, run_adaptive, Z_95
+from .shootout import ShootoutTable
+from .formats import DEFAULT_FORMAT
+
+
+# Round-robin order used by Group.schedule_matches (local team positions)
+GROUP_MATCHES = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+
+# Uniforms per match: score_a, score_b, redraw check, redraw, swap check
+SCORE_UNIFORMS = 5
+# Uniforms per knockout match: score + 1 deciding a shootout
+KNOCKOUT_UNIFORMS = SCORE_UNIFORMS + 1
+
+# Simulations ranked at a time in the group stage, so the temporaries stay in cache
+GROUP_CHUNK = 1024
+
+# Card outcomes of a group match, drawn from one uniform when fair play
+# breaks ties: yellow count x card sides (one bit per yellow, bit 4 the
+# red's, as in Match) x RED_CARD_BINS bins of which RED_CARD_RATE are red
+RED_CARD_BINS = 25
+CARD_OUTCOMES = (MAX_YELLOWS + 1) * 32 * RED_CARD_BINS
+
+
+class TournamentBatch:
+    """Per-simulation arrays for a batch of n tournaments"""
+
+    FIELDS = ('group_scores', 'standings', 'ko_teams', 'ko_scores', 'ko_winners')
+
+    def __init__(self, group_scores, standings, ko_teams, ko_scores, ko_winners):
+        self.group_scores = group_scores  # (n, G, M, 2) goals in each group match
+        self.standings = standings  # (n, G, S) team IDs in finishing order
+        self.ko_teams = ko_teams  # (n, K, 2) team IDs per knockout match (first round..F)
+        self.ko_scores = ko_scores  # (n, K, 2) goals per knockout match
+        self.ko_winners = ko_winners  # (n, K) winning team ID per knockout match
+
+    @property
+    def n_sims(self):
+        return self.standings.shape[0]
+
+    @property
+    def qualifiers(self):
+        """(n, 2G) team IDs ordered A1, A2, B1, B2, ... like simulate_group_stage"""
+        return self.standings[:, :, :2].reshape(self.n_sims, -1)
+
+    @classmethod
+    def concatenate(cls, batches):
+        """One batch holding the simulations of several, in order"""
+        return cls(*(np.concatenate([getattr(batch, field) for batch in batches])
+                     for field in cls.FIELDS))
+
+    def take(self, index):
+        """Batch holding only the simulations selected by an index array or mask"""
+        return TournamentBatch(self.group_scores[index], self.standings[index],
+                               self.ko_teams[index], self.ko_scores[index],
+                               self.ko_winners[index])
+
+    def compact(self):
+        """Copy with team IDs narrowed to int8 (int16 for >127 teams) for storage"""
+        n_teams = int(self.standings.max()) + 1 if self.standings.size else 0
+        dtype = np.int8 if n_teams <= 127 else np.int16
+        return TournamentBatch(np.ascontiguousarray(self.group_scores),
+                               self.standings.astype(dtype),
+                               self.ko_teams.astype(dtype), self.ko_scores,
+                               self.ko_winners.astype(dtype))
+
+
+class VectorizedEngine:
+    def __init__(self, groups, sim_params=None, matchup=None, shootouts=None, plan=None):
+        self.plan = plan or DEFAULT_FORMAT.plan
+        if (len(groups) != self.plan.n_groups
+                or any(len(group.teams) != self.plan.group_size for group in groups)):
+            raise ValueError(f"Format '{self.plan.name}' needs {self.plan.n_groups} groups "
+                             f"of {self.plan.group_size}")
+        self.teams = [team for group in groups for team in group.teams]
+        self.team_names = [team.name for team in self.teams]
+        self.group_names = [group.name for group in groups]
+        self.elo = np.array([team.elo for team in self.teams], dtype=np.float64)
+        self.sim_params = dict(sim_params or {'base_goal_rate': 6})
+
+        # (G, S) team IDs of each group, in group order
+        self.group_teams = np.arange(len(self.teams)).reshape(len(groups), -1)
+
+        # Local positions of the two sides of every group match
+        self.match_a = self.plan.match_a
+        self.match_b = self.plan.match_b
+
+        # Qualifier slots feeding the first knockout round, pairwise (team_a, team_b)
+        self.first_round = self.plan.first_round
+
+        # Optional matchup model: Poisson CDFs [a, b, k] = P(goals <= k), per side
+        self.goal_cdf = None
+        if matchup is not None:
+            matrix = matchup.reindex(self.team_names)
+            self.goal_cdf = (poisson_cdf_table(matrix.home_goals),
+                             poisson_cdf_table(matrix.away_goals))
+
+        # [a, b] = P(a wins a shootout against b); shootouts: model as in
+        # TournamentEngine.use_shootout_model (None = original kick rule)
+        self.shootouts = shootouts
+        self.shootout_win = ShootoutTable.build(self.team_names, self.elo.tolist(),
+                                                shootouts).win.astype(np.float32)
+
+    @classmethod
+    def from_tournament(cls, engine):
+        """Build from a loaded TournamentEngine (same teams, groups, params, models and format)"""
+        return cls(engine.groups, engine.sim_params, engine.matchup, engine.shootout_model,
+                   engine.plan)
+
+    def variant(self, elo_shift=None, sim_params=None):
+        """
+        Copy of the engine with some teams' Elo shifted and/or sim_params overridden
+
+        Args:
+            elo_shift: {team name: points added to its Elo (sim scale, as Team.elo)}
+            sim_params: Parameters replacing the engine's, e.g. {'base_goal_rate': 5}
+
+        A matchup model's goal tables are shared, so with one Elo shifts only
+        move shootouts. The uniform layout of simulate_batch does not depend
+        on either, so a variant can replay another engine's draws.
+        """
+        engine = copy.copy(self)
+        engine.sim_params = {**self.sim_params, **(sim_params or {})}
+        if elo_shift:
+            unknown = sorted(set(elo_shift) - set(self.team_names))
+            if unknown:
+                raise ValueError(f"Unknown team(s): {', '.join(unknown)}")
+            engine.elo = self.elo.copy()
+            for name, shift in elo_shift.items():
+                engine.elo[self.team_names.index(name)] += shift
+            if (engine.elo < 0).any():
+                raise ValueError('Elo shifts must leave every rating non-negative')
+            engine.shootout_win = ShootoutTable.build(self.team_names, engine.elo.tolist(),
+                                                      self.shootouts).win.astype(np.float32)
+        return engine
+
+    # ------------------------------------------------------------------
+    # Match primitives
+    # ------------------------------------------------------------------
+    def _draw_scores(self, u, team_a, team_b):
+        """
+        Scores for an array of matches, as in Match.generate_timeline
+
+        Args:
+            u: (SCORE_UNIFORMS, ...) uniforms; the trailing shape is the matches
+            team_a, team_b: Team IDs of each side, broadcastable to the match shape
+
+        Returns:
+            (score_a, score_b) float32 arrays of whole goals
+        """
+        if self.goal_cdf is not None:
+            cdf_a, cdf_b = self.goal_cdf
+            score_a = (u[0][..., None] > cdf_a[team_a, team_b]).sum(axis=-1)
+            score_b = (u[1][..., None] > cdf_b[team_a, team_b]).sum(axis=-1)
+            return score_a.astype(np.float32), score_b.astype(np.float32)
+
+        elo_a = self.elo[team_a]
+        elo_b = self.elo[team_b]
+        rate = self.sim_params['base_goal_rate']
+        scale_a = np.float32(rate) * elo_a.astype(np.float32) / np.float32(100)
+        scale_b = np.float32(rate) * elo_b.astype(np.float32) / np.float32(100)
+        score_a = np.floor(u[0] * scale_a)
+        score_b = np.floor(u[1] * scale_b)
+
+        # Upset avoidance: favoured team_b gets a level score re-drawn and a loss reversed
+        underdog_b = elo_b - elo_a > 20
+        redraw = underdog_b & (score_a == score_b) & (u[2] > 0.01)
+        np.copyto(score_a, np.floor(u[3] * scale_a), where=redraw)
+        swap = underdog_b & (score_a > score_b) & (u[4] > 0.01)
+        return np.where(swap, score_b, score_a), np.where(swap, score_a, score_b)
+
+    # ------------------------------------------------------------------
+    # Tournament
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _fair_play(u):
+        """
+        Fair-play deductions of both sides, one uniform per match
+
+        Cards follow Match.generate_timeline: 0-MAX_YELLOWS yellows, a red
+        with probability RED_CARD_RATE, one side bit per card. The uniform
+        picks one of CARD_OUTCOMES equally likely outcomes in _FAIR_PLAY.
+        """
+        index = (u * np.float32(CARD_OUTCOMES)).astype(np.intp)
+        return _FAIR_PLAY[0][index], _FAIR_PLAY[1][index]
+
+    def simulate_batch(self, n, rng, fixed=None):
+        """
+        Simulate n tournaments
+
+        Args:
+            n: Number of tournaments
+            rng: numpy.random.Generator supplying all uniforms
+            fixed: Optional sim.snapshot.TournamentSnapshot whose results
+                replace the drawn ones in every simulation (uniforms are
+                still drawn, so the layout stays fixed)
+
+        Returns:
+            TournamentBatch; results that were played but whose score is not
+            known (snapshots restored from export_snapshot) have score -1
+        """
+        plan = self.plan
+        n_groups = self.group_teams.shape[0]
+        n_matches = len(plan.group_matches)
+
+        # Group stage: every (match, simulation, group) at once, uniforms
+        # drawn for the whole batch and used a cache-sized chunk at a time
+        u = rng.random((SCORE_UNIFORMS, n_matches, n, n_groups), dtype=np.float32)
+        cards = None
+        if plan.uses_cards:
+            cards = rng.random((n_matches, n, n_groups), dtype=np.float32)
+        team_a = self.group_teams[:, self.match_a].T[:, None, :]
+        team_b = self.group_teams[:, self.match_b].T[:, None, :]
+        group_scores = np.empty((n, n_groups, n_matches, 2), dtype=np.int8)
+        standings = np.empty((n, n_groups, plan.group_size), dtype=np.int64)
+        third_keys = np.empty((n, n_groups)) if plan.best_thirds else None
+        for start in range(0, n, GROUP_CHUNK):
+            part = slice(start, start + GROUP_CHUNK)
+            score_a, score_b = self._draw_scores(u[:, :, part], team_a, team_b)
+            fair_play = None if cards is None else self._fair_play(cards[:, part])
+            if fixed is not None:
+                played = (fixed.group_scores[..., 0] >= 0).T[:, None, :]
+                score_a = np.where(played, fixed.group_scores[..., 0].T[:, None, :], score_a)
+                score_b = np.where(played, fixed.group_scores[..., 1].T[:, None, :], score_b)
+            standings[part], thirds = _rank(score_a, score_b, self.group_teams, plan, fair_play)
+            if thirds is not None:
+                third_keys[part] = thirds
+            group_scores[part, :, :, 0] = score_a.transpose(1, 2, 0)
+            group_scores[part, :, :, 1] = score_b.transpose(1, 2, 0)
+        if fixed is not None:
+            ranked = fixed.standings[:, 0] >= 0
+            if ranked.any():
+                standings[:, ranked] = fixed.standings[ranked]
+                group_scores[:, ranked] = -1
+
+        # Knockout: first-round pairs from the plan's bracket, then winners pair off
+        slots = standings[:, :, :plan.qualifiers].reshape(n, -1)
+        if plan.best_thirds:
+            slots = np.concatenate([slots, self._best_thirds(standings, third_keys)], axis=1)
+        teams = slots[:, self.first_round].reshape(n, -1, 2)
+        ko_teams, ko_scores, ko_winners = [], [], []
+        start = 0
+        while True:
+            u = rng.random((KNOCKOUT_UNIFORMS,) + teams.shape[:2], dtype=np.float32)
+            score_a, score_b = self._draw_scores(u, teams[..., 0], teams[..., 1])
+
+            # Level after 90 minutes: one uniform against the shootout table
+            shootout = u[SCORE_UNIFORMS] < self.shootout_win[teams[..., 0], teams[..., 1]]
+            a_wins = np.where(score_a == score_b, shootout, score_a > score_b)
+            winners = np.where(a_wins, teams[..., 0], teams[..., 1])
+            scores = np.stack([score_a, score_b], axis=-1).astype(np.int8)
+
+            if fixed is not None:
+                stop = start + winners.shape[1]
+                done = fixed.ko_winners[start:stop] >= 0
+                if done.any():
+                    winners[:, done] = fixed.ko_winners[start:stop][done]
+                    scores[:, done] = fixed.ko_scores[start:stop][done]
+                start = stop
+
+            ko_teams.append(teams)
+            ko_scores.append(scores)
+            ko_winners.append(winners)
+            if winners.shape[1] == 1:
+                break
+            teams = winners.reshape(n, -1, 2)
+
+        return TournamentBatch(
+            group_scores, standings,
+            np.concatenate(ko_teams, axis=1),
+            np.concatenate(ko_scores, axis=1),
+            np.concatenate(ko_winners, axis=1),
+        )
+
+    def _best_thirds(self, standings, third_keys):
+        """
+        (n, thirds) team IDs of the best third-placed teams, in bracket slot order
+
+        The best_thirds highest keys (ties: earlier group) pick a set of
+        groups - those with fewer than best_thirds keys above them; the
+        plan's allocation table places each group's third.
+        """
+        plan = self.plan
+        n, n_groups = third_keys.shape
+        keys = (third_keys * n_groups + np.arange(n_groups - 1, -1, -1)).T.copy()
+        above = np.zeros(keys.shape, dtype=np.uint8)
+        for key in keys:
+            above += key > keys
+        mask = ((above < plan.best_thirds) * (1 << np.arange(n_groups))[:, None]).sum(axis=0)
+        groups = plan.third_table[mask]
+        return standings[np.arange(n)[:, None], groups, plan.qualifiers]
+
+    def _reached(self, batch):
+        """Round name -> (n, k) IDs of the teams reaching it in each simulation"""
+        stages = self.plan.stages
+        n_round = len(self.first_round) // 2
+        reached = {
+            'group_win': batch.standings[:, :, 0],
+            stages[0]: batch.ko_teams[:, :n_round].reshape(batch.n_sims, -1),
+        }
+        start = 0
+        for round_name in stages[1:]:
+            reached[round_name] = batch.ko_winners[:, start:start + n_round]
+            start += n_round
+            n_round //= 2
+        return reached
+
+    def record(self, result, batch):
+        """Add a batch's advancement counts to a MonteCarloResult"""
+        n_teams = len(self.teams)
+        for round_name, ids in self._reached(batch).items():
+            counts = np.bincount(ids.ravel(), minlength=n_teams)
+            for name, count in zip(self.team_names, counts.tolist()):
+                result.counts[name][round_name] += count
+
+        group_teams = np.stack([self.group_teams[:, self.match_a],
+                                self.group_teams[:, self.match_b]], axis=-1)
+        # Unknown scores (-1) count no goals
+        goals = np.bincount(np.broadcast_to(group_teams, batch.group_scores.shape).ravel(),
+                            weights=np.maximum(batch.group_scores, 0).ravel(), minlength=n_teams)
+        goals += np.bincount(batch.ko_teams.ravel(), weights=np.maximum(batch.ko_scores, 0).ravel(),
+                             minlength=n_teams)
+        for name, count in zip(self.team_names, goals.astype(np.int64).tolist()):
+            result.goals[name] += count
+
+        result.n_sims += batch.n_sims
+
+    def team_goals(self, batch):
+        """(n, teams) goals each team scored in each simulation (shootouts excluded)"""
+        n_sims, n_teams = batch.n_sims, len(self.teams)
+        group_teams = np.stack([self.group_teams[:, self.match_a],
+                                self.group_teams[:, self.match_b]], axis=-1)
+        group_index = np.arange(n_sims)[:, None, None, None] * n_teams + group_teams
+        ko_index = np.arange(n_sims)[:, None, None] * n_teams + batch.ko_teams
+        goals = np.bincount(group_index.ravel(), weights=np.maximum(batch.group_scores, 0).ravel(),
+                            minlength=n_sims * n_teams)
+        goals += np.bincount(ko_index.ravel(), weights=np.maximum(batch.ko_scores, 0).ravel(),
+                             minlength=n_sims * n_teams)
+        return goals.astype(np.int64).reshape(n_sims, n_teams)
+
+    def record_pair(self, result, first, second):
+        """Add the both-reached counts of antithetic batches (simulation i of each)"""
+        n_teams = len(self.teams)
+        rows = np.arange(first.n_sims)[:, None]
+        reached_second = self._reached(second)
+        for round_name, ids in self._reached(first).items():
+            in_first = np.zeros((first.n_sims, n_teams), dtype=bool)
+            in_second = np.zeros((first.n_sims, n_teams), dtype=bool)
+            in_first[rows, ids] = True
+            in_second[rows, reached_second[round_name]] = True
+            both = (in_first & in_second).sum(axis=0)
+            for name, count in zip(self.team_names, both.tolist()):
+                result.both[name][round_name] += count
+        result.pairs += first.n_sims
+
+    def run_monte_carlo(self, n_sims, seed=None, batch_size=50000, antithetic=False):
+        """
+        Run n_sims tournaments in batches
+
+        Args:
+            n_sims: Number of tournaments to simulate (rounded up to even
+                when antithetic)
+            seed: Seed for numpy.random.default_rng (None = nondeterministic)
+            batch_size: Tournaments simulated per array batch (bounds memory)
+            antithetic: Follow every batch with one drawn from 1 - u of its
+                uniforms; the fixed uniform layout pairs every match exactly
+
+        Returns:
+            MonteCarloResult
+        """
+        return self._run_chunk(n_sims, np.random.default_rng(seed), batch_size, antithetic)
+
+    def run_to_precision(self, target=0.002, z=Z_95, seed=None, antithetic=False,
+                         chunk_size=50000, max_sims=10000000, batch_size=50000):
+        """
+        Run tournaments until every advancement probability is within +/- target
+
+        Same contract as TournamentEngine.run_to_precision.
+        """
+        rng = np.random.default_rng(seed)
+        return run_adaptive(lambda n: self._run_chunk(n, rng, batch_size, antithetic),
+                            target, z, chunk_size, max_sims)
+
+    def _run_chunk(self, n_sims, rng, batch_size, antithetic=False):
+        """Simulate n_sims tournaments drawing from rng"""
+        result = MonteCarloResult(self.team_names, self.plan.rounds)
+        if antithetic:
+            batch_size = max(1, batch_size // 2)
+            n_sims = (n_sims + 1) // 2
+        done = 0
+        while done < n_sims:
+            n = min(batch_size, n_sims - done)
+            if antithetic:
+                draws = _RecordedUniforms(rng)
+                first = self.simulate_batch(n, draws)
+                second = self.simulate_batch(n, draws.mirrored())
+                self.record(result, first)
+                self.record(result, second)
+                self.record_pair(result, first, second)
+            else:
+                self.record(result, self.simulate_batch(n, rng))
+            done += n
+        return result
+
+
+# Largest float32 below 1: mirrored uniforms stay in [0, 1) like drawn ones
+_BELOW_ONE = np.nextafter(np.float32(1), np.float32(0))
+
+
+class _RecordedUniforms:
+    """Generator stand-in for simulate_batch that keeps its uniforms for a mirror or replay run"""
+
+    def __init__(self, rng, replay=None, mirror=False):
+        self.rng = rng
+        self.draws = []
+        self.replay = replay
+        self.mirror = mirror
+
+    def random(self, size, dtype=np.float64):
+        if self.replay is not None:
+            u = next(self.replay)
+            return np.minimum(1 - u, _BELOW_ONE) if self.mirror else u
+        u = self.rng.random(size, dtype=dtype)
+        self.draws.append(u)
+        return u
+
+    def mirrored(self):
+        """A stand-in returning 1 - u of the recorded draws, in order (a drawn 0 just below 1)"""
+        return _RecordedUniforms(self.rng, iter(self.draws), mirror=True)
+
+    def replayed(self):
+        """A stand-in returning the recorded draws again, in order"""
+        return _RecordedUniforms(self.rng, iter(self.draws))
+
+
+def rank_groups(score_a, score_b, group_teams, plan=None, fair_play=None):
+    """
+    (n, G, S) group standings from (M, n, G) match scores
+
+    plan: sim.formats.FormatPlan giving the match order and tiebreakers
+        (default: DEFAULT_FORMAT)
+    fair_play: (deductions_a, deductions_b) per match, needed when the
+        tiebreakers include fair_play
+    group_teams: (G, S) team IDs of each group
+    """
+    return _rank(score_a, score_b, group_teams, plan or DEFAULT_FORMAT.plan, fair_play)[0]
+
+
+def _rank(score_a, score_b, group_teams, plan, fair_play=None):
+    """
+    Standings and, with best thirds, the (n, G) cross-group keys of the thirds
+
+    Every tiebreaker but head_to_head adds up over the matches, so each team
+    gets one sort key: the plan's weighted sum of its totals (see
+    sim.formats._weights), ending in its group position so teams level on
+    everything keep group order, as the stable sort in
+    Group.compute_standings does. Runs of criteria are packed per match in
+    float32 (FormatPlan.key_segments), looked up per scoreline
+    (FormatPlan.score_tables), and summed per team over the matches it
+    plays. head_to_head sums its run over only the matches between teams
+    whose keys were level before it, in only the groups it can reorder.
+    A sorting network then orders the keys with elementwise max/min. A key
+    too wide for one float64 (FormatPlan.key_words) is summed as several
+    words, each lower word then folded into the one above as its rank within
+    the group.
+
+    Raises:
+        ValueError: for a match score of plan.score_limit goals or more
+    """
+    dtype = plan.key_dtype
+    limit = plan.score_limit
+    if score_a.max(initial=0) >= limit or score_b.max(initial=0) >= limit:
+        raise ValueError(f'Group match scores must stay below {limit} goals')
+    scoreline = (score_a * np.float32(limit) + score_b).astype(np.intp)
+
+    words = [0] * len(plan.key_words)
+    packed_runs = {}
+    pass_levels = {}
+    third_totals = []
+    for word, weight, third_weight, components, head_to_head in plan.key_segments:
+        run = tuple(components)
+        table = plan.score_tables[run]
+        if not head_to_head:
+            if run not in packed_runs:
+                packed_runs[run] = [_pack(table[side], scoreline, components, fair_play, side)
+                                    for side in (0, 1)]
+            total = _team_totals(plan, packed_runs[run])
+            words[word] = words[word] + total * plan.word_dtypes[word](weight)
+            if plan.best_thirds and third_weight is not None:
+                third_totals.append((total, third_weight))
+            continue
+
+        # A pass only changes groups with teams level, and a re-applied pass
+        # only those where the previous one left a different set level (the
+        # same set would get the same sums again)
+        level = np.stack([_level(words[:word + 1], a, b) for a, b in plan.group_matches])
+        flat = level.reshape(len(level), -1)
+        changed = flat.any(axis=0)
+        if run in pass_levels:
+            changed &= (flat != pass_levels[run]).any(axis=0)
+        pass_levels[run] = flat
+        columns = np.flatnonzero(changed)
+        if 4 * len(columns) > len(changed):
+            # Many groups: sum them all, matches left out read the tables' 0
+            left_out = np.where(level, scoreline, len(table[0]) - 1)
+            total = _team_totals(plan, [np.take(table[side], left_out) for side in (0, 1)])
+            words[word] = words[word] + total * plan.word_dtypes[word](weight)
+            continue
+
+        # Few groups: sum only their columns and add the totals into theirs
+        sides = [_pack(table[side], scoreline, components, fair_play, side, columns)
+                 * np.take(flat, columns, axis=1) for side in (0, 1)]
+        if isinstance(words[word], int):
+            words[word] = np.zeros((plan.group_size,) + score_a.shape[1:],
+                                   dtype=plan.word_dtypes[word])
+        words[word].reshape(plan.group_size, -1)[:, columns] += (
+            _team_totals(plan, sides) * plan.word_dtypes[word](weight))
+    positions = plan.positions.astype(dtype)
+    key = words[-1] + positions
+    if len(words) > 1:
+        # Each lower word only breaks ties of the words above, so its rank
+        # within the group (distinct, thanks to the position) can stand in
+        # for it as one more digit: exact, and one key to sort again
+        radix = plan.key_radices[-1][1]
+        for upper in words[-2::-1]:
+            key = upper * dtype(plan.group_size) + _group_rank(key)
+        key = key * dtype(radix) + positions
+
+    # Keys are distinct within a group, so max/min exchanges sort them and the
+    # lowest digit (the position) says whose key ended up where
+    keys = list(key)
+    for i, j in plan.sort_network:
+        keys[i], keys[j] = np.maximum(keys[i], keys[j]), np.minimum(keys[i], keys[j])
+    standings = np.stack(keys, axis=-1).astype(np.int64)
+    standings &= plan.key_radices[-1][1] - 1
+    np.subtract(group_teams[:, :1] + (plan.group_size - 1), standings, out=standings)
+    if not plan.best_thirds:
+        return standings, None
+
+    # Cross-group key of each group's third, from its totals alone: its
+    # flat index into the (S, n, G) totals
+    n_columns = score_a[0].size
+    third = (standings[..., plan.qualifiers] - group_teams[:, 0]) * n_columns
+    third += np.arange(n_columns).reshape(score_a[0].shape)
+    third_keys = 0
+    for total, third_weight in third_totals:
+        third_keys = third_keys + np.take(total, third) * np.float64(third_weight)
+    return standings, third_keys
+
+
+def _pack(table, scoreline, components, fair_play, side, columns=None):
+    """
+    Float32 values of one side's run of components, weighted within the run:
+    (M, n, G), or (M, len(columns)) for some flattened (simulation, group) columns
+    """
+    if columns is not None:
+        scoreline = np.take(scoreline.reshape(len(scoreline), -1), columns, axis=1)
+    packed = np.take(table, scoreline)
+    for name, inner in components:
+        if name == 'fair_play':
+            cards = fair_play[side]
+            if columns is not None:
+                cards = np.take(cards.reshape(len(cards), -1), columns, axis=1)
+            packed += cards if inner == 1 else cards * np.float32(inner)
+    return packed
+
+
+def _team_totals(plan, sides):
+    """(S, n, G) per-team sums of (M, n, G) per-match values of each side"""
+    first = sides[0][0]
+    totals = np.empty((plan.group_size,) + first.shape, dtype=first.dtype)
+    for position, matches in enumerate(plan.team_matches):
+        (side, match), *rest = matches
+        totals[position] = sides[side][match]
+        for side, match in rest:
+            totals[position] += sides[side][match]
+    return totals
+
+
+def _group_rank(key):
+    """(S, n, G) rank of each key within its group (0 = lowest), for distinct keys"""
+    rank = np.zeros(key.shape, dtype=np.uint8)
+    for i, j in combinations(range(len(key)), 2):
+        below = key[i] < key[j]
+        rank[j] += below
+        rank[i] += ~below
+    return rank
+
+
+def _level(words, a, b):
+    """Whether positions a and b have equal keys so far (words not yet started are 0)"""
+    started = [key for key in words if not isinstance(key, int)]
+    level = started[0][a] == started[0][b]
+    for key in started[1:]:
+        level &= key[a] == key[b]
+    return level
+
+
+def poisson_cdf_table(means):
+    """
+    P(goals <= k) for k < MAX_MODEL_GOALS, per entry of a matrix of Poisson means
+
+    Counting how many of these a uniform exceeds reproduces
+    models.match.poisson_goals.
+    """
+    k = np.arange(MAX_MODEL_GOALS)
+    log_pmf = (k * np.log(np.maximum(means[..., None], 1e-12)) - means[..., None]
+               - np.cumsum(np.log(np.maximum(k, 1))))
+    return np.cumsum(np.exp(log_pmf), axis=-1).astype(np.float32)
+
+
+def _fair_play_table():
+    """(2, CARD_OUTCOMES) deductions of each side per card outcome"""
+    red_bins = round(RED_CARD_RATE * RED_CARD_BINS)
+    table = np.zeros((2, CARD_OUTCOMES), dtype=np.float32)
+    for index in range(CARD_OUTCOMES):
+        yellows, rest = divmod(index, 32 * RED_CARD_BINS)
+        sides, red_bin = divmod(rest, RED_CARD_BINS)
+        red = red_bin < red_bins
+        yellow_a = (sides & ((1 << yellows) - 1)).bit_count()
+        red_b = red and sides >= 16
+        table[0, index] = -yellow_a - 4 * (red and not red_b)
+        table[1, index] = yellow_a - yellows - 4 * red_b
+    return table
+
+
+_FAIR_PLAY = _fair_play_table()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Config paths are relative to backend/ and packages import as in main.py
+# (from sim import ...), so tests run from there whatever the invocation
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
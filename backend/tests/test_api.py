@@ -0,0 +1,54 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from api import jobs
+from api.app import create_app
+from api.jobs import JobManager
+
+
+@pytest.fixture(scope='module')
+def client():
+    with TestClient(create_app(workers=1)) as client:
+        yield client
+
+
+@pytest.mark.parametrize('picks', [
+    {'ZZ': 'Brazil'},                      # No such slot
+    {'E1': 'Atlantis'},                    # No such team
+    {'A1': 'Brazil'},                      # Brazil plays in group E
+    {'E1': 'Brazil', 'R16-3': 'Switzerland'},
+])
+def test_bad_picks_are_rejected(client, picks):
+    response = client.post('/jobs', json={'picks': picks})
+    assert response.status_code == 400
+    assert not client.app.state.jobs.jobs
+
+
+def test_possible_picks_start_a_job(client):
+    response = client.post('/jobs', json={'picks': {'E1': 'Brazil'}, 'max_sims': 2000})
+    assert response.status_code == 200
+    assert response.json()['job'] in client.app.state.jobs.jobs
+
+
+def test_failed_chunks_are_drained(monkeypatch):
+    """A failing job reports its error and leaves no future with an unretrieved exception"""
+    def fail(config, index, n):
+        raise RuntimeError(f'chunk {index} failed')
+
+    monkeypatch.setattr(jobs, 'run_job_chunk', fail)
+    unretrieved = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: unretrieved.append(context))
+        manager = JobManager(workers=4, executor=ThreadPoolExecutor(4))
+        job = manager.submit({})
+        await job.task
+        manager.executor.shutdown()
+        await asyncio.sleep(0)
+        return job
+
+    job = asyncio.run(run())
+    assert job.done and job.error.startswith('chunk')
+    assert unretrieved == []
@@ -0,0 +1,52 @@
+import math
+import pytest
+from backtest import brier_score, calibration, load_editions, log_loss, run_backtest
+from ml import History
+from sim import ROUNDS
+
+
+@pytest.fixture(scope='module')
+def history(tmp_path_factory):
+    return History(cache_dir=str(tmp_path_factory.mktemp('history')))
+
+
+def test_editions_rebuild_the_2018_world_cup(history):
+    (edition,) = load_editions(history, [2018])
+    assert edition.kickoff == '2018-06-14'
+    assert len(edition.team_names) == 32
+    reached = {round_name: sorted(team for team, outcome in edition.outcomes.items()
+                                  if outcome[round_name])
+               for round_name in ROUNDS}
+    assert [len(reached[round_name]) for round_name in ROUNDS] == [8, 16, 8, 4, 2, 1]
+    assert reached['champion'] == ['France']
+    assert reached['F'] == ['Croatia', 'France']
+    with pytest.raises(ValueError):
+        load_editions(history, [2017])
+
+
+def test_backtest_scores_reproducible_forecasts(history, tmp_path):
+    report = run_backtest([2018], n_sims=2000, seed=1, workers=1, history=history,
+                          cache_dir=str(tmp_path))
+    (edition,) = report['editions']
+    forecasts = edition['forecasts']
+    for round_name, teams in zip(ROUNDS, [8, 16, 8, 4, 2, 1]):
+        assert sum(rounds[round_name] for rounds in forecasts.values()) == pytest.approx(teams)
+    assert 0 < report['overall']['brier'] < 0.25
+    assert report['rounds']['champion']['forecasts'] == 32
+
+    # The second run reads the cached rating snapshot and draws the same chunks
+    again = run_backtest([2018], n_sims=2000, seed=1, workers=2, history=history,
+                         cache_dir=str(tmp_path))
+    assert again['editions'][0]['forecasts'] == forecasts
+    assert again['overall'] == report['overall']
+
+
+def test_metrics():
+    pairs = [(0.9, 1), (0.2, 0), (0.0, 1), (0.6, 0)]
+    assert brier_score(pairs) == pytest.approx((0.01 + 0.04 + 1 + 0.36) / 4)
+    assert log_loss(pairs, eps=0.01) == pytest.approx(
+        -(math.log(0.9) + math.log(0.8) + math.log(0.01) + math.log(0.4)) / 4)
+    assert brier_score([]) is None and log_loss([]) is None
+    bins = calibration(pairs, bins=4)
+    assert [(b['lower'], b['count']) for b in bins] == [(0.0, 2), (0.5, 1), (0.75, 1)]
+    assert bins[0]['observed'] == 0.5 and bins[2]['predicted'] == 0.9
@@ -0,0 +1,53 @@
+import os
+import numpy as np
+from config import DEFAULT_TEAMS_FILE
+from sim import SampleStore, SimulationCache, TournamentBatch, run_parallel
+from sim.parallel import build_engine
+
+
+def _counts(result):
+    return result.n_sims, result.counts, result.goals
+
+
+def test_extended_run_equals_a_fresh_run(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    key = cache.key(DEFAULT_TEAMS_FILE, seed=1, chunk_size=1000)
+    first = cache.run(DEFAULT_TEAMS_FILE, 2000, seed=1, workers=1, chunk_size=1000)
+    extended = cache.run(DEFAULT_TEAMS_FILE, 3500, seed=1, workers=1, chunk_size=1000)
+    assert cache.entries(key) == [2000, 3500]
+
+    fresh = run_parallel(DEFAULT_TEAMS_FILE, 3500, seed=1, workers=1, chunk_size=1000)
+    assert _counts(extended) == _counts(fresh)
+    assert _counts(cache.load(key, 2000)) == _counts(first)
+    assert _counts(cache.run(DEFAULT_TEAMS_FILE, 3500, seed=1, workers=1,
+                             chunk_size=1000)) == _counts(fresh)
+    assert cache.key(DEFAULT_TEAMS_FILE, seed=2, chunk_size=1000) != key
+
+
+def test_cached_samples_continue_the_stream(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    engine = build_engine(DEFAULT_TEAMS_FILE)
+    key = cache.key(DEFAULT_TEAMS_FILE, seed=3)
+    store = SampleStore(engine, seed=3).extend(3000)
+    cache.store_samples(key, store)
+
+    loaded = cache.load_samples(key, engine).extend(1000)
+    store.extend(1000)
+    assert loaded.n_sims == store.n_sims == 4000
+    for field in TournamentBatch.FIELDS:
+        assert np.array_equal(getattr(loaded.batch(), field), getattr(store.batch(), field))
+    assert cache.load_samples('0' * 32, engine, seed=3).n_sims == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    key = cache.key(DEFAULT_TEAMS_FILE, chunk_size=500)
+    for n_sims in (500, 1000):
+        cache.run(DEFAULT_TEAMS_FILE, n_sims, workers=1, chunk_size=500)
+    sizes = {name: os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)}
+    old = os.path.join(str(tmp_path), f'{key}-500.json')
+    os.utime(old, ns=(0, 0))
+
+    cache.max_bytes = max(sizes.values()) + 1
+    cache._evict()
+    assert cache.entries(key) == [1000]
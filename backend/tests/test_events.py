@@ -0,0 +1,70 @@
+import io
+import json
+import random
+from config import DEFAULT_TEAMS_FILE
+from sim import CollectorSink, NDJSONSink, TournamentEngine
+from sim.events import (Champion, GroupStandings, MatchFinished, PenaltyRound, RoundStarted,
+                        ShootoutFinished)
+
+
+def _engine(seed=3):
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    engine.rng = random.Random(seed)
+    return engine
+
+
+def test_collector_sees_the_tournament_in_order():
+    engine = _engine()
+    sink = engine.events.subscribe(CollectorSink())
+    champion = engine.simulate_tournament()
+    events = list(sink.events)
+
+    # Group stage: each group's matches, then its standings
+    for group in engine.groups:
+        block, events = events[:len(group.matches) + 1], events[len(group.matches) + 1:]
+        assert [event.match for event in block[:-1]] == group.matches
+        assert all(event.round_name == group.name for event in block[:-1])
+        assert isinstance(block[-1], GroupStandings) and block[-1].group is group
+        assert block[-1].qualifiers == group.standings[:2]
+
+    # Knockout rounds: the round, then every match and any shootout it needed
+    for label in engine.plan.knockout_labels:
+        assert isinstance(events[0], RoundStarted) and events[0].round_name == label
+        events = events[1:]
+        for match in engine.knockout_matches[label]:
+            assert isinstance(events[0], MatchFinished) and events[0].match is match
+            events = events[1:]
+            if match.shootout_winner is None:
+                continue
+            rounds = list(match.penalty_rounds)
+            assert [(e.number, e.score_a, e.score_b) for e in events[:len(rounds)]] == \
+                [(i, a, b) for i, (a, b) in enumerate(rounds, start=1)]
+            assert all(isinstance(e, PenaltyRound) and e.match is match
+                       for e in events[:len(rounds)])
+            shootout = events[len(rounds)]
+            assert isinstance(shootout, ShootoutFinished)
+            assert shootout.winner is match.shootout_winner
+            events = events[len(rounds) + 1:]
+
+    assert len(events) == 1 and isinstance(events[0], Champion) and events[0].team is champion
+    assert sink.of(ShootoutFinished), 'seed should produce at least one shootout'
+
+
+def test_quiet_engines_emit_nothing():
+    engine = _engine()
+    sink = engine.events.subscribe(CollectorSink())
+    engine.quiet = True
+    engine.simulate_tournament()
+    assert sink.events == []
+
+
+def test_ndjson_sink_writes_every_event():
+    engine = _engine()
+    collector = engine.events.subscribe(CollectorSink())
+    out = io.StringIO()
+    with NDJSONSink(out) as ndjson:
+        engine.events.subscribe(ndjson)
+        engine.simulate_tournament()
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines == [event.to_dict() for event in collector.events]
@@ -0,0 +1,28 @@
+import math
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from sim import TournamentEngine, VectorizedEngine, ExactEngine
+
+N_SIMS = 200000
+
+
+def test_exact_engine_matches_monte_carlo():
+    """Every advancement probability within 5 standard errors of the exact one"""
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    exact = ExactEngine.from_tournament(engine).probabilities()
+    sampled = VectorizedEngine.from_tournament(engine).run_monte_carlo(
+        N_SIMS, seed=11).probabilities()
+
+    for team, rounds in exact.items():
+        for round_name, p in rounds.items():
+            error = math.sqrt(max(p * (1 - p), 1 / N_SIMS) / N_SIMS)
+            assert abs(sampled[team][round_name] - p) < 5 * error, (team, round_name)
+
+
+def test_exact_engine_rejects_matchup_models():
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    engine.use_matchup_model(object())  # Any model: the Elo formula would be wrong
+    with pytest.raises(ValueError):
+        ExactEngine.from_tournament(engine)
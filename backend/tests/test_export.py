@@ -0,0 +1,63 @@
+import json
+import numpy as np
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from export import export_stream, iter_batches, open_records, write_records
+from sim import TournamentBatch, TournamentEngine, VectorizedEngine
+
+
+@pytest.fixture(scope='module')
+def engine():
+    tournament = TournamentEngine(delay=0)
+    tournament.load_data(DEFAULT_TEAMS_FILE)
+    return VectorizedEngine.from_tournament(tournament)
+
+
+def test_open_records_reads_back_what_was_written(engine, tmp_path):
+    path = str(tmp_path / 'sims.bin')
+    batches = list(iter_batches(engine, 2500, seed=8, batch_size=1000))
+    written = write_records(path, batches, engine.team_names, engine.group_names,
+                            meta={'seed': 8}, plan=engine.plan)
+    assert written == 2500
+
+    header, records = open_records(path)
+    assert header['teams'] == engine.team_names and header['seed'] == 8
+    assert len(records) == 2500
+    expected = TournamentBatch.concatenate(batches)
+    for field in TournamentBatch.FIELDS:
+        assert np.array_equal(records[field], getattr(expected, field))
+
+    # A file cut mid-record holds the complete records before the cut
+    with open(path, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - records.dtype.itemsize // 2)
+    assert len(open_records(path)[1]) == 2499
+
+
+def test_ndjson_lines_name_the_teams(engine, tmp_path):
+    path = str(tmp_path / 'sims.ndjson')
+    batch = next(iter_batches(engine, 5, seed=8))
+    write_records(path, [batch], engine.team_names, engine.group_names, fmt='ndjson')
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert [line['sim'] for line in lines] == list(range(5))
+    names = np.array(engine.team_names)
+    for line, standings, winners in zip(lines, batch.standings, batch.ko_winners):
+        assert line['standings'] == names[standings].tolist()
+        assert [match[-1] for match in line['knockout']] == names[winners].tolist()
+
+
+def test_export_stream_summary_matches_the_records(engine, tmp_path):
+    path = str(tmp_path / 'sims.bin')
+    summary = export_stream(engine, path, 1500, seed=2, batch_size=600)
+    _, records = open_records(path)
+    champions = np.bincount(records['ko_winners'][:, -1], minlength=len(engine.team_names))
+    probabilities = summary['probabilities']
+    for team, count in zip(engine.team_names, champions):
+        assert probabilities[team]['champion'] == pytest.approx(count / 1500)
+
+
+def test_open_records_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a records file')
+    with pytest.raises(ValueError):
+        open_records(str(path))
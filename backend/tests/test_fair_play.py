@@ -0,0 +1,22 @@
+import numpy as np
+from config import DEFAULT_TEAMS_FILE
+from sim import TournamentEngine, VectorizedEngine
+from sim.vectorized_engine import CARD_OUTCOMES, _FAIR_PLAY, _RecordedUniforms
+
+
+def test_mirrored_uniforms_stay_below_one():
+    draws = _RecordedUniforms(np.random.default_rng(0))
+    draws.draws.append(np.array([0.0, 0.5], dtype=np.float32))
+    mirrored = draws.mirrored().random(2, dtype=np.float32)
+    assert mirrored[0] < 1 and mirrored[1] == 0.5
+    side_a, side_b = VectorizedEngine._fair_play(mirrored)
+    assert side_a[0] == _FAIR_PLAY[0][CARD_OUTCOMES - 1]
+    assert side_b[0] == _FAIR_PLAY[1][CARD_OUTCOMES - 1]
+
+
+def test_antithetic_run_with_fair_play():
+    engine = TournamentEngine(delay=0, tournament_format='2018')
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    result = VectorizedEngine.from_tournament(engine).run_monte_carlo(
+        2000, seed=1, antithetic=True, batch_size=1000)
+    assert result.n_sims == 2000
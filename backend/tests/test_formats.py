@@ -0,0 +1,64 @@
+import json
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from models import Group, Team
+from sim.formats import WORLD_CUP_2026, TournamentFormat, _allocate_thirds
+from sim.vectorized_engine import _rank
+
+# Teams 0, 1 and 3 finish on 6 points. Head-to-head among them drops 3 and
+# leaves 0 and 1 level; re-applied to those two, 1 beat 0. Overall goal
+# difference alone would have put 0 first.
+SCORES = [(1, 2), (2, 0), (1, 0), (1, 0), (0, 1), (1, 2)]
+REAPPLIED = [1, 0, 3, 2]
+
+
+def test_head_to_head_is_reapplied_to_the_teams_still_level():
+    plan = WORLD_CUP_2026.plan
+    teams = [Team(str(i), 50, 'A') for i in range(4)]
+    group = Group('Group A', teams)
+    group.matches = [SimpleNamespace(team_a=teams[a], team_b=teams[b], final_score=score,
+                                     yellow_a=0, yellow_b=0, red_a=0, red_b=0)
+                     for (a, b), score in zip(plan.group_matches, SCORES)]
+    group.compute_standings(plan.tiebreakers, plan.qualifiers)
+    assert [int(team.name) for team in group.standings] == REAPPLIED
+
+    score_a = np.array([a for a, _ in SCORES], dtype=np.float32).reshape(-1, 1, 1)
+    score_b = np.array([b for _, b in SCORES], dtype=np.float32).reshape(-1, 1, 1)
+    no_cards = np.zeros_like(score_a)
+    standings, _ = _rank(score_a, score_b, np.arange(4).reshape(1, 4), plan,
+                         (no_cards, no_cards))
+    assert standings[0, 0].tolist() == REAPPLIED
+
+
+def _format(table):
+    return TournamentFormat('2026-test', WORLD_CUP_2026.groups, WORLD_CUP_2026.bracket,
+                            best_thirds=8, tiebreakers=WORLD_CUP_2026.tiebreakers,
+                            third_place_table=table)
+
+
+def test_third_place_table_file(tmp_path):
+    plan = WORLD_CUP_2026.plan
+    letters = WORLD_CUP_2026.groups
+    chosen = tuple(range(8))
+    third_groups = [plan.third_table[:, t][plan.third_table[:, t] >= 0].tolist()
+                    for t in range(plan.third_table.shape[1])]
+    # Another valid matching than the automatic one: swap two slots that allow it
+    automatic = list(_allocate_thirds(chosen, third_groups))
+    swapped = next(
+        (i, j) for i in range(8) for j in range(i + 1, 8)
+        if automatic[j] in third_groups[i] and automatic[i] in third_groups[j])
+    official = list(automatic)
+    official[swapped[0]], official[swapped[1]] = official[swapped[1]], official[swapped[0]]
+
+    key = ''.join(letters[g] for g in chosen)
+    path = tmp_path / 'third_place.json'
+    path.write_text(json.dumps({key: ''.join(letters[g] for g in official)}))
+    custom = _format(str(path)).plan
+    assert list(custom.third_lookup[sum(1 << g for g in chosen)]) == official
+    assert custom.automatic_thirds == plan.automatic_thirds - 1
+
+    path.write_text(json.dumps({key: key}))
+    with pytest.raises(ValueError, match='does not fit'):
+        _format(str(path)).plan
+    assert _format(str(tmp_path / 'missing.json')).plan.automatic_thirds == 495
@@ -0,0 +1,71 @@
+import csv
+import multiprocessing
+import os
+from ml.feature_store import FeatureStore
+from ml.history import History
+
+
+def _write_csv(path, header, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _build(data_dir, cache_dir, name):
+    History(data_dir, cache_dir).table(name)
+
+
+def test_concurrent_builds_share_team_ids(tmp_path):
+    """Two processes extending the team table at once must not reuse IDs"""
+    data_dir, cache_dir = str(tmp_path / 'data'), str(tmp_path / 'cache')
+    os.makedirs(data_dir)
+    n = 5000
+    _write_csv(os.path.join(data_dir, 'former_names.csv'),
+               ['current', 'former', 'start_date', 'end_date'], [])
+    _write_csv(os.path.join(data_dir, 'results.csv'),
+               ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'tournament',
+                'city', 'country', 'neutral'],
+               [('2000-01-01', f'North {k}', f'North {k + 1}', 1, 0, 'Friendly', 'X', 'Y',
+                 'TRUE') for k in range(n)])
+    _write_csv(os.path.join(data_dir, 'shootouts.csv'),
+               ['date', 'home_team', 'away_team', 'winner', 'first_shooter'],
+               [('2000-01-01', f'South {k}', f'South {k + 1}', f'South {k}', '')
+                for k in range(n)])
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_build, args=(data_dir, cache_dir, name))
+               for name in ('results', 'shootouts')]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    history = History(data_dir, cache_dir)
+    for name, prefix in (('results', 'North'), ('shootouts', 'South')):
+        names = [history.team_name(team_id) for team_id in history.table(name)['home']]
+        assert names == [f'{prefix} {k}' for k in range(n)]
+
+
+def test_feature_store_stops_at_cutoff(tmp_path):
+    """Results on or after `until` are left out, and a later sync picks them up"""
+    data_dir, cache_dir = str(tmp_path / 'data'), str(tmp_path / 'cache')
+    os.makedirs(data_dir)
+    _write_csv(os.path.join(data_dir, 'former_names.csv'),
+               ['current', 'former', 'start_date', 'end_date'], [])
+    _write_csv(os.path.join(data_dir, 'results.csv'),
+               ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'tournament',
+                'city', 'country', 'neutral'],
+               [(day, 'North', 'South', 1, 0, 'Friendly', 'X', 'Y', 'TRUE')
+                for day in ('2000-01-01', '2000-02-01', '2000-03-01')])
+    history = History(data_dir, cache_dir)
+
+    store = FeatureStore.from_history(history, until='2000-02-01')
+    assert store.rows == 1
+    features = store.features('North', on='2000-02-01')
+    assert features['win_rate_5'] == 1 and features['days_rest'] == 31
+
+    full = FeatureStore.from_history(history)
+    assert store.sync(history).rows == full.rows == 3
+    assert store.features('South') == full.features('South')
@@ -0,0 +1,66 @@
+import random
+import pytest
+from models import Match, MatchEvent, EventType, Team
+from models.match import SHOOTOUT_ROUNDS, _kick, _kick_values, penalty_win_probability
+
+
+def _teams():
+    return Team('A', 80, 'A'), Team('B', 70, 'A')
+
+
+def test_generate_timeline_returns_the_events_lazily():
+    team_a, team_b = _teams()
+    match = Match(team_a, team_b)
+    timeline = match.generate_timeline({'base_goal_rate': 6}, rng=random.Random(3))
+    assert match._events is None
+    assert list(timeline) == match.events
+    assert timeline == match.events
+    assert sum(event.type == EventType.GOAL for event in timeline) == sum(match._score)
+
+
+def test_event_meta_defaults_to_an_empty_dict():
+    team_a, _ = _teams()
+    event = MatchEvent(10, EventType.GOAL, team_a)
+    assert event.meta == {}
+    event.meta['assist'] = 'Player X'
+    assert MatchEvent(11, EventType.GOAL, team_a).meta == {}
+
+
+@pytest.mark.parametrize('elo_a, elo_b', [(80, 60), (50, 95), (110, 70)])
+def test_penalty_win_probability_matches_simulated_kicks(elo_a, elo_b):
+    rng = random.Random(7)
+    kick_a, kick_b = _kick_values(elo_a), _kick_values(elo_b)
+    n = 20000
+    wins = 0
+    for _ in range(n):
+        pen_a = pen_b = rounds = 0
+        while rounds < SHOOTOUT_ROUNDS or pen_a == pen_b:
+            pen_a += _kick(kick_a, rng.random())
+            pen_b += _kick(kick_b, rng.random())
+            rounds += 1
+        wins += pen_a > pen_b
+    assert abs(wins / n - penalty_win_probability(elo_a, elo_b)) < 0.015
+    assert penalty_win_probability(elo_a, elo_b) + penalty_win_probability(elo_b, elo_a) == \
+        pytest.approx(1)
+
+
+def test_penalty_win_probability_is_even_between_equal_sides():
+    assert penalty_win_probability(5, 5) == 0.5
+    assert penalty_win_probability(70, 70) == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize('elo_a, elo_b', [(80, 60), (5, 5)])
+def test_replayed_shootout_ends_with_the_winner(elo_a, elo_b):
+    team_a, team_b = Team('A', elo_a, 'A'), Team('B', elo_b, 'A')
+    for seed in range(20):
+        match = Match(team_a, team_b)
+        winner = match.play_penalties(rng=random.Random(seed), verbose=False)
+        rounds = match.penalty_rounds
+        assert len(rounds) >= SHOOTOUT_ROUNDS
+        pen_a, pen_b, decided = match.penalties_result
+        assert decided is winner
+        assert (pen_a > pen_b) == (winner is team_a)
+        previous = (0, 0)
+        for score in rounds:
+            assert all(0 <= now - before <= 2 for now, before in zip(score, previous))
+            previous = score
@@ -0,0 +1,28 @@
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from sim import MonteCarloResult, run_parallel
+
+
+def _counts(result):
+    return result.n_sims, result.counts, result.goals
+
+
+@pytest.mark.parametrize('engine, chunk_size', [('vectorized', 1000), ('scalar', 50)])
+def test_worker_count_does_not_change_the_result(engine, chunk_size):
+    n_sims = 3 * chunk_size + chunk_size // 2
+    runs = [run_parallel(DEFAULT_TEAMS_FILE, n_sims, seed=4, workers=workers, engine=engine,
+                         chunk_size=chunk_size)
+            for workers in (1, 2, 3)]
+    assert runs[0].n_sims == n_sims
+    assert _counts(runs[0]) == _counts(runs[1]) == _counts(runs[2])
+
+
+def test_later_chunks_extend_a_run():
+    whole = run_parallel(DEFAULT_TEAMS_FILE, 3000, seed=4, workers=1, chunk_size=1000)
+    extended = MonteCarloResult(whole.team_names, whole.rounds)
+    extended.merge(run_parallel(DEFAULT_TEAMS_FILE, 2000, seed=4, workers=1, chunk_size=1000))
+    extended.merge(run_parallel(DEFAULT_TEAMS_FILE, 1000, seed=4, workers=2, chunk_size=1000,
+                                first_chunk=2))
+    assert _counts(extended) == _counts(whole)
+    assert _counts(whole) != _counts(run_parallel(DEFAULT_TEAMS_FILE, 3000, seed=5, workers=1,
+                                                  chunk_size=1000))
@@ -0,0 +1,58 @@
+import csv
+import os
+import pytest
+from ml.history import History
+from ml.penalties import ShootoutModel, shootout_samples
+
+
+def _write_csv(path, header, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def history(tmp_path):
+    """'Strong' beats everyone in 2000, then wins 8 of 10 shootouts in 2001"""
+    data_dir, cache_dir = str(tmp_path / 'data'), str(tmp_path / 'cache')
+    os.makedirs(data_dir)
+    _write_csv(os.path.join(data_dir, 'former_names.csv'),
+               ['current', 'former', 'start_date', 'end_date'], [])
+    results = [(f'2000-01-{k + 1:02d}', 'Strong', f'Weak {k}', 3, 0) for k in range(20)]
+    shootouts = []
+    for k in range(10):
+        day = f'2001-01-{k + 1:02d}'
+        results.append((day, 'Strong', f'Weak {k}', 1, 1))
+        shootouts.append((day, 'Strong', f'Weak {k}', 'Strong' if k < 8 else f'Weak {k}', ''))
+    _write_csv(os.path.join(data_dir, 'results.csv'),
+               ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'tournament',
+                'city', 'country', 'neutral'],
+               [row + ('Friendly', 'X', 'Y', 'TRUE') for row in results])
+    _write_csv(os.path.join(data_dir, 'shootouts.csv'),
+               ['date', 'home_team', 'away_team', 'winner', 'first_shooter'], shootouts)
+    return History(data_dir, cache_dir)
+
+
+def test_samples_take_the_gap_before_the_match(history):
+    samples = shootout_samples(history)
+    assert len(samples) == 10
+    assert all(diff > 0 and first == 0 for diff, first, _ in samples)
+    assert [won for _, _, won in samples] == [1] * 8 + [0] * 2
+
+
+def test_fitted_model_favours_the_stronger_side(history, tmp_path):
+    model = ShootoutModel.fit(history)
+    assert model.samples == 10
+    assert model.elo_coef > 0
+    assert model.first_coef == pytest.approx(0, abs=1e-6)
+    assert model.win_probability(80, 60) > 0.5
+    assert model.win_probability(80, 60) + model.win_probability(60, 80) == pytest.approx(1)
+    assert model.win_probability(70, 70) == pytest.approx(0.5)
+
+    path = str(tmp_path / 'shootout.json')
+    model.save(path)
+    loaded = ShootoutModel.load(path)
+    assert loaded.to_dict() == model.to_dict()
+    assert ShootoutModel.cached(str(tmp_path / 'cached.json'), history).to_dict() == \
+        model.to_dict()
@@ -0,0 +1,53 @@
+import asyncio
+import random
+from config import DEFAULT_TEAMS_FILE
+from models import EventType
+from sim import TournamentEngine
+from sim.replay import ReplayClock, matchdays, replay_matches, replay_tournament
+
+
+def _tournament(seed):
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    engine.quiet = True
+    engine.rng = random.Random(seed)
+    engine.simulate_tournament()
+    return engine
+
+
+def test_replay_streams_the_drawn_outcome():
+    engine = _tournament(3)
+    days = matchdays(engine)
+    matches = [match for _, day in days for match in day]
+    scores = [match.final_score for match in matches]
+    shootouts = [match.penalties_result for match in matches]
+    assert len(days) == 3 + len(engine.plan.knockout_labels)
+
+    streamed = {}
+    labels = []
+    asyncio.run(replay_tournament(
+        engine, seconds_per_minute=0,
+        on_event=lambda match, event, state: streamed.setdefault(id(match), []).append(
+            (event, state.score_a, state.score_b)),
+        on_matchday=lambda label, day: labels.append(label)))
+
+    assert labels == [label for label, _ in days]
+    for match, score, shootout in zip(matches, scores, shootouts):
+        assert match.final_score == score
+        events = streamed.get(id(match), [])
+        minutes = [event.minute for event, _, _ in events]
+        assert minutes == sorted(minutes)
+        goals = [event for event, _, _ in events if event.type == EventType.GOAL]
+        assert len(goals) == sum(score)
+        kicks = [event.meta['score'] for event, _, _ in events
+                 if event.type == EventType.PENALTY_TAKEN]
+        assert kicks == list(match.penalty_rounds)
+        if shootout is not None:
+            assert kicks[-1] == shootout[:2]
+
+
+def test_concurrent_viewers_keep_their_own_state():
+    match = _tournament(5).groups[0].matches[0]
+    clock = ReplayClock(0)
+    assert asyncio.run(replay_matches([match, match, match], clock)) == [match.final_score] * 3
+    assert clock.minute == match.scheduled_minute_range
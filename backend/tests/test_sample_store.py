@@ -0,0 +1,60 @@
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from sim import TournamentEngine, VectorizedEngine, SampleStore
+
+
+@pytest.fixture(scope='module')
+def engine():
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    return engine
+
+
+@pytest.fixture(scope='module')
+def store(engine):
+    return SampleStore(VectorizedEngine.from_tournament(engine), seed=0).extend(20000)
+
+
+@pytest.mark.parametrize('picks', [
+    {'A1': 'Brazil'},                                    # Brazil plays in group E
+    {'E1': 'Brazil', 'E2': 'Brazil'},
+    {'E1': 'Brazil', 'R16-7': 'Brazil'},                 # E1 plays R16-3
+    {'E1': 'Brazil', 'R16-3': 'Switzerland'},            # Switzerland would need E1 too
+    {'QF-2': 'Brazil', 'R16-3': 'Switzerland'},          # Brazil's only way in is R16-3
+    {'F': 'Brazil', 'SF-1': 'France', 'SF-2': 'Spain'},
+])
+def test_impossible_picks_raise(store, picks):
+    with pytest.raises(ValueError):
+        store.conditional(picks, max_sims=store.n_sims)
+
+
+def test_possible_picks_match(store):
+    result = store.conditional({'E2': 'Brazil', 'R16-3': 'Switzerland'}, min_samples=0)
+    assert result.n_sims > 0
+    assert result.probabilities()['Switzerland']['group_win'] == 1
+
+
+def test_set_prediction(engine):
+    with pytest.raises(ValueError):
+        engine.set_prediction('E1', 'Atlantis')
+    engine.set_prediction('E1', 'Brazil')
+    engine.set_prediction('QF-2', 'Brazil')
+    engine.set_prediction('QF-2', 'Germany')
+    brazil = next(team for team in engine.teams if team.name == 'Brazil')
+    assert brazil.user_predictions == ['E1']
+    assert engine.user_predictions == {'E1': 'Brazil', 'QF-2': 'Germany'}
+    engine.clear_predictions()
+    assert brazil.user_predictions == []
+
+
+def test_rare_picks_stop_at_the_cap(engine):
+    """Top-ups double the store up to max_sims, then flag the result as short"""
+    store = SampleStore(VectorizedEngine.from_tournament(engine), seed=1)
+    result = store.conditional({'F': 'Panama', 'SF-1': 'Saudi Arabia'}, min_samples=1000,
+                               max_sims=60000, batch_size=10000)
+    assert store.n_sims == 60000
+    assert [segment.batch.n_sims for segment in store.segments] == [10000] * 6
+    assert result.too_few_samples and result.n_sims < 1000
+
+    common = store.conditional({'E1': 'Brazil'}, min_samples=1000, max_sims=60000)
+    assert not common.too_few_samples and common.n_sims >= 1000
@@ -0,0 +1,80 @@
+import random
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from export.serializers import export_snapshot
+from sim import TournamentEngine, TournamentSnapshot
+
+
+@pytest.fixture(scope='module')
+def engine():
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    engine.quiet = True
+    return engine
+
+
+@pytest.fixture(scope='module')
+def played(engine):
+    """Snapshot and export of a complete simulated tournament"""
+    engine.rng = random.Random(0)
+    engine.simulate_tournament()
+    return TournamentSnapshot.from_engine(engine), export_snapshot(engine)
+
+
+@pytest.fixture(scope='module')
+def empty(played):
+    return TournamentSnapshot(played[0].team_names, played[0].group_names)
+
+
+@pytest.mark.parametrize('args', [
+    ('Russia', 'Saudi Arabia', -1, 0),         # -1 means not played
+    ('Russia', 'Atlantis', 1, 0),
+    ('Russia', 'Russia', 1, 0),
+    ('Russia', 'Brazil', 1, 0),                # Not in the same group, no knockouts yet
+])
+def test_with_result_rejects(empty, args):
+    with pytest.raises(ValueError):
+        empty.with_result(*args)
+
+
+def test_with_result_copies(empty):
+    snapshot = empty.with_result('Saudi Arabia', 'Russia', 0, 5)
+    assert (empty.group_scores < 0).all()
+    assert (snapshot.group_scores >= 0).sum() == 2
+    with pytest.raises(ValueError):
+        snapshot.with_result('Russia', 'Saudi Arabia', 1, 1)
+
+
+def test_level_knockout_needs_a_winner_who_played(played):
+    snapshot = played[0]
+    group_only = TournamentSnapshot(snapshot.team_names, snapshot.group_names,
+                                    snapshot.group_scores)
+    a, b = (group_only.team_names[i] for i in group_only._bracket_sides()[0])
+    with pytest.raises(ValueError):
+        group_only.with_result(a, b, 1, 1)
+    outsider = next(name for name in group_only.team_names if name not in (a, b))
+    with pytest.raises(ValueError):
+        group_only.with_result(a, b, 1, 1, winner=outsider)
+    assert group_only.with_result(a, b, 1, 1, winner=b).ko_winners[0] == group_only._ids[b]
+
+
+def test_from_export_matches_from_engine(played):
+    snapshot, export = played
+    restored = TournamentSnapshot.from_export(export)
+    assert restored.stage == snapshot.stage == 'done'
+    assert (restored.ko_winners == snapshot.ko_winners).all()
+    assert (restored._bracket_sides() == snapshot._bracket_sides()).all()
+
+
+def test_fork_keeps_fixed_results(engine, played):
+    snapshot = played[0]
+    group_only = TournamentSnapshot(snapshot.team_names, snapshot.group_names,
+                                    snapshot.group_scores)
+    result = group_only.fork(engine, 2000, seed=0).probabilities()
+    qualifiers = set(group_only._bracket_sides()[:8].ravel())
+    for i, name in enumerate(group_only.team_names):
+        assert result[name]['R16'] == (1 if i in qualifiers else 0)
+
+    # A finished tournament forks to itself
+    champion = snapshot.team_names[snapshot.ko_winners[-1]]
+    assert snapshot.fork(engine, 100, seed=0).probabilities()[champion]['champion'] == 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from ml.matchup import MatchupMatrix
+from sim import Sweep, TournamentEngine, VectorizedEngine, elo_variants, param_variants, run_sweep
+
+
+def test_variant_runs_equal_standalone_runs():
+    """Replaying the baseline's draws gives a variant exactly its own seeded run"""
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    baseline = VectorizedEngine.from_tournament(engine)
+    variants = elo_variants('Brazil', [10]) + param_variants('base_goal_rate', [5])
+    sweep = run_sweep(baseline, variants, 20000, seed=5, batch_size=20000)
+
+    standalone = [baseline,
+                  baseline.variant({'Brazil': 10}),
+                  baseline.variant(sim_params={'base_goal_rate': 5})]
+    for result, variant in zip(sweep.results, standalone):
+        alone = variant.run_monte_carlo(20000, seed=5, batch_size=20000)
+        assert result.counts == alone.counts
+
+
+def test_elo_variants_need_an_engine_without_a_matchup_model():
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    names = [team.name for group in engine.groups for team in group.teams]
+    goals = np.full((len(names), len(names)), 1.3)
+    baseline = VectorizedEngine(engine.groups, engine.sim_params,
+                                MatchupMatrix(names, goals, goals), plan=engine.plan)
+    with pytest.raises(ValueError):
+        Sweep(baseline, elo_variants('Brazil', [10]))
+    assert Sweep(baseline, param_variants('base_goal_rate', [5])).names[1] == 'base_goal_rate=5'
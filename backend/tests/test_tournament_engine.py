@@ -0,0 +1,33 @@
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from ml.history import to_ordinal
+from ml.scorers import ScorerModel
+from models.match import penalty_win_probability
+from sim import TournamentEngine
+
+
+def _engine():
+    engine = TournamentEngine(delay=0)
+    engine.load_data(DEFAULT_TEAMS_FILE)
+    engine.quiet = True
+    return engine
+
+
+def test_shootout_table_built_on_load_and_refreshed():
+    engine = _engine()
+    a, b = engine.teams[:2]
+    table = engine._shootouts
+    assert table.probability(a.name, b.name) == penalty_win_probability(a.elo, b.elo)
+
+    a.elo += 10
+    assert engine._shootouts is table  # Only refresh_shootouts rebuilds it
+    engine.refresh_shootouts()
+    assert engine._shootouts.probability(a.name, b.name) == penalty_win_probability(a.elo, b.elo)
+
+
+def test_scorer_model_must_predate_the_fixture():
+    engine = _engine()
+    assert engine.kickoff == '2018-06-14'
+    engine.use_scorer_model(ScorerModel({}, to_ordinal('2018-06-14')))
+    with pytest.raises(ValueError, match='after the fixture'):
+        engine.use_scorer_model(ScorerModel({}, to_ordinal('2024-07-15')))
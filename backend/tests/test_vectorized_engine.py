@@ -0,0 +1,77 @@
+import json
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from config import DEFAULT_TEAMS_FILE
+from sim import TournamentEngine, VectorizedEngine
+from sim.vectorized_engine import _rank
+
+N_SIMS = 3000
+
+
+def _teams_2026(path):
+    """48-team fixture with spread-out Elos for the 2026 format"""
+    rng = np.random.default_rng(2026)
+    teams = [{'name': f'Team {k}', 'elo': int(rng.integers(10, 90)),
+              'group': 'ABCDEFGHIJKL'[k % 12]} for k in range(48)]
+    path.write_text(json.dumps({'format': '2026', 'teams': teams}))
+    return str(path)
+
+
+@pytest.fixture(params=['classic', '2018', '2026'])
+def engine(request, tmp_path):
+    if request.param == '2026':
+        engine = TournamentEngine(delay=0)
+        engine.load_data(_teams_2026(tmp_path / 'teams_2026.json'))
+    else:
+        engine = TournamentEngine(delay=0, tournament_format=request.param)
+        engine.load_data(DEFAULT_TEAMS_FILE)
+    engine.quiet = True
+    return engine
+
+
+def test_scalar_and_vectorized_standings_agree(engine):
+    """Group.compute_standings and _rank give the same standings and best thirds"""
+    vectorized = VectorizedEngine.from_tournament(engine)
+    plan = vectorized.plan
+    rng = np.random.default_rng(7)
+    shape = (len(plan.group_matches), N_SIMS, plan.n_groups)
+    # Low scores and at most one card per side make every tiebreaker matter
+    score_a = rng.integers(0, 3, shape).astype(np.float32)
+    score_b = rng.integers(0, 3, shape).astype(np.float32)
+    fair_play = None
+    if plan.uses_cards:
+        fair_play = tuple(np.maximum(side, -1) for side in
+                          vectorized._fair_play(rng.random(shape, dtype=np.float32)))
+    standings, third_keys = _rank(score_a, score_b, vectorized.group_teams, plan, fair_play)
+    slots = standings[:, :, :plan.qualifiers].reshape(N_SIMS, -1)
+    if plan.best_thirds:
+        slots = np.concatenate([slots, vectorized._best_thirds(standings, third_keys)], axis=1)
+
+    mismatches = 0
+    for s in range(N_SIMS):
+        for g, group in enumerate(engine.groups):
+            group.matches = []
+            for m, (a, b) in enumerate(plan.group_matches):
+                yellow_a = -int(fair_play[0][m, s, g]) if fair_play else 0
+                yellow_b = -int(fair_play[1][m, s, g]) if fair_play else 0
+                group.matches.append(SimpleNamespace(
+                    team_a=group.teams[a], team_b=group.teams[b],
+                    final_score=(int(score_a[m, s, g]), int(score_b[m, s, g])),
+                    yellow_a=yellow_a, yellow_b=yellow_b, red_a=0, red_b=0))
+            table = group.table()
+            for team in group.teams:
+                team.points = table[team]['points']
+                team.goal_diff = table[team]['goal_difference']
+            group.compute_standings(plan.tiebreakers, plan.qualifiers)
+        qualifiers = [team for group in engine.groups
+                      for team in group.standings[:plan.qualifiers]]
+        if plan.best_thirds:
+            qualifiers += engine._best_thirds()
+        scalar = [[team.name for team in group.standings] for group in engine.groups]
+        vector = [[vectorized.team_names[t] for t in row] for row in standings[s]]
+        if (scalar != vector
+                or [team.name for team in qualifiers] != [vectorized.team_names[t]
+                                                          for t in slots[s]]):
+            mismatches += 1
+    assert mismatches == 0